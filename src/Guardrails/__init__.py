@@ -0,0 +1,2 @@
+from Guardrails.judge_llm import GuardrailPipeline, GuardrailJudge, GUARDRAILS_ENABLED
+from Guardrails.prefilter import Finding
@@ -0,0 +1,140 @@
+"""
+Tier 1 guardrails: fast local checks (regex, parsing, lengths), no model call.
+Every check returns the findings that are not a plain pass. Only "escalate" findings go to the LLM judge.
+"""
+from dataclasses import dataclass
+import json
+import re
+import os
+
+# Verdicts
+PASS, FLAG, ESCALATE, BLOCK = "pass", "flag", "escalate", "block"
+
+# Longest Job Description sent to the model, the rest is cut (scraped pages can embed whole sites)
+MAX_JD_CHARS = int(os.getenv("GUARDRAILS_MAX_JD_CHARS", "30000"))
+# Longest acceptable answer per question key (characters)
+MAX_ANSWER_CHARS = {"q_meta": 500, "q3": 3000}
+DEFAULT_MAX_ANSWER_CHARS = int(os.getenv("GUARDRAILS_MAX_ANSWER_CHARS", "8000"))
+# Sections where contact details are expected (cover letter, elevator pitch)
+CONTACT_SECTIONS = ("q7", "q9")
+
+
+@dataclass
+class Finding:
+    section: str        # "jd" or a question key
+    check: str          # injection | pii | format | length
+    verdict: str        # flag | escalate | block (then pass / flag once judged)
+    detail: str
+    tier: int = 1
+
+
+# Instructions aimed at the model, not at a candidate: a strong match is blocked, a weak one is escalated
+_STRONG_INJECTION = [
+    re.compile(p, re.IGNORECASE) for p in (
+        r"\b(ignore|disregard|forget)\s+(all\s+|any\s+)?(the\s+|your\s+)?(previous|prior|above|earlier|preceding)\s+"
+        r"(instructions?|prompts?|messages?|context|rules)",
+        r"<\|?(im_start|im_end|endoftext|system)\|?>",
+        r"\b(give|assign|rate|score)\s+(every|each|this|the|all)\s+(candidates?|applicants?|resumes?)\s+"
+        r"(a\s+)?(score\s+of\s+)?(100|perfect|maximum|the highest)",
+        r"\b(reveal|print|output|repeat)\s+(your|the)\s+(system\s+)?(prompt|instructions)",
+    )
+]
+# Phrases addressed to the model ("As an AI, you must", "Assistant: you will"), an "Executive Assistant will ..."
+# or "As an assistant, you will ..." is a job, not an instruction
+_WEAK_INJECTION = [
+    re.compile(p, re.IGNORECASE | re.MULTILINE) for p in (
+        r"\b(system|developer)\s+(prompt|message)\b",
+        r"\byou\s+are\s+now\b",
+        r"\bas\s+an?\s+(ai|llm|language\s+model|chatgpt)[ \t]*,?[ \t]*you\s+(must|should|will)\b",
+        r"^[ \t]*(ai|llm|language\s+model|chatgpt|assistant)[ \t]*[,:][ \t]*you\s+(must|should|will)\b",
+        r"\bnew\s+instructions?\b",
+        r"\bdo\s+not\s+follow\b",
+    )
+]
+_HIDDEN_CHARS = re.compile("[\u200b-\u200f\u202a-\u202e\u2060-\u2064\ufeff]")
+
+_SSN = re.compile(r"\b\d{3}-\d{2}-\d{4}\b")
+_CARD = re.compile(r"\b(?:\d[ -]?){12,18}\d\b")
+_EMAIL = re.compile(r"\b[\w.+-]+@[\w-]+\.[\w.-]+\b")
+_PHONE = re.compile(r"(?<!\d)(?:\+?\d{1,3}[ .-]?)?\(?\d{3}\)?[ .-]?\d{3}[ .-]?\d{4}(?!\d)")
+_SCORE = re.compile(r"\b(100|[1-9]?[0-9])\b")
+
+
+def _luhn_valid(digits: str) -> bool:
+    total, parity = 0, len(digits) % 2
+    for i, digit in enumerate(map(int, digits)):
+        if i % 2 == parity:
+            digit = digit * 2 - 9 if digit > 4 else digit * 2
+        total += digit
+    return total % 10 == 0
+
+
+def check_injection(text: str, section: str = "jd") -> list[Finding]:
+    """Prompt-injection attempts in scraped text (instructions to the model, chat-template tokens, hidden chars)."""
+    strong = [m.group(0) for pattern in _STRONG_INJECTION for m in pattern.finditer(text)]
+    if strong:
+        return [Finding(section, "injection", BLOCK, f"instructions to the model: {strong[:3]}")]
+    weak = [m.group(0) for pattern in _WEAK_INJECTION for m in pattern.finditer(text)]
+    hidden = len(_HIDDEN_CHARS.findall(text))
+    if weak or hidden > 20:
+        detail = f"suspicious phrases: {weak[:3]}" if weak else f"{hidden} hidden characters"
+        return [Finding(section, "injection", ESCALATE, detail)]
+    return []
+
+
+def neutralize_injection(text: str) -> str:
+    """Removes the lines carrying a strong injection pattern and the hidden characters."""
+    lines = [line for line in text.splitlines() if not any(p.search(line) for p in _STRONG_INJECTION)]
+    return _HIDDEN_CHARS.sub("", "\n".join(lines))
+
+
+def check_pii(text: str, section: str) -> list[Finding]:
+    """Sensitive identifiers (SSN, card numbers) are blocked, contact details outside the letters escalated."""
+    findings = []
+    cards = [m.group(0) for m in _CARD.finditer(text) if _luhn_valid(re.sub(r"\D", "", m.group(0)))]
+    if _SSN.search(text) or cards:
+        findings.append(Finding(section, "pii", BLOCK, "SSN or card number in the answer"))
+    if section not in CONTACT_SECTIONS and (_EMAIL.search(text) or _PHONE.search(text)):
+        findings.append(Finding(section, "pii", ESCALATE, "contact details in an analysis section"))
+    return findings
+
+
+def redact_pii(text: str) -> str:
+    text = _SSN.sub("[REDACTED]", text)
+    return _CARD.sub(lambda m: "[REDACTED]" if _luhn_valid(re.sub(r"\D", "", m.group(0))) else m.group(0), text)
+
+
+def check_format(key: str, answer: str) -> list[Finding]:
+    """q_meta must hold a JSON object with company and title, q3 a single 0-100 score."""
+    if key == "q_meta":
+        match = re.search(r"\{.*}", answer, re.DOTALL)
+        if not match:
+            return [Finding(key, "format", FLAG, "no JSON object")]
+        try:
+            meta = json.loads(match.group(0).replace("\xa0", " ").replace("\n", " "), strict=False)
+        except json.JSONDecodeError as e:
+            return [Finding(key, "format", FLAG, f"invalid JSON: {e}")]
+        if not isinstance(meta, dict) or not meta.get("company") or not meta.get("title"):
+            return [Finding(key, "format", FLAG, "company or title missing")]
+    elif key == "q3":
+        scores = {int(value) for value in _SCORE.findall(answer)}
+        if not scores:
+            return [Finding(key, "format", FLAG, "no 0-100 score")]
+        if len(scores) > 1 and not re.search(r"\b(100|[1-9]?[0-9])\s*%", answer):
+            # Several numbers and none marked as a percentage: which one is the score?
+            return [Finding(key, "format", ESCALATE, f"ambiguous score, candidates {sorted(scores)}")]
+    return []
+
+
+def check_length(key: str, answer: str) -> list[Finding]:
+    limit = MAX_ANSWER_CHARS.get(key, DEFAULT_MAX_ANSWER_CHARS)
+    if not answer.strip():
+        return [Finding(key, "length", FLAG, "empty answer")]
+    if len(answer) > limit:
+        return [Finding(key, "length", FLAG, f"{len(answer)} characters (limit {limit})")]
+    return []
+
+
+def check_answer(key: str, answer: str) -> list[Finding]:
+    """All tier 1 checks of a model answer."""
+    return check_format(key, answer) + check_length(key, answer) + check_pii(answer, key)
@@ -0,0 +1,152 @@
+from prompt_eng_recruiter import jd_as_context
+from helper import extract_match_score
+from typing import Callable, Iterable, Optional
+import asyncio
+import logging
+import json
+import os
+import re
+
+logger = logging.getLogger("analysis")
+
+# (question key, progress %, progress text) in execution order
+ANALYSIS_STEPS = [
+    ("q_meta", 5, "Extracting Job Metadata... (5%)"),
+    ("q3", 10, "Calculating Match Score... (10%)"),
+    ("q1", 20, "Analyzing Skills Gap... (20%)"),
+    ("q2", 30, "Evaluating Cultural & Technical Fit... (30%)"),
+    ("q4", 40, "Identifying Strengths... (40%)"),
+    ("q5", 55, "Identifying Opportunities... (55%)"),
+    ("q6", 70, "Checking for Red Flags... (70%)"),
+    ("q7", 80, "Drafting Cover Letter... (80%)"),
+    ("q8", 90, "Generating Interview Tips... (90%)"),
+    ("q9", 95, "Drafting Elevator Pitch... (95%)"),
+]
+
+
+# Long generative sections (cover letter, stand-out tips, elevator pitch), generated on demand
+LAZY_SECTIONS = ("q7", "q8", "q9")
+# Match score from which the lazy sections are generated with the analysis anyway
+LAZY_SECTIONS_MIN_SCORE = int(os.getenv("LAZY_SECTIONS_MIN_SCORE", "80"))
+
+
+def pending_sections(results: dict) -> list[str]:
+    """Lazy sections not generated yet."""
+    return [key for key in LAZY_SECTIONS if key not in results]
+
+
+def parse_job_meta(raw_text: str) -> dict:
+    """
+    Parses the q_meta answer (JSON with company and title).
+    :param raw_text: raw model output
+    :return: {"company": ..., "title": ...}, empty strings when parsing fails
+    """
+    clean_json_string = "None"
+    try:
+        # 1. Find the exact JSON brackets (ignores "Here is the JSON:" text)
+        match = re.search(r'\{.*}', raw_text, re.DOTALL)
+        if match:
+            clean_json_string = match.group(0)
+
+            # CLEANUP: Remove hidden web characters and newlines that break JSON
+            clean_json_string = clean_json_string.replace('\xa0', ' ').replace('\n', ' ').strip()
+
+            #  Parse with strict=False so Python ignores minor control character issues
+            job_meta = json.loads(clean_json_string, strict=False)
+            logger.info(f"ℹ️  Extracted: {job_meta.get('title', 'Unknown')} at {job_meta.get('company', 'Unknown')}")
+            return {"company": job_meta.get('company', 'Unknown'), "title": job_meta.get('title', 'Unknown')}
+
+        logger.warning(f"⚠️ No JSON brackets found. Raw output: {raw_text}")
+    except Exception as e:
+        # If it still fails, it prints exactly why so we can debug it
+        logger.warning(f"⚠️ Failed to parse metadata. Error: {e} | Raw String: {clean_json_string}")
+    return {"company": "", "title": ""}
+
+
+def store_answer(results: dict, key: str, answer: str):
+    """Stores a raw answer in the results dict using the result keys of the UI (company/title/score/qN)."""
+    if key == "q_meta":
+        results.update(parse_job_meta(answer))
+    elif key == "q3":
+        results['score'] = extract_match_score(answer)
+    else:
+        results[key] = answer
+
+
+def build_query(job_description: str, question: str) -> str:
+    """Query of one question: the Job Description as context, then the question prompt."""
+    return f"{jd_as_context(jd=job_description)}\n\n{question}"
+
+
+_NOT_GENERATED = "_Not generated (generate it from the app)._"
+
+
+def build_report(results: dict, jd_source: Optional[str]) -> str:
+    """
+    Builds the Markdown report of an analysis.
+    :param results: analysis results
+    :param jd_source: Job Description URL (None for raw text)
+    :return: Markdown report
+    """
+    report = f"# Candidate Analysis Report\n"
+    report += f"**Job Description:** {jd_source or 'Provided Text'}\n\n---\n\n"
+    report += f"## Match Score: {results.get('score', 0)}%\n\n"
+    report += f"### Skills Check\n{results.get('q1', '')}\n\n"
+    report += f"### Fit Conclusion\n{results.get('q2', '')}\n\n"
+    report += f"### Strengths\n{results.get('q4', '')}\n\n"
+    report += f"### Opportunities\n{results.get('q5', '')}\n\n"
+    report += f"### Red Flags\n{results.get('q6', '')}\n\n"
+    report += f"### Cover Letter\n{results.get('q7', _NOT_GENERATED)}\n\n"
+    report += f"### Differentiators\n{results.get('q8', _NOT_GENERATED)}\n\n"
+    report += f"### Elevator Pitch\n{results.get('q9', _NOT_GENERATED)}\n\n"
+    return report
+
+
+async def run_analysis_async(qa_chain, job_description: str, questions: dict[str, str],
+                             config: Optional[dict] = None, results: Optional[dict] = None,
+                             on_progress: Optional[Callable[[str, int, str, dict], None]] = None,
+                             keys: Optional[Iterable[str]] = None, lazy_min_score: Optional[int] = None,
+                             guardrails=None, answer_cache=None) -> dict:
+    """
+    Runs every analysis question against the RAG chain (async, so in-flight requests can be cancelled).
+    :param qa_chain: RetrievalQA chain of the resume
+    :param job_description: Job Description text
+    :param questions: prompt version (see get_prompt_ver)
+    :param config: RAG run config (callbacks)
+    :param results: partial results of an earlier run, those questions are skipped
+    :param on_progress: callback(question key, progress %, progress text, results so far) before each question
+    :param keys: only run these questions (default: all)
+    :param lazy_min_score: LAZY_SECTIONS are skipped below this match score (default: always generated)
+    :param guardrails: GuardrailPipeline checking every answer (its judge runs in the background)
+    :param answer_cache: AnalysisAnswerCache, stable sections are reused from similar earlier analyses
+    :return: results dict (company, title, score, q1..q9)
+    """
+    results = dict(results or {})
+    keys = set(keys) if keys is not None else None
+
+    for key, progress, text in ANALYSIS_STEPS:
+        done_key = {"q_meta": "company", "q3": "score"}.get(key, key)
+        if done_key in results or (keys is not None and key not in keys):
+            continue
+        if lazy_min_score is not None and key in LAZY_SECTIONS and results.get('score', 0) < lazy_min_score:
+            logger.info(f"ℹ️  {key} left for on-demand generation (score {results.get('score', 0)}% "
+                        f"< {lazy_min_score}%)")
+            continue
+        if on_progress:
+            on_progress(key, progress, text, results)
+        answer = None
+        if answer_cache is not None:
+            answer = await asyncio.to_thread(answer_cache.get, key)
+        if answer is None:
+            answer = await qa_chain.ainvoke({"query": build_query(job_description, questions[key])}, config=config or {})
+            answer = answer['result']
+            findings = len(guardrails.findings) if guardrails is not None else 0
+            if guardrails is not None:
+                answer = guardrails.check_answer(key, answer)
+            # Only answers without guardrails findings are offered to later analyses
+            if answer_cache is not None and (guardrails is None or len(guardrails.findings) == findings):
+                await asyncio.to_thread(answer_cache.put, key, answer)
+        store_answer(results, key, answer)
+
+    logger.info(f" ✅ Analysis and Assessment Completed ..!")
+    return results
@@ -0,0 +1,207 @@
+from langchain_community.vectorstores import FAISS
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_core.documents import Document
+from typing import Optional
+import numpy as np
+import logging
+import faiss
+import time
+import uuid
+import os
+
+logger = logging.getLogger("ann_index")
+
+# Supported index types (faiss index_factory strings)
+INDEX_FACTORIES = {
+    "flat": "Flat",                   # exact search, baseline
+    "ivf_flat": "IVF{nlist},Flat",    # inverted lists, exact vectors
+    "ivf_pq": "IVF{nlist},PQ{pq_m}x8",  # inverted lists, product-quantized vectors (fraction of the memory)
+    "hnsw": "HNSW{hnsw_m}",           # graph based, no training
+}
+
+# Index type of shared indexes (candidate pool), e.g. flat | ivf_flat | ivf_pq | hnsw
+ANN_INDEX_TYPE = os.getenv("ANN_INDEX_TYPE", "flat")
+# Below this number of vectors an exact flat index is always used
+ANN_MIN_VECTORS = int(os.getenv("ANN_MIN_VECTORS", "10000"))
+# Recall/latency knobs
+ANN_NPROBE = int(os.getenv("ANN_NPROBE", "16"))
+ANN_EF_SEARCH = int(os.getenv("ANN_EF_SEARCH", "64"))
+
+
+def default_nlist(n_vectors: int) -> int:
+    """Rule of thumb: ~4*sqrt(n) inverted lists, at least 1."""
+    return max(1, int(4 * np.sqrt(n_vectors)))
+
+
+def build_index(vectors: np.ndarray, kind: str = "flat", nlist: Optional[int] = None, pq_m: int = 16,
+                hnsw_m: int = 32, train_sample: int = 100_000, seed: int = 42,
+                min_vectors: Optional[int] = None) -> faiss.Index:
+    """
+    Builds (trains and fills) a faiss index of the requested type.
+    :param vectors: float32 matrix (n, d)
+    :param kind: one of INDEX_FACTORIES
+    :param nlist: number of IVF lists (default 4*sqrt(n))
+    :param pq_m: number of PQ sub-quantizers (must divide d)
+    :param hnsw_m: HNSW graph degree
+    :param train_sample: max number of vectors used for training
+    :param seed: random seed for the training sample
+    :param min_vectors: below this size a flat index is used (default ANN_MIN_VECTORS)
+    :return: faiss index holding all vectors
+    """
+    if kind not in INDEX_FACTORIES:
+        raise ValueError(f"Unknown index type {kind}, expected one of {list(INDEX_FACTORIES)}")
+
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    n, d = vectors.shape
+    # faiss needs ~39 training points per centroid
+    nlist = nlist or min(default_nlist(n), max(1, n // 39))
+    # Exact search is fast enough (and exact) on small corpora
+    min_vectors = ANN_MIN_VECTORS if min_vectors is None else min_vectors
+    if kind != "flat" and n < min_vectors:
+        logger.warning(f"⚠️ Only {n} vectors, using a flat index instead of {kind}")
+        kind = "flat"
+
+    factory = INDEX_FACTORIES[kind].format(nlist=nlist, pq_m=pq_m, hnsw_m=hnsw_m)
+    index = faiss.index_factory(d, factory)
+
+    if not index.is_trained:
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(n, size=min(n, train_sample), replace=False)]
+        logger.info(f"ℹ️  Training {factory} on {len(sample)} vectors ..")
+        index.train(sample)
+
+    index.add(vectors)
+    set_search_params(index)
+    logger.info(f"ℹ️  Built {factory} index with {index.ntotal} vectors")
+    return index
+
+
+def set_search_params(index: faiss.Index, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+    """
+    Sets the recall/latency knobs of an index (no-op for flat indexes).
+    :param index: faiss index
+    :param nprobe: number of IVF lists visited per query
+    :param ef_search: HNSW search queue size
+    """
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(nprobe or ANN_NPROBE, ivf.nlist)
+    hnsw = getattr(index, "hnsw", None)
+    if hnsw is not None:
+        hnsw.efSearch = ef_search or ANN_EF_SEARCH
+
+
+def index_kind(index: faiss.Index) -> str:
+    """Returns the INDEX_FACTORIES key matching a faiss index."""
+    if getattr(index, "hnsw", None) is not None:
+        return "hnsw"
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return "ivf_pq" if isinstance(faiss.downcast_index(ivf), faiss.IndexIVFPQ) else "ivf_flat"
+    return "flat"
+
+
+def recall_at_k(ann_ids: np.ndarray, exact_ids: np.ndarray) -> float:
+    """Mean fraction of the exact top-k neighbours found by the ANN search."""
+    k = exact_ids.shape[1]
+    hits = [len(np.intersect1d(a, e)) for a, e in zip(ann_ids, exact_ids)]
+    return float(np.sum(hits)) / (len(exact_ids) * k)
+
+
+def tune_search_params(index: faiss.Index, vectors: np.ndarray, queries: np.ndarray, k: int = 10,
+                       target_recall: float = 0.95) -> dict:
+    """
+    Picks the smallest nprobe / efSearch that reaches the target recall against exact search.
+    :param index: trained ANN index
+    :param vectors: the indexed vectors (for the exact ground truth)
+    :param queries: sample queries
+    :param k: neighbours per query
+    :param target_recall: recall@k to reach
+    :return: {"nprobe" | "ef_search": value, "recall": recall@k}
+    """
+    exact = faiss.IndexFlatL2(vectors.shape[1])
+    exact.add(np.ascontiguousarray(vectors, dtype="float32"))
+    _, exact_ids = exact.search(queries, k)
+
+    kind = index_kind(index)
+    if kind == "flat":
+        return {"recall": 1.0}
+
+    knob = "nprobe" if kind.startswith("ivf") else "ef_search"
+    upper = faiss.extract_index_ivf(index).nlist if knob == "nprobe" else 1024
+    value, recall = 1 if knob == "nprobe" else max(k, 16), 0.0
+    while True:
+        set_search_params(index, **{knob: value})
+        _, ann_ids = index.search(queries, k)
+        recall = recall_at_k(ann_ids, exact_ids)
+        if recall >= target_recall or value >= upper:
+            break
+        value = min(value * 2, upper)
+
+    logger.info(f"ℹ️  Tuned {kind}: {knob}={value} recall@{k}={recall:.3f}")
+    return {knob: value, "recall": recall}
+
+
+def build_vector_store(texts: list[str], vectors: np.ndarray, metadatas: list[dict], embeddings,
+                       kind: str = ANN_INDEX_TYPE) -> FAISS:
+    """
+    Creates a LangChain FAISS vector store backed by an index of the requested type.
+    :param texts: chunk texts
+    :param vectors: chunk embeddings (n, d)
+    :param metadatas: chunk metadata
+    :param embeddings: Embeddings model used for the queries
+    :param kind: one of INDEX_FACTORIES
+    :return: FAISS vector store
+    """
+    index = build_index(np.asarray(vectors, dtype="float32"), kind=kind)
+    ids = [str(uuid.uuid4()) for _ in texts]
+    docstore = InMemoryDocstore({
+        doc_id: Document(id=doc_id, page_content=text, metadata=metadata)
+        for doc_id, text, metadata in zip(ids, texts, metadatas)
+    })
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=dict(enumerate(ids))
+    )
+
+
+def benchmark_index(vectors: np.ndarray, queries: np.ndarray, kind: str, k: int = 10, **params) -> dict:
+    """
+    Offline recall / latency / memory benchmark of one index type against the flat baseline.
+    :param vectors: corpus (n, d)
+    :param queries: queries (q, d)
+    :param kind: one of INDEX_FACTORIES
+    :param k: neighbours per query
+    :param params: build_index / set_search_params parameters
+    :return: dict with build time, memory, recall@k and per-query latency percentiles
+    """
+    search_params = {key: params.pop(key) for key in ("nprobe", "ef_search") if key in params}
+
+    exact = faiss.IndexFlatL2(vectors.shape[1])
+    exact.add(vectors)
+    _, exact_ids = exact.search(queries, k)
+
+    start = time.perf_counter()
+    index = build_index(vectors, kind=kind, min_vectors=0, **params)
+    build_s = time.perf_counter() - start
+    if search_params:
+        set_search_params(index, **search_params)
+
+    latencies, ann_ids = [], []
+    for query in queries:
+        start = time.perf_counter()
+        _, ids = index.search(query[None, :], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        ann_ids.append(ids[0])
+
+    return {
+        "index": index_kind(index),
+        "build_s": round(build_s, 3),
+        "memory_mb": round(faiss.serialize_index(index).size / 1024 / 1024, 2),
+        f"recall@{k}": round(recall_at_k(np.array(ann_ids), exact_ids), 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        **search_params,
+    }
@@ -0,0 +1,312 @@
+"""
+Semantic answer cache: answers of the stable analysis sections are reused across near-identical
+(Job Description, resume) pairs, e.g. the same posting from another company or a slightly revised resume.
+
+Every analysis is one entry: the embedding of its compact JD and resume and its cacheable answers (SQLite, next
+to the history). A lookup searches a per-process faiss index of the entries and accepts a candidate only when
+both the JD and the resume similarity reach the threshold of the question, anything else is a live call.
+Entries expire after ANSWER_CACHE_TTL_DAYS, the least recently used are evicted beyond ANSWER_CACHE_MAX_ENTRIES.
+"""
+from history_store import HISTORY_DB
+from datetime import datetime, timedelta
+from contextlib import closing
+from typing import Callable, Optional, Union
+import numpy as np
+import threading
+import logging
+import sqlite3
+import faiss
+import json
+import os
+
+logger = logging.getLogger("answer_cache")
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+# Entries kept (least recently used evicted first) and their lifetime
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "2000"))
+ANSWER_CACHE_TTL_DAYS = float(os.getenv("ANSWER_CACHE_TTL_DAYS", "30"))
+# Characters of the whitespace-normalized JD / resume that are embedded
+ANSWER_CACHE_TEXT_CHARS = int(os.getenv("ANSWER_CACHE_TEXT_CHARS", "6000"))
+# Nearest entries checked against the thresholds on a lookup
+ANSWER_CACHE_CANDIDATES = 8
+
+# Cacheable questions and the cosine similarity both the JD and the resume must reach.
+# Skills table, selling points, upskilling and red flags only depend on the requirements and the resume.
+# Metadata, score, fit and the generated letters / pitches name the company or drive decisions: always live.
+ANSWER_CACHE_THRESHOLDS = {"q1": 0.96, "q4": 0.97, "q5": 0.96, "q6": 0.96}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answer_cache (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    prompt_version TEXT NOT NULL,
+    embedding_model TEXT NOT NULL,
+    resume_hash TEXT NOT NULL,
+    jd_hash TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    last_used_at TEXT NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    vector BLOB NOT NULL,
+    answers TEXT NOT NULL DEFAULT '{}',
+    UNIQUE (resume_hash, jd_hash, prompt_version, embedding_model)
+);
+CREATE INDEX IF NOT EXISTS idx_answer_cache_last_used ON answer_cache (last_used_at);
+"""
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def compact_text(text: str, max_chars: int = ANSWER_CACHE_TEXT_CHARS) -> str:
+    """Whitespace-normalized text, cut to max_chars (what is embedded)."""
+    return " ".join(text.split())[:max_chars]
+
+
+def pair_vector(jd_embedding, resume_embedding) -> np.ndarray:
+    """
+    Normalized JD and resume embeddings, concatenated and scaled so the inner product of two pair vectors is
+    the mean of the JD and the resume cosine similarities.
+    """
+    parts = [np.asarray(embedding, dtype="float32") for embedding in (jd_embedding, resume_embedding)]
+    parts = [part / (np.linalg.norm(part) or 1.0) for part in parts]
+    return (np.concatenate(parts) / np.sqrt(2)).astype("float32")
+
+
+def pair_similarities(vector_a: np.ndarray, vector_b: np.ndarray) -> tuple[float, float]:
+    """JD and resume cosine similarities of two pair vectors."""
+    half = len(vector_a) // 2
+    return float(2 * vector_a[:half] @ vector_b[:half]), float(2 * vector_a[half:] @ vector_b[half:])
+
+
+class AnswerCache:
+    """
+    Cache entries (SQLite, shared by every process) and their in-memory faiss indexes, one per prompt version and
+    embedding model. Entries added by other processes are loaded on the next lookup, entries deleted by them are
+    dropped when they come up as candidates.
+    """
+
+    def __init__(self, db_path: str = HISTORY_DB, max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+                 ttl_days: float = ANSWER_CACHE_TTL_DAYS):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl_days = ttl_days
+        self._lock = threading.Lock()
+        # (prompt version, embedding model) -> (index, highest entry id loaded)
+        self._indexes: dict[tuple[str, str], tuple[faiss.IndexIDMap2, int]] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def _expiry(self) -> str:
+        return (datetime.now() - timedelta(days=self.ttl_days)).isoformat(timespec="seconds")
+
+    def _sync_index(self, connection: sqlite3.Connection, space: tuple[str, str], dim: int):
+        """Adds the entries stored since the last sync to the index of a space (the query runs unlocked)."""
+        with self._lock:
+            _, last_id = self._indexes.get(space, (None, 0))
+        rows = connection.execute(
+            "SELECT id, vector FROM answer_cache WHERE prompt_version=? AND embedding_model=? AND id>? AND "
+            "created_at>=?", (*space, last_id, self._expiry())
+        ).fetchall()
+        with self._lock:
+            index, last_id = self._indexes.get(space) or (faiss.IndexIDMap2(faiss.IndexFlatIP(dim)), 0)
+            # Another thread may have added some of them meanwhile
+            rows = [row for row in rows if row["id"] > last_id and len(row["vector"]) == dim * 4]
+            if rows:
+                index.add_with_ids(np.stack([np.frombuffer(row["vector"], dtype="float32") for row in rows]),
+                                   np.array([row["id"] for row in rows], dtype="int64"))
+                last_id = max(row["id"] for row in rows)
+            self._indexes[space] = (index, last_id)
+
+    def _forget(self, ids: list[int]):
+        if ids:
+            selector = faiss.IDSelectorBatch(np.array(ids, dtype="int64"))
+            with self._lock:
+                for index, _ in self._indexes.values():
+                    index.remove_ids(selector)
+
+    def lookup(self, key: str, space: tuple[str, str], vector: np.ndarray,
+               threshold: float) -> Optional[dict]:
+        """
+        Best cached answer to a question for a (JD, resume) pair.
+        :param key: question key
+        :param space: (prompt version, embedding model)
+        :param vector: pair vector (see pair_vector)
+        :param threshold: minimum JD and resume similarity
+        :return: {"answer", "entry", "jd_similarity", "resume_similarity"} or None
+        """
+        with closing(self._connect()) as connection, connection:
+            self._sync_index(connection, space, len(vector))
+            # Only the faiss search is locked (the index is shared by every thread), not the SQLite work
+            with self._lock:
+                index, _ = self._indexes.get(space, (None, 0))
+                if index is None or index.ntotal == 0:
+                    return None
+                _, ids = index.search(vector[None, :], min(ANSWER_CACHE_CANDIDATES, index.ntotal))
+                ids = [int(entry_id) for entry_id in ids[0] if entry_id >= 0]
+                vectors = {entry_id: index.reconstruct(entry_id) for entry_id in ids}
+            placeholders = ", ".join("?" * len(ids))
+            rows = {row["id"]: row for row in connection.execute(
+                f"SELECT id, created_at, answers FROM answer_cache WHERE id IN ({placeholders})", ids
+            )}
+            self._forget([entry_id for entry_id in ids if entry_id not in rows])
+            expiry = self._expiry()
+            # Candidates in order of mean similarity, the first one passing both thresholds wins
+            for entry_id in ids:
+                row = rows.get(entry_id)
+                if row is None or row["created_at"] < expiry:
+                    continue
+                answer = json.loads(row["answers"]).get(key)
+                jd_similarity, resume_similarity = pair_similarities(vector, vectors[entry_id])
+                if answer is None or min(jd_similarity, resume_similarity) < threshold:
+                    continue
+                connection.execute("UPDATE answer_cache SET hits=hits+1, last_used_at=? WHERE id=?",
+                                   (_now(), entry_id))
+                return {"answer": answer, "entry": entry_id, "jd_similarity": round(jd_similarity, 4),
+                        "resume_similarity": round(resume_similarity, 4)}
+        return None
+
+    def store(self, key: str, answer: str, space: tuple[str, str], vector: np.ndarray, resume_hash: str,
+              jd_hash: str) -> int:
+        """
+        Adds an answer to the entry of a (JD, resume) pair (created on the first answer), then evicts.
+        :return: entry id
+        """
+        with closing(self._connect()) as connection, connection:
+            now = _now()
+            entry_id = connection.execute(
+                """INSERT INTO answer_cache (prompt_version, embedding_model, resume_hash, jd_hash, created_at,
+                                             last_used_at, vector, answers)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, json_object(?, ?))
+                   ON CONFLICT (resume_hash, jd_hash, prompt_version, embedding_model) DO UPDATE SET
+                       answers=json_set(answers, '$.' || ?, ?), last_used_at=excluded.last_used_at
+                   RETURNING id""",
+                (*space, resume_hash, jd_hash, now, now, vector.tobytes(), key, answer, key, answer)
+            ).fetchone()[0]
+            self._evict(connection)
+        return entry_id
+
+    def _evict(self, connection: sqlite3.Connection):
+        """Drops the expired entries and the least recently used ones beyond max_entries."""
+        evicted = [row["id"] for row in connection.execute(
+            """SELECT id FROM answer_cache WHERE created_at<?
+               UNION SELECT id FROM (SELECT id FROM answer_cache ORDER BY last_used_at DESC, id DESC
+                                     LIMIT -1 OFFSET ?)""",
+            (self._expiry(), self.max_entries)
+        )]
+        if evicted:
+            connection.executemany("DELETE FROM answer_cache WHERE id=?", [(entry_id,) for entry_id in evicted])
+            self._forget(evicted)
+            logger.info(f"ℹ️  Answer cache: {len(evicted)} entry(ies) evicted")
+
+    def clear(self):
+        """Drops every entry."""
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM answer_cache")
+        with self._lock:
+            self._indexes.clear()
+
+
+class AnalysisAnswerCache:
+    """
+    The answer cache bound to one analysis: its pair vector is computed once, on the first lookup or store of a
+    cacheable question, hits are recorded.
+    """
+
+    def __init__(self, cache: AnswerCache, space: tuple[str, str],
+                 vector: Union[np.ndarray, Callable[[], np.ndarray]], resume_hash: str, jd_hash: str,
+                 thresholds: Optional[dict[str, float]] = None):
+        """
+        :param vector: pair vector of the analysis, or the function computing it (called at most once)
+        """
+        self.cache = cache
+        self.space = space
+        self._embed = vector if callable(vector) else None
+        self.vector: Optional[np.ndarray] = None if callable(vector) else vector
+        self._vector_lock = threading.Lock()
+        self.resume_hash = resume_hash
+        self.jd_hash = jd_hash
+        self.thresholds = ANSWER_CACHE_THRESHOLDS if thresholds is None else thresholds
+        # Question key -> entry and similarities of the reused answer
+        self.hits: dict[str, dict] = {}
+
+    def cacheable(self, key: str) -> bool:
+        return key in self.thresholds
+
+    def _pair_vector(self) -> Optional[np.ndarray]:
+        """Pair vector of the analysis, None when computing it failed (the cache is then off for the analysis)."""
+        with self._vector_lock:
+            if self._embed is not None:
+                embed, self._embed = self._embed, None
+                try:
+                    self.vector = embed()
+                except Exception as e:
+                    logger.warning(f"⚠️ Answer cache disabled for this analysis, embedding failed: {e}")
+            return self.vector
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached answer to a question, None for a live call (not cacheable, no entry similar enough, errors)."""
+        if not self.cacheable(key) or (vector := self._pair_vector()) is None:
+            return None
+        try:
+            hit = self.cache.lookup(key, self.space, vector, self.thresholds[key])
+        except Exception as e:
+            logger.warning(f"⚠️ Answer cache lookup failed, answering live: {e}")
+            return None
+        if hit is None:
+            return None
+        answer = hit.pop("answer")
+        self.hits[key] = hit
+        logger.info(f"ℹ️  Answer cache hit for {key}: entry #{hit['entry']} (JD {hit['jd_similarity']:.1%}, "
+                    f"resume {hit['resume_similarity']:.1%} similar)")
+        return answer
+
+    def put(self, key: str, answer: str):
+        """Stores a live answer of a cacheable question (failures only cost the reuse)."""
+        if not self.cacheable(key) or (vector := self._pair_vector()) is None:
+            return
+        try:
+            self.cache.store(key, answer, self.space, vector, self.resume_hash, self.jd_hash)
+        except Exception as e:
+            logger.warning(f"⚠️ Answer cache store failed: {e}")
+
+
+_answer_cache: Optional[AnswerCache] = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    """Process-wide answer cache."""
+    global _answer_cache
+    with _answer_cache_lock:
+        if _answer_cache is None:
+            _answer_cache = AnswerCache()
+        return _answer_cache
+
+
+def open_answer_cache(job_description: str, resume_text: str, resume_hash: str, jd_hash: str,
+                      prompt_version: str, embeddings=None) -> Optional[AnalysisAnswerCache]:
+    """
+    Answer cache of one analysis. The JD and the resume are embedded together (one embedding call) when the first
+    cacheable question is asked: an analysis asking none of them makes no embedding call.
+    :param embeddings: embeddings model (default: the shared one of rag_implementation)
+    :return: AnalysisAnswerCache, None when disabled (ANSWER_CACHE_ENABLED=false)
+    """
+    if not ANSWER_CACHE_ENABLED:
+        return None
+    if embeddings is None:
+        from rag_implementation import get_embeddings
+        embeddings = get_embeddings()
+
+    def embed() -> np.ndarray:
+        jd_embedding, resume_embedding = embeddings.embed_documents(
+            [compact_text(job_description), compact_text(resume_text)]
+        )
+        return pair_vector(jd_embedding, resume_embedding)
+
+    space = (prompt_version, str(getattr(embeddings, "model", "")))
+    return AnalysisAnswerCache(get_answer_cache(), space, embed, resume_hash, jd_hash)
@@ -0,0 +1,340 @@
+"""
+Headless HTTP API of the AI Job Hunt Assistant (same pipeline as the Streamlit UI).
+
+    POST   /analyses                multipart: resume (PDF), jd_url or jd_text, prompt_version,
+                                    on_duplicate (ask | reuse | refresh | ignore)
+    GET    /analyses/{job_id}       status, partial results and report
+    DELETE /analyses/{job_id}       cancel a running analysis
+    POST   /analyses/{job_id}/duplicate   answer a near-duplicate JD (JSON: decision reuse | refresh | full)
+    POST   /analyses/{job_id}/sections    generate sections left out of a finished analysis
+                                          (JSON: sections, default all of q7 | q8 | q9), returns a new job
+    GET    /tracker                 list tracked applications
+    POST   /tracker                 add an application (JSON)
+    PUT    /tracker/{application_id}   update an application (JSON, partial)
+    DELETE /tracker/{application_id}   delete an application
+    GET    /tracker/export          download the tracker (?format=csv | parquet)
+    POST   /tracker/import          multipart: file (CSV or Parquet), replace=true to replace the tracker
+    GET    /health
+
+Run (from src/):
+    python api.py --port 8000
+
+The OpenAI client honours OPENAI_BASE_URL, point it to a local stand-in to test end to end.
+"""
+from helper import (load_tracker_data, update_tracker, export_tracker, import_tracker, concat_tracker_rows,
+                    migrate_tracker, new_application_id, TRACKER_COLUMNS, TRACKER_STATUSES)
+from job_queue import get_job_queue, ON_DUPLICATE_MODES, DUPLICATE_DECISIONS
+from jd_dedup import find_tracker_duplicates, describe_tracker_row
+from prompt_eng_recruiter import PROMPT_VERSION, PROMPT_VERSIONS
+from dataclasses import asdict
+from dotenv import load_dotenv
+from logging_config import setup_logging
+from aiohttp import web
+import pandas as pd
+import argparse
+import asyncio
+import logging
+import json
+import os
+
+# Central, queued logging (console and optional JSONL, see logging_config)
+setup_logging()
+
+logger = logging.getLogger("api")
+
+# load the env variables
+load_dotenv()
+
+# Requests handled at the same time, and analyses waiting or running, before answering 429
+API_MAX_CONCURRENT_REQUESTS = int(os.getenv("API_MAX_CONCURRENT_REQUESTS", "32"))
+API_MAX_QUEUE_DEPTH = int(os.getenv("API_MAX_QUEUE_DEPTH", "20"))
+API_MAX_UPLOAD_MB = int(os.getenv("API_MAX_UPLOAD_MB", "10"))
+
+# Request slots of the app (see concurrency_limit)
+SEMAPHORE = web.AppKey("semaphore", asyncio.Semaphore)
+
+
+def json_error(status: int, message: str, **extra) -> web.Response:
+    return web.json_response({"error": message, **extra}, status=status)
+
+
+async def read_json(request: web.Request) -> dict:
+    """JSON object body of a request, ValueError with a message for the client otherwise."""
+    try:
+        payload = await request.json()
+    except ValueError as e:  # json.JSONDecodeError, UnicodeDecodeError
+        raise ValueError(f"Request body must be valid JSON: {e}") from e
+    if not isinstance(payload, dict):
+        raise ValueError("Request body must be a JSON object")
+    return payload
+
+
+@web.middleware
+async def concurrency_limit(request: web.Request, handler):
+    """Backpressure: requests over the limit are rejected with 429 instead of piling up."""
+    semaphore = request.app[SEMAPHORE]
+    if semaphore.locked():
+        return json_error(429, "Too many concurrent requests", in_flight=API_MAX_CONCURRENT_REQUESTS)
+    async with semaphore:
+        return await handler(request)
+
+
+# --- Analyses ---
+async def submit_analysis(request: web.Request) -> web.Response:
+    queue = get_job_queue()
+    depth = queue.queue_depth()
+    if depth >= API_MAX_QUEUE_DEPTH:
+        return web.json_response(
+            {"error": "Analysis queue is full, retry later", "queue_depth": depth},
+            status=429, headers={"Retry-After": "30"}
+        )
+
+    try:
+        form = await request.post()
+    except ValueError as e:
+        return json_error(400, f"Request body must be multipart/form-data: {e}")
+    resume = form.get("resume")
+    jd_url = form.get("jd_url") or None
+    jd_text = form.get("jd_text") or None
+    prompt_version = form.get("prompt_version") or PROMPT_VERSION
+    # API clients usually can't answer the prompt, so reposts run in full unless asked otherwise
+    on_duplicate = form.get("on_duplicate") or "ignore"
+
+    # --- Validations ---
+    if resume is None or not hasattr(resume, "file"):
+        return json_error(400, "Please provide Resume PDF (multipart field 'resume')")
+    if not jd_url and not jd_text:
+        return json_error(400, "Please provide Job Description (jd_url or jd_text)")
+    if on_duplicate not in ON_DUPLICATE_MODES:
+        return json_error(400, f"on_duplicate must be one of {list(ON_DUPLICATE_MODES)}")
+    if prompt_version not in PROMPT_VERSIONS:
+        return json_error(400, f"prompt_version must be one of {list(PROMPT_VERSIONS)}")
+    if not os.getenv("OPENAI_API_KEY"):
+        return json_error(503, "OpenAI API Key is missing")
+
+    job_id = queue.submit(
+        resume_bytes=resume.file.read(),
+        resume_name=resume.filename,
+        jd_url=jd_url,
+        jd_text=jd_text,
+        prompt_version=prompt_version,
+        on_duplicate=on_duplicate
+    )
+    return web.json_response(
+        {"job_id": job_id, "status_url": f"/analyses/{job_id}", "queue_depth": queue.queue_depth()},
+        status=202
+    )
+
+
+async def get_analysis(request: web.Request) -> web.Response:
+    job = get_job_queue().get(request.match_info["job_id"])
+    if job is None:
+        return json_error(404, "Analysis not found")
+    return web.json_response(asdict(job))
+
+
+async def cancel_analysis(request: web.Request) -> web.Response:
+    job_id = request.match_info["job_id"]
+    if get_job_queue().get(job_id) is None:
+        return json_error(404, "Analysis not found")
+    cancelled = get_job_queue().cancel(job_id)
+    return web.json_response({"job_id": job_id, "cancelled": cancelled})
+
+
+async def resolve_duplicate(request: web.Request) -> web.Response:
+    job_id = request.match_info["job_id"]
+    if get_job_queue().get(job_id) is None:
+        return json_error(404, "Analysis not found")
+    try:
+        decision = (await read_json(request)).get("decision")
+    except ValueError as e:
+        return json_error(400, str(e))
+    if decision not in DUPLICATE_DECISIONS:
+        return json_error(400, f"decision must be one of {list(DUPLICATE_DECISIONS)}")
+    if not get_job_queue().resolve_duplicate(job_id, decision):
+        return json_error(409, "Analysis is not waiting for a decision")
+    return web.json_response({"job_id": job_id, "decision": decision})
+
+
+async def generate_sections(request: web.Request) -> web.Response:
+    from analysis import LAZY_SECTIONS, pending_sections
+    job_id = request.match_info["job_id"]
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return json_error(404, "Analysis not found")
+    if job.history_id is None:
+        return json_error(409, "Analysis is not finished")
+    try:
+        payload = await read_json(request) if request.can_read_body else {}
+    except ValueError as e:
+        return json_error(400, str(e))
+    sections = payload.get("sections") or pending_sections(job.results)
+    if not isinstance(sections, list) or set(sections) - set(LAZY_SECTIONS):
+        return json_error(400, f"sections must be some of {list(LAZY_SECTIONS)}")
+    if not sections:
+        return json_error(409, "Nothing to generate, every section is already in the analysis")
+    section_job_id = get_job_queue().submit_sections(job.history_id, sections)
+    return web.json_response(
+        {"job_id": section_job_id, "status_url": f"/analyses/{section_job_id}", "sections": sections},
+        status=202
+    )
+
+
+# --- Tracker ---
+def tracker_records(df: pd.DataFrame) -> list[dict]:
+    return json.loads(df.to_json(orient="records", date_format="iso"))
+
+
+def _validate_row(payload: dict, partial: bool = False) -> dict:
+    unknown = set(payload) - set(TRACKER_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown columns: {sorted(unknown)}")
+    if "Application ID" in payload:
+        raise ValueError("Application ID is assigned by the tracker")
+    if not partial and not (payload.get("Company") and payload.get("Job Title")):
+        raise ValueError("Company and Job Title are required")
+    if "Status" in payload and payload["Status"] not in TRACKER_STATUSES:
+        raise ValueError(f"Status must be one of {TRACKER_STATUSES}")
+    if payload.get("Match Score") is not None:
+        payload["Match Score"] = int(round(float(payload["Match Score"])))
+    if "Date Applied" in payload:
+        payload["Date Applied"] = pd.to_datetime(payload["Date Applied"])
+    return payload
+
+
+async def run_blocking(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+async def list_tracker(request: web.Request) -> web.Response:
+    df = await run_blocking(load_tracker_data)
+    return web.json_response(tracker_records(df))
+
+
+async def add_tracker_row(request: web.Request) -> web.Response:
+    try:
+        row = _validate_row(await read_json(request))
+    except (ValueError, TypeError) as e:
+        return json_error(400, str(e))
+    row.setdefault("Date Applied", pd.Timestamp.today().normalize())
+    row.setdefault("Status", "Applied")
+    row["Application ID"] = application_id = new_application_id()
+
+    def add(df):
+        duplicates = find_tracker_duplicates(df, row.get("URL"), row["Company"], row["Job Title"])
+        if duplicates:
+            row.setdefault("Duplicate Of", describe_tracker_row(df.loc[duplicates[0]]))
+        return concat_tracker_rows(df, pd.DataFrame([row]))
+
+    # Load-modify-save under the tracker lock, concurrent requests can't overwrite each other
+    df = await run_blocking(update_tracker, add)
+    return web.json_response(tracker_records(df[df["Application ID"] == application_id])[0], status=201)
+
+
+def _application_index(df: pd.DataFrame, application_id: str):
+    """
+    Index of an application in the tracker, KeyError when it is not there.
+    Rows are addressed by Application ID, positions shift as rows are added or deleted.
+    """
+    matches = df.index[df["Application ID"] == application_id]
+    if matches.empty:
+        raise KeyError(application_id)
+    return matches[0]
+
+
+async def update_tracker_row(request: web.Request) -> web.Response:
+    try:
+        changes = _validate_row(await read_json(request), partial=True)
+    except (ValueError, TypeError) as e:
+        return json_error(400, str(e))
+    application_id = request.match_info["application_id"]
+
+    def update(df):
+        row = _application_index(df, application_id)
+        for column, value in changes.items():
+            df.at[row, column] = value
+        return df
+
+    try:
+        df = await run_blocking(update_tracker, update)
+    except KeyError:
+        return json_error(404, "Application not found")
+    return web.json_response(tracker_records(df[df["Application ID"] == application_id])[0])
+
+
+async def delete_tracker_row(request: web.Request) -> web.Response:
+    application_id = request.match_info["application_id"]
+
+    def delete(df):
+        return df.drop(index=_application_index(df, application_id)).reset_index(drop=True)
+
+    try:
+        await run_blocking(update_tracker, delete)
+    except KeyError:
+        return json_error(404, "Application not found")
+    return web.json_response({"Application ID": application_id, "deleted": True})
+
+
+async def export_tracker_file(request: web.Request) -> web.Response:
+    file_format = request.query.get("format", "csv")
+    if file_format not in ("csv", "parquet"):
+        return json_error(400, "format must be csv or parquet")
+    content = await run_blocking(export_tracker, file_format)
+    return web.Response(
+        body=content,
+        content_type="text/csv" if file_format == "csv" else "application/vnd.apache.parquet",
+        headers={"Content-Disposition": f'attachment; filename="job_tracker.{file_format}"'}
+    )
+
+
+async def import_tracker_file(request: web.Request) -> web.Response:
+    try:
+        form = await request.post()
+    except ValueError as e:
+        return json_error(400, f"Request body must be multipart/form-data: {e}")
+    upload = form.get("file")
+    if upload is None or not hasattr(upload, "file"):
+        return json_error(400, "Please provide the export (multipart field 'file')")
+    file_format = "parquet" if upload.filename.endswith(".parquet") else "csv"
+    replace = str(form.get("replace", "false")).lower() == "true"
+    try:
+        df = await run_blocking(import_tracker, upload.file.read(), file_format, replace)
+    except ValueError as e:
+        return json_error(400, str(e))
+    return web.json_response({"rows": len(df), "replaced": replace})
+
+
+async def health(request: web.Request) -> web.Response:
+    return web.json_response({"status": "ok", "queue_depth": get_job_queue().queue_depth()})
+
+
+def create_app() -> web.Application:
+    migrate_tracker()
+    app = web.Application(
+        middlewares=[concurrency_limit],
+        client_max_size=API_MAX_UPLOAD_MB * 1024 * 1024
+    )
+    app[SEMAPHORE] = asyncio.Semaphore(API_MAX_CONCURRENT_REQUESTS)
+    app.add_routes([
+        web.post("/analyses", submit_analysis),
+        web.get("/analyses/{job_id}", get_analysis),
+        web.delete("/analyses/{job_id}", cancel_analysis),
+        web.post("/analyses/{job_id}/duplicate", resolve_duplicate),
+        web.post("/analyses/{job_id}/sections", generate_sections),
+        web.get("/tracker", list_tracker),
+        web.get("/tracker/export", export_tracker_file),
+        web.post("/tracker/import", import_tracker_file),
+        web.post("/tracker", add_tracker_row),
+        web.put("/tracker/{application_id}", update_tracker_row),
+        web.delete("/tracker/{application_id}", delete_tracker_row),
+        web.get("/health", health),
+    ])
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AI Job Hunt Assistant API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    web.run_app(create_app(), host=args.host, port=args.port)
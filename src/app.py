@@ -1,26 +1,23 @@
 # Libraries
 from streamlit_option_menu  import option_menu
-from ingestion import get_jd_with_playwright, get_pdf_text_pdfplumber
-from prompt_eng_recruiter import get_prompt_ver, jd_as_context
-from rag_implementation import get_rag_chain
-from helper import extract_match_score, DebugCallbackHandler, load_tracker_data, save_tracker_data
+# Scraping (Playwright), PDF backends and the RAG stack (LangChain, FAISS, OpenAI) are imported
+# on first use inside the pages, so the first page load does not pay for them
+from prompt_eng_recruiter import get_prompt_ver, jd_as_context, PROMPT_VERSION, PROMPT_VERSIONS
+from helper import (extract_match_score, load_tracker_data, save_tracker_data, append_tracker_rows,
+                    migrate_tracker, TRACKER_STATUSES)
+from job_queue import get_job_queue
 from css_template import sidebar_footer_style
 from dotenv import load_dotenv
 from datetime import datetime
 import streamlit as st
-import os, json, re
+import os
 import logging
 import pandas as pd
-from rich.logging import RichHandler
+from logging_config import setup_logging
 
 
-# Configure basic Logging config with RichHandler
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(message)s",
-    datefmt="%Y-%m-%d",
-    handlers=[RichHandler(rich_tracebacks=True)]
-)
+# Central, queued logging (console and optional JSONL, see logging_config)
+setup_logging()
 
 logger = logging.getLogger("app")
 
@@ -32,13 +29,22 @@ open_api_key = os.getenv("OPENAI_API_KEY")
 st.set_page_config(page_title="AI Job Hunt Assistant", page_icon="🚀", layout='wide')
 
 def main():
+    # Analyses and the candidate pool use this prompt set, a typo in the env would fail every submit
+    if PROMPT_VERSION not in PROMPT_VERSIONS:
+        logger.error(f"☠️ Unknown PROMPT_VERSION {PROMPT_VERSION}, registered: {list(PROMPT_VERSIONS)}")
+        st.error(f"☠️ Unknown PROMPT_VERSION '{PROMPT_VERSION}'. Set it to one of {list(PROMPT_VERSIONS)} "
+                 f"in your .env file.")
+        st.stop()
+    # Older trackers get their Application IDs once, on the first run of the process rather than at import
+    migrate_tracker()
+
     # 1. Set up the sidebar
     with st.sidebar:
         st.title("👔 AI Job Hunt Assistant")
         selected = option_menu(
             menu_title="Main Menu",
-            options=["Recruiter Assistance","Job Tracker", ], # Required
-            icons=["robot","clipboard-data"],  # Optional (Bootstrap icons)
+            options=["Recruiter Assistance","Candidate Pool","Job Tracker", ], # Required
+            icons=["robot","people","clipboard-data"],  # Optional (Bootstrap icons)
             menu_icon="cast",  # Optional
             default_index=0,  # Optional
 
@@ -46,6 +52,8 @@ def main():
     # 2. Logic to Switch Between "Pages"
     if selected == "Recruiter Assistance":
         ai_job_hunt()
+    elif selected == "Candidate Pool":
+        candidate_pool()
     elif selected == "Job Tracker":
         job_tracker()
 
@@ -74,7 +82,14 @@ def ai_job_hunt():
 
         # --- Reset Button ---
         if st.button("Reset Analysis"):
-            # Clear the specific session state keys
+            # Stop the running analysis and clear the specific session state keys
+            if st.session_state.get('job_id'):
+                get_job_queue().cancel(st.session_state['job_id'])
+                del st.session_state['job_id']
+                st.query_params.clear()
+            st.session_state.pop('analysis_history_id', None)
+            st.session_state.pop('section_jobs', None)
+            st.session_state.pop('section_errors', None)
             if 'analysis_results' in st.session_state:
                 del st.session_state['analysis_results']
             if 'full_report' in st.session_state:
@@ -101,13 +116,14 @@ def ai_job_hunt():
         st.session_state['analysis_results'] = None
     if 'full_report' not in st.session_state:
         st.session_state['full_report'] = None
-    # Initialize History
-    if 'history' not in st.session_state:
-        st.session_state['history'] = []
+    # Initialize History (browsed page by page from the persistent history store)
+    if 'history_page' not in st.session_state:
+        st.session_state['history_page'] = 0
 
     # --- Submit Button ---
 
     # 2. Trigger Analysis (COMPUTATION LAYER)
+    # The analysis runs as a background job, widget interactions and reruns don't abort it
     if submit:
         # --- Validations ---
         if not open_api_key:
@@ -120,191 +136,45 @@ def ai_job_hunt():
             st.error("⚠️ Please provide Job Description ...")
             st.stop()
 
-        # --- Job Description Validation ---
-        if jd_url:
-            job_description = get_jd_with_playwright(jd_url)
-            if job_description is None:
-                st.error("❌ Something went wrong accessing the URL.")
-                st.stop()
+        # Define the RAG Run Config dynamically
+        rag_run_config = {}
+        enable_verbose = os.getenv("VERBOSE_RAG_LOGS", "false")
+        if enable_verbose == 'True' or enable_verbose == 'true':
+            logger.info("🔧 Verbose RAG Logging is ENABLED")
+            from helper import DebugCallbackHandler
+            # Pass the handler if enabled
+            rag_run_config = {"callbacks": [DebugCallbackHandler()]}
         else:
-            job_description = jd_text
+            logger.info("🔧 Verbose RAG Logging is DISABLED")
+
+        # Cancel the previous analysis of this session, if still running
+        if st.session_state.get('job_id'):
+            get_job_queue().cancel(st.session_state['job_id'])
+
+        job_id = get_job_queue().submit(
+            resume_bytes=uploaded_resume.getvalue(),
+            resume_name=uploaded_resume.name,
+            jd_url=jd_url,
+            jd_text=jd_text,
+            prompt_version=PROMPT_VERSION,
+            config=rag_run_config
+        )
+        st.session_state['job_id'] = job_id
+        st.session_state['analysis_results'] = None
+        st.session_state['full_report'] = None
+        # Keep the job in the URL, a reloaded or reopened tab picks the analysis up again
+        st.query_params["job"] = job_id
 
-        # Get Resume Text
-        with st.spinner("Extracting text from Resume..."):
-            try:
-                # resume_text = get_pdf_text_pymupdf(uploaded_file=uploaded_resume)
-                resume_text = get_pdf_text_pdfplumber(uploaded_resume)
-            except Exception as e:
-                st.error(f"☠️ An error occurred reading the PDF: {uploaded_resume}")
-                st.stop()
+    # Re-attach to a job after a page reload
+    if not st.session_state.get('job_id') and st.query_params.get("job"):
+        st.session_state['job_id'] = st.query_params["job"]
 
-        # --- MAIN ANALYSIS LOOP WITH PROGRESS BAR ---
-        if resume_text and job_description:
-            try:
-                # 1. Setup Phase
-                # Initialize the progress bar
-                progress_bar = st.progress(1, text="Initializing AI 🧠 ..")
-                # 2. Define the RAG Run Config dynamically
-                rag_run_config = {}
-                enable_verbose = os.getenv("VERBOSE_RAG_LOGS", "false")
-                if enable_verbose == 'True' or enable_verbose == 'true':
-                    logger.info("🔧 Verbose RAG Logging is ENABLED")
-                    debug_handler = DebugCallbackHandler()
-                    # Pass the handler if enabled
-                    rag_run_config = {"callbacks": [debug_handler]}
-                else:
-                    logger.info("🔧 Verbose RAG Logging is DISABLED")
-                    # Empty config means no extra callbacks
-                    rag_run_config = {}
-
-                # Defining the RAG Chain
-                qa_chain = get_rag_chain(resume_text, uploaded_resume.name)
-                # Extracting the prompts to use
-                questions = get_prompt_ver(version="v2")
-                # Combining the Job Description as a context in base query
-                query = jd_as_context(jd=job_description)
-
-                # Storing the RESULTS
-                results = {}
-
-                #### Tracker integration
-                # 1.5 Extract Metadata (Company & Title)
-                progress_bar.progress(5, text="Extracting Job Metadata... (5%)")
-                try:
-
-                    meta_ans = qa_chain.invoke(
-                        {"query": f"{query}\n\n{questions['q_meta']}"},
-                        config=rag_run_config
-                    )
-
-                    raw_text = meta_ans['result']
-
-                    # 1. Find the exact JSON brackets (ignores "Here is the JSON:" text)
-                    match = re.search(r'\{.*}', raw_text, re.DOTALL)
-                    clean_json_string = "None"
-                    if match:
-                        clean_json_string = match.group(0)
-
-                        # CLEANUP: Remove hidden web characters and newlines that break JSON
-                        clean_json_string = clean_json_string.replace('\xa0', ' ').replace('\n', ' ').strip()
-
-                        #  Parse with strict=False so Python ignores minor control character issues
-                        job_meta = json.loads(clean_json_string, strict=False)
-
-                        # Save to results
-                        results['company'] = job_meta.get('company', 'Unknown')
-                        results['title'] = job_meta.get('title', 'Unknown')
-                        logger.info(f"ℹ️  Extracted: {results['title']} at {results['company']}")
-                    else:
-                        logger.warning(f"⚠️ No JSON brackets found. Raw output: {raw_text}")
-                        results['company'] = ""
-                        results['title'] = ""
-
-                except Exception as e:
-                    # If it still fails, it prints exactly why so we can debug it
-                    logger.warning(f"⚠️ Failed to parse metadata. Error: {e} | Raw String: {clean_json_string}")
-                    results['company'] = ""
-                    results['title'] = ""
-                #####
-
-                # 2. Q3 Match Score (10%)
-                progress_bar.progress(10, text="Calculating Match Score... (10%)")
-                logger.info(f" ✅ Analysis and Assessment Start ...")
-
-                q3_ans = qa_chain.invoke({
-                    "query": f"{query}\n\n{questions['q3']}"},
-                    config=rag_run_config
-                )
-                results['score'] = extract_match_score(q3_ans['result'])
-
-                # 3. Q1 Skills (20%)
-                progress_bar.progress(20, text="Analyzing Skills Gap... (20%)")
-                q1_ans = qa_chain.invoke({
-                    "query": f"{query}\n\n{questions['q1']}"},
-                    config=rag_run_config
-                )
-                results['q1'] = q1_ans['result']
-
-                # 4. Q2 Fit Check (30%)
-                progress_bar.progress(30, text="Evaluating Cultural & Technical Fit... (30%)")
-                q2_ans = qa_chain.invoke({
-                    "query": f"{query}\n\n{questions['q2']}"},
-                    config=rag_run_config
-                )
-                results['q2'] = q2_ans['result']
-
-                # 5. SWOT Analysis
-                progress_bar.progress(40, text="Identifying Strengths... (40%)")
-                q4_ans = qa_chain.invoke({
-                    "query": f"{query}\n\n{questions['q4']}"},
-                    config=rag_run_config
-                )
-                results['q4'] = q4_ans['result']
-
-                progress_bar.progress(55, text="Identifying Opportunities... (55%)")
-                q5_ans = qa_chain.invoke({
-                    "query": f"{query}\n\n{questions['q5']}"},
-                    config=rag_run_config
-                )
-                results['q5'] = q5_ans['result']
-
-                progress_bar.progress(70, text="Checking for Red Flags... (70%)")
-                q6_ans = qa_chain.invoke({
-                    "query": f"{query}\n\n{questions['q6']}"},
-                    config=rag_run_config
-                )
-                results['q6'] = q6_ans['result']
-
-                progress_bar.progress(80, text="Drafting Cover Letter... (80%)")
-                q7_ans = qa_chain.invoke({
-                    "query": f"{query}\n\n{questions['q7']}"},
-                    config=rag_run_config
-                )
-                results['q7'] = q7_ans['result']
-
-                progress_bar.progress(90, text="Generating Interview Tips... (90%)")
-                q8_ans = qa_chain.invoke({
-                    "query": f"{query}\n\n{questions['q8']}"},
-                    config=rag_run_config
-                )
-                results['q8'] = q8_ans['result']
-
-                q9_ans = qa_chain.invoke({
-                    "query": f"{query}\n\n{questions['q9']}"},
-                    config=rag_run_config
-                )
-                results['q9'] = q9_ans['result']
-
-                # Finish
-                progress_bar.progress(100, text="Analysis Complete! (100%)")
-                progress_bar.empty()
-
-                # --- BUILD REPORT & SAVE ---
-                report = f"# Candidate Analysis Report\n"
-                report += f"**Job Description:** {jd_url or 'Provided Text'}\n\n---\n\n"
-                report += f"## Match Score: {results['score']}%\n\n"
-                report += f"### Skills Check\n{results['q1']}\n\n"
-                report += f"### Fit Conclusion\n{results['q2']}\n\n"
-                report += f"### Strengths\n{results['q4']}\n\n"
-                report += f"### Opportunities\n{results['q5']}\n\n"
-                report += f"### Red Flags\n{results['q6']}\n\n"
-                report += f"### Cover Letter\n{results['q7']}\n\n"
-                report += f"### Differentiators\n{results['q8']}\n\n"
-                report += f"### Elevator Pitch\n{results['q9']}\n\n"
-
-                # SAVE TO SESSION STATE
-                st.session_state['analysis_results'] = results
-                st.session_state['full_report'] = report
-
-                # --- SAVE TO HISTORY (Your Logic Here) ---
-                # ... (Insert your history saving code here) ...
-
-                st.success("✅ Analysis and Assessment Completed ..!")
-                logger.info(f" ✅ Analysis and Assessment Completed ..!")
-
-            except Exception as e:
-                st.error(f"☠️ An error occurred: {e}")
-                st.stop()
+    job = get_job_queue().get(st.session_state['job_id']) if st.session_state.get('job_id') else None
+    if job is not None and st.session_state['analysis_results'] is None:
+        if job.finished:
+            show_job_outcome(job)
+        else:
+            analysis_progress(job.job_id)
 
     # 3. Render Results (DISPLAY LAYER)
     # This block runs if 'analysis_results' exists in memory, regardless of button clicks.
@@ -349,16 +219,17 @@ def ai_job_hunt():
                 st.error("Weaknesses", icon="🚨")
                 st.write(results['q6'])
 
+        # Cover letter, tips and pitch are generated on demand below the auto-generation score
         with tabs[2]:
             st.markdown("### 📝 Application Kit")
             with st.expander("Draft Cover Letter"):
-                st.write(results['q7'])
+                lazy_section(results, 'q7', st.write)
             with st.expander("**How to Stand Out:**"):
-                st.write(results['q8'])
+                lazy_section(results, 'q8', st.write)
 
         with tabs[3]:
             st.subheader("🎤 Interview Elevator Pitch")
-            st.info(results['q9'])
+            lazy_section(results, 'q9', st.info)
 
         # --- EXPORT BUTTON ---
         st.divider()
@@ -405,22 +276,309 @@ def ai_job_hunt():
                             "Job Title": title_input,
                             "Match Score": score_val,
                             "Status": "Applied",  # Default status
-                            "URL": jd_url if jd_url else jd_text,
-                            "Notes": f"AI Analysis mapped from resume: {uploaded_resume.name}"
+                            "URL": jd_url or jd_text or results.get('jd_source', ''),
+                            "Notes": f"AI Analysis mapped from resume: "
+                                     f"{uploaded_resume.name if uploaded_resume else results.get('resume_name', '')}"
                         }])
                     except Exception as e:
                         st.error(f"☠️ An error occurred: {e} - Data is not loaded correctly, reset the analysis and try the assessment again.. ")
                         st.stop()
 
 
-                    # 3. Append and Save
-                    df = pd.concat([df, new_entry], ignore_index=True)
-                    save_tracker_data(df)
+                    # 3. Flag reposts of a job that is already tracked
+                    duplicate_label = tracker_duplicate_label(df, new_entry.at[0, "URL"], company_input, title_input)
+                    new_entry["Duplicate Of"] = duplicate_label
+
+                    # 4. Append to the latest version of the tracker and Save
+                    append_tracker_rows(new_entry.to_dict("records"))
 
                     st.success(f"✅ {title_input} at {company_input} saved successfully!")
+                    if duplicate_label:
+                        st.warning(f"♻️ Looks like a repost of a tracked application: {duplicate_label}")
                 else:
                     st.error("⚠️ Please enter both the Company Name and Job Title to save.")
 
+    analysis_history()
+
+
+
+def analysis_history():
+    """Persistent history of analyses, loaded one page at a time."""
+    from history_store import list_history, count_history, get_analysis, HISTORY_PAGE_SIZE
+
+    st.divider()
+    with st.expander("🕘 Analysis History"):
+        search = st.text_input("Search (company, title, resume)", key="history_search")
+        total = count_history(search=search)
+        pages = max(1, -(-total // HISTORY_PAGE_SIZE))
+        page = min(st.session_state['history_page'], pages - 1)
+
+        for row in list_history(offset=page * HISTORY_PAGE_SIZE, limit=HISTORY_PAGE_SIZE, search=search):
+            col1, col2 = st.columns([5, 1])
+            with col1:
+                st.markdown(f"**{row['title'] or 'Unknown'}** at **{row['company'] or 'Unknown'}** "
+                            f"· {row['score']}% · {row['resume_name']}")
+                st.caption(f"{row['created_at']} · {row['jd_source']}")
+            with col2:
+                if st.button("Open", key=f"history_open_{row['id']}"):
+                    analysis = get_analysis(row['id'])
+                    st.session_state['analysis_results'] = {
+                        **analysis['results'], "resume_name": analysis['resume_name'], "jd_source": analysis['jd_source']
+                    }
+                    st.session_state['full_report'] = analysis['report']
+                    st.session_state['analysis_history_id'] = row['id']
+                    st.session_state.pop('job_id', None)
+                    st.query_params.clear()
+                    st.rerun()
+
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            if st.button("◀ Previous", disabled=page == 0):
+                st.session_state['history_page'] = page - 1
+                st.rerun()
+        with col2:
+            st.caption(f"Page {page + 1} of {pages} · {total} analyses")
+        with col3:
+            if st.button("Next ▶", disabled=page >= pages - 1):
+                st.session_state['history_page'] = page + 1
+                st.rerun()
+
+
+@st.fragment(run_every=2)
+def analysis_progress(job_id: str):
+    """Polls the background job and renders the partial results that are ready."""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return
+    if job.finished:
+        # Full rerun so the results section is rendered
+        st.rerun(scope="app")
+
+    st.progress(max(job.progress, 1), text=job.stage)
+    from job_queue import AWAITING_DECISION
+    if job.status == AWAITING_DECISION and job.duplicate:
+        duplicate_prompt(job)
+    if st.button("Cancel Analysis"):
+        get_job_queue().cancel(job_id)
+        st.rerun(scope="app")
+
+    results = job.results
+    if 'score' in results:
+        st.metric(label="Match Score:", value=f"{results['score']}%")
+    if results.get('title') or results.get('company'):
+        st.caption(f"{results.get('title', '')} at {results.get('company', '')}")
+    for key, label in [("q1", "Skills Check"), ("q2", "Fit Check")]:
+        if key in results:
+            with st.expander(f"**{label}:**"):
+                st.write(results[key])
+
+
+def duplicate_prompt(job):
+    """Asks what to do with a Job Description that is a near-duplicate of an earlier analysis."""
+    duplicate = job.duplicate
+    st.warning(f"♻️ This job looks like a repost ({duplicate['similarity']:.0%} similar) of "
+               f"**{duplicate['title'] or 'Unknown'}** at **{duplicate['company'] or 'Unknown'}**, "
+               f"analysed on {duplicate['created_at']}.")
+    for row in duplicate['tracker_rows']:
+        st.caption(f"Already in the Job Tracker: {row}")
+    decision = None
+    for column, (label, choice) in zip(st.columns(3), [("Reuse earlier analysis", "reuse"),
+                                                        ("Refresh score & fit", "refresh"),
+                                                        ("Run full analysis", "full")]):
+        with column:
+            if st.button(label):
+                decision = choice
+    if decision is not None and not get_job_queue().resolve_duplicate(job.job_id, decision):
+        # The job stopped waiting meanwhile (decision timeout, cancelled)
+        st.warning("⚠️ The analysis is no longer waiting for a decision, it went on without this choice.")
+
+
+def lazy_section(results: dict, key: str, render):
+    """Renders a lazy section, or the button generating it on demand (background job, polled)."""
+    if key in results:
+        render(results[key])
+        return
+    section_jobs = st.session_state.setdefault('section_jobs', {})
+    if key in section_jobs:
+        section_progress(key, section_jobs[key])
+        return
+
+    from analysis import LAZY_SECTIONS_MIN_SCORE
+    error = st.session_state.get('section_errors', {}).pop(key, None)
+    if error:
+        st.error(f"☠️ An error occurred: {error}")
+    st.caption(f"Not generated with the analysis (generated automatically from a {LAZY_SECTIONS_MIN_SCORE}% match).")
+    history_id = st.session_state.get('analysis_history_id')
+    if st.button("✍️ Generate", key=f"generate_{key}", disabled=history_id is None):
+        section_jobs[key] = get_job_queue().submit_sections(history_id, [key])
+        st.rerun()
+
+
+@st.fragment(run_every=2)
+def section_progress(key: str, job_id: str):
+    """Polls an on-demand section job, the updated analysis replaces the session results when it is done."""
+    from job_queue import DONE
+    job = get_job_queue().get(job_id)
+    if job is None or not job.finished:
+        st.progress(max(job.progress if job else 0, 1), text="Generating...")
+        return
+    del st.session_state['section_jobs'][key]
+    if job.status == DONE:
+        st.session_state['analysis_results'] = {**st.session_state['analysis_results'], **job.results}
+        st.session_state['full_report'] = job.report
+    else:
+        st.session_state.setdefault('section_errors', {})[key] = job.error or job.status
+    st.rerun(scope="app")
+
+
+def show_guardrail_findings(findings: list[dict]):
+    """Guardrails findings that need the user's attention (blocked or redacted content, flagged answers)."""
+    for finding in findings:
+        if finding['verdict'] == "block":
+            st.warning(f"🛡️ {finding['section']}: {finding['check']} blocked ({finding['detail']})")
+        elif finding['verdict'] == "flag":
+            st.caption(f"🛡️ {finding['section']}: {finding['check']} check flagged ({finding['detail']})")
+
+
+def show_job_outcome(job):
+    """Moves a finished job into the session (results and report), or reports why it did not complete."""
+    from job_queue import DONE, FAILED
+    if job.status == DONE:
+        st.session_state['analysis_results'] = job.results
+        st.session_state['full_report'] = job.report
+        st.session_state['analysis_history_id'] = job.history_id
+        if job.from_history:
+            st.info("♻️ Same resume and job description were analysed before, result loaded from history.")
+        if job.cached_answers:
+            labels = {"q1": "Skills Check", "q4": "Strengths", "q5": "Opportunities", "q6": "Weaknesses"}
+            st.caption("♻️ Reused from a near-identical earlier analysis: " + ", ".join(
+                f"{labels.get(key, key)} ({hit['jd_similarity']:.0%} similar JD)"
+                for key, hit in job.cached_answers.items()
+            ))
+        show_guardrail_findings(job.guardrails)
+        st.success("✅ Analysis and Assessment Completed ..!")
+    elif job.status == FAILED:
+        st.error(f"☠️ An error occurred: {job.error}")
+    else:
+        st.warning(f"⚠️ Analysis {job.status}. {len(job.results)} results were kept, submit again to restart it.")
+
+
+def candidate_pool():
+    st.header("👥 Candidate Pool Ranking")
+    st.markdown("Rank every stored resume against a job description, then run the full AI questions on the top candidates only.")
+
+    if not open_api_key:
+        st.error("⚠️ OpenAI API Key is missing. Please check your .env file.")
+        st.stop()
+
+    with st.form("rank_candidates_form"):
+        pool_jd_url = st.text_input("Job Description URL", placeholder="https://linkedin.com/jobs/")
+        pool_jd_text = st.text_area("Job Description Raw Text")
+        col1, col2 = st.columns(2)
+        with col1:
+            top_k = st.number_input("Top-K Candidates", min_value=1, max_value=100, value=10)
+        with col2:
+            analyse_top = st.checkbox("Run Match Score & Fit Check on the Top-K", value=False)
+        rank_btn = st.form_submit_button("Rank Candidates")
+
+    if rank_btn:
+        # Heavy subsystems, loaded on first use (cached by Python afterwards)
+        from ingestion import get_jd_with_playwright
+        from rag_implementation import get_embeddings
+        from candidate_pool import sync_candidate_pool, rank_candidates, analyse_top_candidates
+
+        if not pool_jd_url and not pool_jd_text:
+            st.error("⚠️ Please provide Job Description ...")
+            st.stop()
+        job_description = get_jd_with_playwright(pool_jd_url) if pool_jd_url else pool_jd_text
+        if job_description is None:
+            st.error("❌ Something went wrong accessing the URL.")
+            st.stop()
+
+        embeddings = get_embeddings()
+        with st.spinner("Syncing stored resumes into the pool..."):
+            sync_candidate_pool(embeddings)
+        with st.spinner("Ranking candidates..."):
+            ranking = rank_candidates(job_description, embeddings, top_k=int(top_k))
+
+        if ranking.empty:
+            st.info("No resumes stored yet. Analyse a resume in the Recruiter Assistance page first.")
+            st.stop()
+
+        if analyse_top:
+            with st.spinner(f"Analysing the top {len(ranking)} candidates..."):
+                questions = get_prompt_ver(version=PROMPT_VERSION)
+                answers = analyse_top_candidates(job_description, ranking, questions, ["q3", "q2"], embeddings)
+            ranking["AI Match Score"] = [extract_match_score(answers[c]["q3"]) for c in ranking["Candidate"]]
+            ranking["Fit Check"] = [answers[c]["q2"] for c in ranking["Candidate"]]
+
+        st.session_state['candidate_ranking'] = ranking
+
+    if st.session_state.get('candidate_ranking') is not None:
+        st.subheader("🏆 Ranking")
+        st.dataframe(
+            st.session_state['candidate_ranking'],
+            width='stretch',
+            column_config={
+                "Score": st.column_config.ProgressColumn(
+                    "Similarity Score", format="%.1f", min_value=0, max_value=100
+                ),
+            }
+        )
+
+
+def tracker_duplicate_label(df, url, company, title) -> str:
+    """Label of the tracked application a new entry is a repost of (empty when it is new)."""
+    from jd_dedup import find_tracker_duplicates, describe_tracker_row
+    rows = find_tracker_duplicates(df, url, company, title)
+    return describe_tracker_row(df.loc[rows[0]]) if rows else ""
+
+
+def tracker_funnel():
+    """Funnel, time-in-stage and weekly cohorts from the status event log (precomputed incrementally)."""
+    from tracker_analytics import get_funnel_analytics
+
+    analytics = get_funnel_analytics()
+    funnel = analytics.funnel()
+    if funnel["Applications"].iloc[0] == 0:
+        return
+
+    st.markdown("---")
+    st.subheader("🔁 Pipeline Funnel")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Applications reaching each stage**")
+        st.bar_chart(funnel["Applications"])
+        st.dataframe(funnel, width='stretch')
+    with col2:
+        st.markdown("**Days in stage**")
+        st.dataframe(analytics.time_in_stage(), width='stretch')
+        st.markdown("**Weekly cohorts (% reaching each stage)**")
+        st.dataframe(analytics.weekly_cohorts(), width='stretch')
+
+
+def tracker_export_import():
+    """Download the tracker (CSV / Parquet) or load applications from an export."""
+    from helper import export_tracker, import_tracker
+
+    with st.expander("⇅ Export / Import", expanded=False):
+        col1, col2 = st.columns(2)
+        col1.download_button("Download CSV", data=export_tracker("csv"), file_name="job_tracker.csv",
+                             mime="text/csv")
+        col2.download_button("Download Parquet", data=export_tracker("parquet"), file_name="job_tracker.parquet",
+                             mime="application/vnd.apache.parquet")
+
+        uploaded = st.file_uploader("Import applications (CSV or Parquet)", type=["csv", "parquet"])
+        replace = st.checkbox("Replace the tracker (default: append)")
+        if uploaded and st.button("Import"):
+            try:
+                file_format = "parquet" if uploaded.name.endswith(".parquet") else "csv"
+                df = import_tracker(uploaded.getvalue(), file_format, replace=replace)
+            except Exception as e:
+                st.error(f"☠️ Import failed: {e}")
+            else:
+                st.session_state['tracker_success_msg'] = f"✅ Imported {uploaded.name}, {len(df)} applications tracked"
+                st.rerun()
 
 
 def job_tracker():
@@ -432,43 +590,47 @@ def job_tracker():
     st.header("📊 Job Tracker tool")
     st.markdown("Keep track of your job applications, scores, and interview statuses.")
 
-    # 1. Load the data
-    df = load_tracker_data()
+    # 1. Load the data (the dashboard only reads the two columns it needs)
+    stats = load_tracker_data(columns=["Status", "Date Applied"])
 
     # 2. Dashboard Metrics
     st.subheader("📈 Quick Stats")
+    status_totals = stats['Status'].value_counts()
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Total Applied", len(df))
-    col2.metric("Interviewing", len(df[df['Status'] == 'Interviewing']) if not df.empty else 0)
-    col3.metric("Offers", len(df[df['Status'] == 'Offer']) if not df.empty else 0)
-    col4.metric("Rejected", len(df[df['Status'] == 'Rejected']) if not df.empty else 0)
+    col1.metric("Total Applied", len(stats))
+    col2.metric("Interviewing", int(status_totals.get('Interviewing', 0)))
+    col3.metric("Offers", int(status_totals.get('Offer', 0)))
+    col4.metric("Rejected", int(status_totals.get('Rejected', 0)))
 
     st.markdown("---")
     st.subheader("📈 Application Insights")
 
     # Only show charts if there is data in the tracker
-    if not df.empty:
+    if not stats.empty:
         # Create two columns for side-by-side charts
         chart_col1, chart_col2 = st.columns(2)
 
         with chart_col1:
             st.markdown("**Pipeline Status**")
             # Count how many applications are in each status
-            status_counts = df['Status'].value_counts()
+            status_counts = status_totals
             # Streamlit natively draws a bar chart from a Pandas Series
             st.bar_chart(status_counts)
 
         with chart_col2:
             st.markdown("**Application Activity Over Time**")
             # Ensure the 'Date Applied' column is treated as actual dates
-            timeline_counts = df.groupby(df['Date Applied'].dt.date).size()
+            timeline_counts = stats.groupby(stats['Date Applied'].dt.date).size()
             st.line_chart(timeline_counts)
             # Draw a line chart to show momentum
             st.line_chart(timeline_counts)
     else:
         st.info("Add some applications to see your visual insights!")
 
+    tracker_funnel()
+
     st.markdown("---")
+    df = load_tracker_data()
 
     # 3. Add a New Job Form
     with st.expander("➕ Add New Application", expanded=False):
@@ -479,8 +641,7 @@ def job_tracker():
                 new_title = st.text_input("Job Title*")
                 new_score = st.number_input("Match Score (%)", min_value=0, max_value=100, value=0)
             with colB:
-                new_status = st.selectbox("Status",
-                                          ["Applied", "Screening", "Interviewing", "Offer", "Rejected", "Ghosted"])
+                new_status = st.selectbox("Status", TRACKER_STATUSES)
                 new_url = st.text_input("Job URL")
                 new_date = st.date_input("Date Applied", datetime.today())
 
@@ -498,12 +659,14 @@ def job_tracker():
                         "Match Score": new_score,
                         "Status": new_status,
                         "URL": new_url,
-                        "Notes": new_notes
+                        "Notes": new_notes,
+                        "Duplicate Of": tracker_duplicate_label(df, new_url, new_company, new_title)
                     }])
-                    # Append and save
-                    df = pd.concat([df, new_row], ignore_index=True)
-                    save_tracker_data(df)
+                    # Append to the latest version of the tracker and save
+                    append_tracker_rows(new_row.to_dict("records"))
                     st.session_state['tracker_success_msg'] = f"✅ Job Application Added: Job Title {new_title} at {new_company}!"
+                    if new_row.at[0, "Duplicate Of"]:
+                        st.session_state['tracker_success_msg'] += f" (repost of {new_row.at[0, 'Duplicate Of']})"
                     st.rerun()  # Refresh the page to show the new data
                 else:
                     st.error("⚠️ Company Name and Job Title are required.")
@@ -525,7 +688,7 @@ def job_tracker():
                 "Status": st.column_config.SelectboxColumn(
                     "Status",
                     help="Current stage of the application",
-                    options=["Applied", "Screening", "Interviewing", "Offer", "Rejected", "Ghosted"],
+                    options=list(df['Status'].cat.categories),
                     required=True,
                 ),
                 "Match Score": st.column_config.ProgressColumn(
@@ -535,19 +698,23 @@ def job_tracker():
                     min_value=0,
                     max_value=100,
                 ),
-                "URL": st.column_config.LinkColumn("Job Link")
+                "URL": st.column_config.LinkColumn("Job Link"),
+                "Application ID": st.column_config.TextColumn("Application ID", disabled=True)
             }
         )
 
         # Save changes if the user edits the table directly
         # --- FIX: Safe string comparison to prevent the invisible Double-Rerun ---
         if not edited_df.astype(str).equals(df.astype(str)):
-            save_tracker_data(edited_df)
+            # Merged with the saved tracker if another session changed it since this page was loaded
+            save_tracker_data(edited_df, base_version=df.attrs.get('tracker_version'))
             # Use session state here too, so the toast survives the rerun!
             st.session_state['tracker_success_msg'] = "Tracker successfully updated!"
             st.rerun()
     else:
         st.info("No applications tracked yet. Use the form above to add your first one!")
 
+    tracker_export_import()
+
 if __name__ == "__main__":
     main()
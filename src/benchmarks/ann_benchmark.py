@@ -0,0 +1,64 @@
+"""
+Offline recall / latency / memory benchmark of the ANN index types against the flat baseline.
+
+Usage (from src/):
+    python -m benchmarks.ann_benchmark --n 200000 --d 384 --queries 500
+    python -m benchmarks.ann_benchmark --vectors vector_db/candidate_pool.faiss
+"""
+from ann_index import INDEX_FACTORIES, benchmark_index, build_index, tune_search_params
+import pandas as pd
+import numpy as np
+import argparse
+import faiss
+
+
+def synthetic_corpus(n: int, d: int, n_queries: int, n_clusters: int = 256, seed: int = 42):
+    """Clustered, unit-length vectors (close to the structure of text embeddings)."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, d)).astype("float32")
+    labels = rng.integers(0, n_clusters, size=n + n_queries)
+    data = centers[labels] + 0.35 * rng.normal(size=(n + n_queries, d)).astype("float32")
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    return np.ascontiguousarray(data[:n]), np.ascontiguousarray(data[n:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ANN index benchmark")
+    parser.add_argument("--n", type=int, default=100_000, help="corpus size (synthetic)")
+    parser.add_argument("--d", type=int, default=256, help="dimension (synthetic)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--vectors", help="benchmark the vectors of an existing .faiss index instead")
+    parser.add_argument("--kinds", nargs="+", default=list(INDEX_FACTORIES))
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    args = parser.parse_args()
+
+    if args.vectors:
+        index = faiss.read_index(args.vectors)
+        data = index.reconstruct_n(0, index.ntotal)
+        rng = np.random.default_rng(0)
+        query_ids = rng.choice(len(data), size=min(args.queries, len(data)), replace=False)
+        vectors, queries = data, data[query_ids]
+    else:
+        vectors, queries = synthetic_corpus(args.n, args.d, args.queries)
+
+    pq_m = next(m for m in (16, 8, 4, 2, 1) if vectors.shape[1] % m == 0)
+    rows = []
+    for kind in args.kinds:
+        params = {"pq_m": pq_m} if kind == "ivf_pq" else {}
+        # Default knobs, then the knobs tuned for the target recall
+        rows.append(benchmark_index(vectors, queries, kind, k=args.k, **params))
+        if kind != "flat":
+            tuned = tune_search_params(
+                build_index(vectors, kind=kind, min_vectors=0, **params), vectors, queries,
+                k=args.k, target_recall=args.target_recall
+            )
+            tuned.pop("recall")
+            rows.append(benchmark_index(vectors, queries, kind, k=args.k, **params, **tuned))
+
+    print(f"\nCorpus: {vectors.shape[0]} x {vectors.shape[1]}, {len(queries)} queries, k={args.k}\n")
+    print(pd.DataFrame(rows).fillna("").to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
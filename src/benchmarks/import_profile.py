@@ -0,0 +1,80 @@
+"""
+Import-time profile and cold-start budget of the Streamlit app.
+
+Runs `python -X importtime -c "import app"` in fresh interpreters, reports the slowest
+top-level packages and checks the median cold start against COLD_START_TARGET_S.
+
+Usage (from src/):
+    python -m benchmarks.import_profile
+    python -m benchmarks.import_profile --module rag_implementation --top 15
+"""
+from collections import defaultdict
+import subprocess
+import statistics
+import argparse
+import time
+import sys
+import os
+
+# Cold-start budget of `import app` (seconds, median of fresh interpreters)
+COLD_START_TARGET_S = float(os.getenv("COLD_START_TARGET_S", "1.0"))
+
+
+def import_times(module: str) -> dict[str, float]:
+    """
+    Cumulative import time (ms) of each package imported directly by `module`.
+    :param module: module to import
+    :return: {package: cumulative ms}
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env={**os.environ, "PYTHONDONTWRITEBYTECODE": "0"}
+    )
+    totals = defaultdict(float)
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        # Nesting is shown by 2 spaces per level, level 1 are the direct imports of `module`
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            totals[name.strip().split(".")[0]] += int(cumulative_us) / 1000
+    return dict(totals)
+
+
+def cold_start(module: str, runs: int) -> list[float]:
+    """Wall clock (s) of importing `module` in fresh interpreters."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {module}"], capture_output=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profile")
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--target", type=float, default=COLD_START_TARGET_S)
+    args = parser.parse_args()
+
+    # Warm the bytecode cache, the budget is about imports, not compilation
+    cold_start(args.module, 1)
+
+    totals = import_times(args.module)
+    print(f"\nSlowest direct imports of '{args.module}':\n")
+    for name, ms in sorted(totals.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {name:<30} {ms:9.1f} ms")
+
+    timings = cold_start(args.module, args.runs)
+    median = statistics.median(timings)
+    status = "✅ OK" if median <= args.target else "❌ OVER BUDGET"
+    print(f"\nCold start: median {median:.2f}s (min {min(timings):.2f}s, max {max(timings):.2f}s) "
+          f"target {args.target:.2f}s {status}\n")
+    sys.exit(0 if median <= args.target else 1)
+
+
+if __name__ == "__main__":
+    main()
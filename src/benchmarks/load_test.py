@@ -0,0 +1,265 @@
+"""
+Concurrent-session load test: N analyses submitted at once to the background job queue (the code path of
+ai_job_hunt()), against the local model stand-in and job board (benchmarks.mock_servers, in a separate process).
+Reports, for each N: throughput, p50/p95/p99 latency per stage and end to end, and memory per session.
+
+The URL path scrapes the mock job board with Playwright (Chromium must be installed), --jd text skips scraping.
+
+Usage (from src/):
+    python -m benchmarks.load_test --sessions 1 4 8 16
+    python -m benchmarks.load_test --sessions 8 32 --max-concurrency 8 --latency-ms 800 --error-rate 0.05
+    python -m benchmarks.load_test --jd text --json load_test.json
+"""
+from benchmarks.mock_servers import add_mock_arguments, mock_settings, serve, free_port, job_description, resume_text
+from collections import defaultdict
+from typing import Optional
+import multiprocessing
+import urllib.request
+import threading
+import tempfile
+import argparse
+import json
+import time
+import os
+import pandas as pd
+import psutil
+
+# Stage of a job status update (AnalysisJob.stage), the questions are labelled with their key
+STAGE_PREFIXES = [
+    ("Waiting in queue", "queue"),
+    ("Initializing", "init"),
+    ("Loading Job Description", "jd"),
+    ("Near-duplicate", "duplicate"),
+    ("Decision", "duplicate"),
+    ("Extracting text", "resume"),
+    ("Preparing the Resume", "context"),
+]
+# Wait for a worker slot again after the near-duplicate check
+REQUEUE_STAGE = "requeue"
+# Report, history and near-duplicate registration after the last question
+SAVE_STAGE = "save"
+PERCENTILES = (50, 95, 99)
+
+
+def stage_label(stage: str) -> str:
+    from analysis import ANALYSIS_STEPS
+    for key, _, text in ANALYSIS_STEPS:
+        if stage == text:
+            return key
+    return next((label for prefix, label in STAGE_PREFIXES if stage.startswith(prefix)), stage)
+
+
+def instrumented_queue(max_concurrency: int):
+    """JobQueue recording a timestamp at every status update of its jobs."""
+    from job_queue import JobQueue
+
+    class InstrumentedJobQueue(JobQueue):
+
+        def __init__(self, *args, **kwargs):
+            self.timelines: dict[str, list[tuple[float, str]]] = defaultdict(list)
+            super().__init__(*args, **kwargs)
+
+        def _save(self, job):
+            self.timelines[job.job_id].append((time.perf_counter(), stage_label(job.stage)))
+            super()._save(job)
+
+        def _find_duplicate(self, job, *args):
+            # The worker slot is released after the near-duplicate check, the analysis queues again for one
+            duplicate = super()._find_duplicate(job, *args)
+            self.timelines[job.job_id].append((time.perf_counter(), REQUEUE_STAGE))
+            return duplicate
+
+        async def _analyse(self, job, *args):
+            await super()._analyse(job, *args)
+            self.timelines[job.job_id].append((time.perf_counter(), SAVE_STAGE))
+
+    return InstrumentedJobQueue(max_concurrency=max_concurrency, jobs_dir="jobs")
+
+
+def stage_durations(timeline: list[tuple[float, str]]) -> dict[str, float]:
+    """Seconds spent in each stage (until the next update), and end to end."""
+    durations = defaultdict(float)
+    for (start, label), (end, _) in zip(timeline, timeline[1:]):
+        durations[label] += end - start
+    durations["total"] = timeline[-1][0] - timeline[0][0]
+    return dict(durations)
+
+
+def resume_pdf(n: int) -> bytes:
+    """Generated one-page resume n."""
+    import fitz
+    with fitz.open() as doc:
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 545, 800), resume_text(n), fontsize=8)
+        return doc.tobytes()
+
+
+class MemorySampler:
+    """Peak RSS of the process while running (sampled every interval seconds)."""
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.peak = self.process.memory_info().rss
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.process.memory_info().rss)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def mock_stats(base_url: str) -> dict:
+    with urllib.request.urlopen(f"{base_url}/stats", timeout=5) as response:
+        return json.load(response)
+
+
+def wait_for_server(base_url: str, timeout: float = 15):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return mock_stats(base_url)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def run_level(queue, sessions: int, first_jd: int, jd_mode: str, base_url: str,
+              timeout: float) -> tuple[dict, Optional[pd.DataFrame]]:
+    """
+    Submits `sessions` analyses at once and waits for all of them.
+    :return: summary row, per-stage percentiles (ms)
+    """
+    from job_queue import AWAITING_DECISION, DONE
+    from prompt_eng_recruiter import PROMPT_VERSION
+    stats_before = mock_stats(base_url)
+    baseline = psutil.Process().memory_info().rss
+    with MemorySampler() as memory:
+        start = time.perf_counter()
+        job_ids = []
+        for i in range(sessions):
+            n = first_jd + i
+            job_ids.append(queue.submit(
+                resume_bytes=resume_pdf(n), resume_name=f"loadtest_{n}.pdf",
+                jd_url=f"{base_url}/jobs/{n}" if jd_mode == "url" else None,
+                jd_text=job_description(n)[2] if jd_mode == "text" else None,
+                prompt_version=PROMPT_VERSION, config={}
+            ))
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            jobs = [queue.get(job_id) for job_id in job_ids]
+            for job in jobs:
+                # Generated JDs are not reposts, but never leave a session waiting for a user decision
+                if job.status == AWAITING_DECISION:
+                    queue.resolve_duplicate(job.job_id, "full")
+            if all(job.finished for job in jobs):
+                break
+            time.sleep(0.05)
+        wall = time.perf_counter() - start
+    stats_after = mock_stats(base_url)
+
+    jobs = [queue.get(job_id) for job_id in job_ids]
+    done = [job for job in jobs if job.status == DONE]
+    errors = pd.Series([job.error or job.status for job in jobs if job.status != DONE]).value_counts()
+    durations = pd.DataFrame([stage_durations(queue.timelines[job.job_id]) for job in done])
+    stages = None
+    row = {
+        "sessions": sessions, "done": len(done), "failed": len(jobs) - len(done), "wall s": round(wall, 2),
+        "analyses/min": round(len(done) / wall * 60, 1),
+        # Resume context strategies of the sessions (whole resume or retrieval)
+        "context": " ".join(f"{strategy}:{count}" for strategy, count in
+                            pd.Series([job.context_strategy for job in done], dtype=object).value_counts().items()),
+    }
+    if not durations.empty:
+        order = [label for label in ["queue", "init", "jd", REQUEUE_STAGE, "duplicate", "resume",
+                                             "context"] if label in durations]
+        order += [column for column in durations.columns if column not in order + [SAVE_STAGE, "total"]]
+        order += [SAVE_STAGE, "total"]
+        stages = pd.DataFrame({
+            f"p{p}": durations[order].quantile(p / 100) * 1000 for p in PERCENTILES
+        }).round(0)
+        row.update({f"total p{p} s": round(durations["total"].quantile(p / 100), 2) for p in PERCENTILES})
+    row.update({
+        "peak RSS MB": round(memory.peak / 1e6, 1),
+        "MB/session": round(max(memory.peak - baseline, 0) / 1e6 / sessions, 2),
+        "model calls": stats_after["chat"] + stats_after["embeddings"] - stats_before["chat"]
+                       - stats_before["embeddings"],
+        "mock errors": stats_after["errors"] - stats_before["errors"],
+    })
+    for error, count in errors.items():
+        print(f"  {count} session(s) not done: {error}")
+    return row, stages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8, 16],
+                        help="concurrent analyses, one run per value")
+    parser.add_argument("--max-concurrency", type=int, help="job queue workers (default ANALYSIS_MAX_CONCURRENCY)")
+    parser.add_argument("--jd", choices=["url", "text"], default="url", help="scrape the mock job board or pass text")
+    parser.add_argument("--warmup", type=int, default=1, help="sessions run first, not reported")
+    parser.add_argument("--timeout", type=float, default=900, help="seconds per run")
+    parser.add_argument("--mock-url", help="use an already running mock (benchmarks.mock_servers)")
+    parser.add_argument("--json", help="write the results to this file")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    mock = None
+    base_url = args.mock_url
+    if base_url is None:
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        mock = multiprocessing.Process(target=serve, args=(mock_settings(args), "127.0.0.1", port), daemon=True)
+        mock.start()
+    base_url = base_url.rstrip("/")
+    wait_for_server(base_url)
+
+    # Every model client of the app talks to the mock, the app's own logs are kept to warnings
+    os.environ.update({"OPENAI_BASE_URL": f"{base_url}/v1", "OPENAI_API_BASE": f"{base_url}/v1",
+                       "OPENAI_API_KEY": "mock"})
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    from job_queue import ANALYSIS_MAX_CONCURRENCY, _load_pipeline
+    _load_pipeline()
+    max_concurrency = args.max_concurrency or ANALYSIS_MAX_CONCURRENCY
+
+    results, working_dir = [], os.getcwd()
+    # History, vector stores and job files of the run are thrown away
+    with tempfile.TemporaryDirectory(prefix="load_test_") as folder:
+        os.chdir(folder)
+        try:
+            queue = instrumented_queue(max_concurrency)
+            first_jd = 0
+            if args.warmup:
+                run_level(queue, args.warmup, first_jd, args.jd, base_url, args.timeout)
+                first_jd += args.warmup
+            for sessions in args.sessions:
+                print(f"\n{sessions} concurrent session(s), {max_concurrency} worker(s)")
+                row, stages = run_level(queue, sessions, first_jd, args.jd, base_url, args.timeout)
+                first_jd += sessions
+                if stages is not None:
+                    print(stages.rename_axis("stage (ms)").to_string())
+                results.append({**row, "stages": None if stages is None else stages.to_dict(orient="index")})
+        finally:
+            os.chdir(working_dir)
+            if mock is not None:
+                mock.terminate()
+
+    summary = pd.DataFrame([{key: value for key, value in row.items() if key != "stages"} for row in results])
+    print(f"\nMock: {mock_settings(args)}\n")
+    print(summary.to_string(index=False))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"settings": vars(args), "max_concurrency": max_concurrency, "runs": results}, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Local stand-ins for the load test: an OpenAI-compatible API (chat completions and embeddings) with configurable
+latency, error rate and token throughput, and a job board serving generated Job Description pages.
+
+Usage (from src/), e.g. to point a running app at it with OPENAI_BASE_URL=http://127.0.0.1:8090/v1:
+    python -m benchmarks.mock_servers --port 8090 --latency-ms 400 --tokens-per-s 60 --error-rate 0.02
+"""
+from dataclasses import dataclass, asdict
+from typing import Optional
+from aiohttp import web
+import numpy as np
+import argparse
+import asyncio
+import base64
+import random
+import socket
+import time
+import zlib
+
+_VOCABULARY = (
+    "python sql spark airflow kafka kubernetes docker terraform aws gcp azure pandas numpy pytorch tensorflow "
+    "fastapi django flask react typescript golang rust java scala postgres mongodb redis elasticsearch "
+    "snowflake dbt tableau grafana prometheus linux bash git ci cd microservices rest graphql grpc security "
+    "pipelines streaming batch warehouse lakehouse modelling analytics experimentation forecasting "
+    "recommendation search ranking nlp llm rag embeddings vision mlops monitoring observability reliability "
+    "scalability latency throughput ownership mentoring stakeholders roadmap agile collaboration communication"
+).split()
+_COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises", "Soylent"]
+_TITLES = ["Data Engineer", "Backend Developer", "ML Engineer", "Site Reliability Engineer", "Analytics Engineer"]
+
+
+@dataclass
+class MockSettings:
+    latency_ms: float = 300         # time to first token of a chat completion
+    jitter_ms: float = 100          # uniform extra latency, 0..jitter
+    tokens_per_s: float = 80        # completion token throughput (per request)
+    completion_tokens: int = 250    # length of free-text answers (score / JSON answers are short)
+    error_rate: float = 0.0         # share of requests answered with error_status
+    error_status: int = 500
+    embedding_latency_ms: float = 50
+    embedding_dim: int = 1536
+    score: int = 85                 # match score answered to q3 (drives the lazy sections)
+
+
+def job_description(n: int) -> tuple[str, str, str]:
+    """Generated Job Description n (deterministic, different enough not to be near-duplicates)."""
+    rng = random.Random(n)
+    company, title = rng.choice(_COMPANIES), rng.choice(_TITLES)
+    skills = ", ".join(rng.sample(_VOCABULARY, 12))
+    body = " ".join(rng.choice(_VOCABULARY) for _ in range(350))
+    text = (f"{title} at {company} (posting {n})\n\nAbout the role: {body}\n\nRequirements: {skills}.\n"
+            f"Location: Remote. Reference LT-{n:06d}.")
+    return company, title, text
+
+
+def resume_text(n: int) -> str:
+    """Generated one-page resume n (text)."""
+    _, title, text = job_description(100_000 + n)
+    return (f"Candidate {n}\ncandidate{n}@example.com\n\n{title}, 6 years of experience.\n\n"
+            f"Experience\n{text[:1800]}\n\nEducation\nBSc Computer Science")
+
+
+def _completion_text(prompt: str, settings: MockSettings, rng: random.Random) -> str:
+    # Answers the analysis questions the way the parsers expect (see prompt_eng_recruiter v2)
+    if "valid JSON object" in prompt:
+        return f'{{"company": "{rng.choice(_COMPANIES)}", "title": "{rng.choice(_TITLES)}"}}'
+    if "integer number between 0 and 100" in prompt:
+        return str(settings.score)
+    return " ".join(rng.choice(_VOCABULARY) for _ in range(settings.completion_tokens))
+
+
+def _embedding(text: str, dim: int) -> np.ndarray:
+    vector = np.random.default_rng(zlib.crc32(text.encode())).standard_normal(dim).astype("float32")
+    return vector / np.linalg.norm(vector)
+
+
+def build_app(settings: MockSettings) -> web.Application:
+    stats = {"chat": 0, "embeddings": 0, "pages": 0, "errors": 0, "completion_tokens": 0}
+    rng = random.Random(0)
+
+    def maybe_fail() -> Optional[web.Response]:
+        """An OpenAI-style error response for error_rate of the requests."""
+        if settings.error_rate and rng.random() < settings.error_rate:
+            stats["errors"] += 1
+            return web.json_response({"error": {"message": "mock failure", "type": "server_error", "code": None}},
+                                     status=settings.error_status)
+        return None
+
+    async def chat_completions(request: web.Request) -> web.Response:
+        body = await request.json()
+        stats["chat"] += 1
+        await asyncio.sleep((settings.latency_ms + rng.random() * settings.jitter_ms) / 1000)
+        error = maybe_fail()
+        if error is not None:
+            return error
+        prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        text = _completion_text(prompt, settings, rng)
+        completion_tokens = len(text.split())
+        stats["completion_tokens"] += completion_tokens
+        await asyncio.sleep(completion_tokens / settings.tokens_per_s)
+        prompt_tokens = len(prompt) // 4
+        return web.json_response({
+            "id": f"chatcmpl-mock-{stats['chat']}", "object": "chat.completion", "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+    async def embeddings(request: web.Request) -> web.Response:
+        body = await request.json()
+        stats["embeddings"] += 1
+        await asyncio.sleep(settings.embedding_latency_ms / 1000)
+        error = maybe_fail()
+        if error is not None:
+            return error
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        data = []
+        for i, item in enumerate(inputs):
+            vector = _embedding(str(item), settings.embedding_dim)
+            # The OpenAI client asks for base64 by default
+            encoded = (base64.b64encode(vector.tobytes()).decode() if body.get("encoding_format") == "base64"
+                       else vector.tolist())
+            data.append({"object": "embedding", "index": i, "embedding": encoded})
+        return web.json_response({"object": "list", "data": data, "model": body.get("model", "mock"),
+                                  "usage": {"prompt_tokens": 0, "total_tokens": 0}})
+
+    async def job_page(request: web.Request) -> web.Response:
+        stats["pages"] += 1
+        company, title, text = job_description(int(request.match_info["n"]))
+        paragraphs = "".join(f"<p>{paragraph}</p>" for paragraph in text.split("\n\n"))
+        return web.Response(content_type="text/html", text=(
+            f"<html><head><title>{title} - {company}</title></head><body><nav>Jobs | Companies</nav>"
+            f"<main><h1>{title}</h1><h2>{company}</h2>{paragraphs}</main><footer>Mock job board</footer>"
+            f"</body></html>"
+        ))
+
+    async def get_stats(request: web.Request) -> web.Response:
+        return web.json_response({**stats, "settings": asdict(settings)})
+
+    app = web.Application(client_max_size=64 * 1024 * 1024)
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    app.router.add_post("/v1/embeddings", embeddings)
+    app.router.add_get("/jobs/{n}", job_page)
+    app.router.add_get("/stats", get_stats)
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(settings: MockSettings, host: str = "127.0.0.1", port: int = 8090):
+    """Runs the mock API and the job board (blocking, meant for a separate process)."""
+    web.run_app(build_app(settings), host=host, port=port, print=None, access_log=None)
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser):
+    defaults = MockSettings()
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms)
+    parser.add_argument("--tokens-per-s", type=float, default=defaults.tokens_per_s)
+    parser.add_argument("--completion-tokens", type=int, default=defaults.completion_tokens)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--error-status", type=int, default=defaults.error_status)
+    parser.add_argument("--embedding-latency-ms", type=float, default=defaults.embedding_latency_ms)
+    parser.add_argument("--embedding-dim", type=int, default=defaults.embedding_dim)
+    parser.add_argument("--score", type=int, default=defaults.score)
+
+
+def mock_settings(args: argparse.Namespace) -> MockSettings:
+    return MockSettings(**{name: getattr(args, name) for name in asdict(MockSettings())})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI API and job board")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+    print(f"Mock OpenAI API on http://{args.host}:{args.port}/v1, job pages on http://{args.host}:{args.port}/jobs/<n>")
+    serve(mock_settings(args), args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""
+Prompt-version profiler: runs registered prompt versions (prompt_eng_recruiter.PROMPT_VERSIONS) over a fixed
+offline corpus of resume / Job Description pairs, through the analysis chain (recruiter template, whole resume
+as context) and a deterministic stand-in model.
+
+Reports per version and question: rendered prompt tokens, completion tokens, model latency, local overhead and
+parse success, and the tokens, sequential model time and cost of a full analysis. An answer parses when it passes
+the guardrails format checks (q_meta JSON, a single q3 score, a non-empty answer within the length limit) and the
+parsers the analysis stores it with read it: analysis.parse_job_meta a company and a title, helper.extract_match_score
+the score (with the stand-in, the very score it answered).
+
+The stand-in answers in the format a question asks for (a bare integer, a JSON object, a table, N bullet points,
+N sentences, ...) with the completion size that format implies, and its latency is modelled from the token
+counts. A prompt that does not pin its output down gets the loose answer a model tends to give, and shows up as
+parse failures and longer completions. Strict answers also drift out of their format at a fixed rate (--drift:
+fences, prose around the JSON or the score, a Python dict, a score out of 100), so the stand-in parse rate is a
+modelled figure: only --live measures how often the model itself keeps the format.
+
+Usage (from src/):
+    python -m benchmarks.prompt_profile
+    python -m benchmarks.prompt_profile --versions v2 --pairs 20
+    python -m benchmarks.prompt_profile --candidate my_prompts.json    # {question key: prompt}, not registered yet
+    python -m benchmarks.prompt_profile --live --pairs 2
+"""
+from benchmarks.mock_servers import job_description, resume_text
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessage
+from langchain_core.documents import Document
+from typing import Optional
+import argparse
+import logging
+import random
+import json
+import time
+import zlib
+import re
+import os
+import pandas as pd
+
+# Words of a generated answer
+_WORDS = ("experience delivered pipelines python platform team data reliability migration ownership skills "
+          "project role requirements cloud production improved designed scalable stakeholders impact").split()
+_NUMBER_WORDS = {"two": 2, "three": 3, "four": 4, "five": 5, "six": 6}
+_COUNT = r"(\d+|two|three|four|five|six)"
+# Output format cues of a question, first match wins: (format, pattern)
+_FORMATS = [
+    ("json", re.compile(r"\bJSON\b")),
+    ("integer", re.compile(r"\bonly\b[^.]*\b(integer|number)\b", re.IGNORECASE)),
+    ("table", re.compile(r"\btable\b", re.IGNORECASE)),
+    ("letter", re.compile(r"\bcover letter\b", re.IGNORECASE)),
+    ("speech", re.compile(rf"\b{_COUNT}-minute\b|\bspeech\b|\bpitch\b", re.IGNORECASE)),
+    ("sentences", re.compile(rf"\b{_COUNT}-sentence", re.IGNORECASE)),
+    ("items", re.compile(rf"\b{_COUNT}\s+(?:[\w\"'-]+\s+){{0,2}}\"?(?:points|areas|ways|skills|bullets|reasons)\b",
+                         re.IGNORECASE)),
+]
+# Expected completion tokens: per item / sentence / spoken minute, per table cell, of the fixed-size formats
+TOKENS_PER_ITEM = 45
+TOKENS_PER_SENTENCE = 25
+TOKENS_PER_MINUTE = 170
+TOKENS_PER_CELL = 12
+EXPECTED_TOKENS = {"json": 20, "integer": 2, "letter": 380, "open": 300}
+# No answer word is longer than this, so filling the missing tokens with missing / 4 words never overshoots by much
+MAX_TOKENS_PER_WORD = 4
+# Share of the strict (JSON, integer) answers of the stand-in that drift out of their format
+FORMAT_DRIFT = 0.1
+
+
+def _count(text: Optional[str], default: int) -> int:
+    if not text:
+        return default
+    return int(text) if text.isdigit() else _NUMBER_WORDS.get(text.lower(), default)
+
+
+def _count_before(word: str, text: str, default: int) -> int:
+    """The count in e.g. "top 5" / "three columns"."""
+    pattern = rf"\btop\s+{_COUNT}\b" if word == "top" else rf"\b{_COUNT}\s+{word}\b"
+    match = re.search(pattern, text, re.IGNORECASE)
+    return _count(match.group(1) if match else None, default)
+
+
+def question_of(prompt: str) -> str:
+    """The question part of a rendered prompt (after the Job Description, see prompt_eng_recruiter.jd_as_context)."""
+    return prompt.rsplit("Answer this:", 1)[-1]
+
+
+def expected_completion(question: str) -> tuple[str, int, int]:
+    """
+    Output format a question asks for and the completion it implies.
+    :return: (format, count of items / sentences / minutes / table rows, expected completion tokens)
+    """
+    for kind, pattern in _FORMATS:
+        match = pattern.search(question)
+        if match is None:
+            continue
+        if kind == "table":
+            rows, columns = _count_before("top", question, 5), _count_before("columns", question, 3)
+            return kind, rows, (rows + 1) * columns * TOKENS_PER_CELL
+        if kind in ("items", "sentences", "speech"):
+            count = _count(next((group for group in match.groups() if group), None), 2 if kind == "speech" else 3)
+            per = {"items": TOKENS_PER_ITEM, "sentences": TOKENS_PER_SENTENCE, "speech": TOKENS_PER_MINUTE}[kind]
+            return kind, count, count * per
+        return kind, 1, EXPECTED_TOKENS[kind]
+    return "open", 1, EXPECTED_TOKENS["open"]
+
+
+def _drifted(kind: str, answer: str, score: int, rng: random.Random) -> str:
+    """A strict answer as a model sometimes gives it anyway: some variants still parse, some do not."""
+    if kind == "json":
+        return rng.choice([
+            f"```json\n{answer}\n```",
+            f"{answer}\nLet me know if you need anything else.",
+            answer.replace('"', "'"),
+            answer.replace("}", ",}"),
+        ])
+    return rng.choice([
+        f"```\n{answer}\n```",
+        f"Match score: {answer}",
+        f"{score}/100",
+        f"{answer}\n\nThe candidate meets {rng.randint(3, 7)} of {rng.randint(8, 10)} requirements.",
+    ])
+
+
+def _stand_in_rng(prompt: str) -> random.Random:
+    return random.Random(zlib.crc32(prompt.encode("utf-8")))
+
+
+def stand_in_score(prompt: str) -> int:
+    """The match score the stand-in gives in its answer to a rendered prompt."""
+    return _stand_in_rng(prompt).randint(40, 95)
+
+
+def stand_in_answer(prompt: str, drift: float = FORMAT_DRIFT) -> str:
+    """
+    Deterministic answer to a rendered prompt (same prompt, same answer): the format the question asks for,
+    only as strict as the question is.
+    :param drift: share of the strict answers that drift out of their format anyway
+    """
+    from rag_implementation import count_tokens
+
+    question = question_of(prompt)
+    kind, count, tokens = expected_completion(question)
+    rng = _stand_in_rng(prompt)
+    score = rng.randint(40, 95)  # first draw, see stand_in_score
+    drifts = rng.random() < drift
+
+    def words(n_tokens: float) -> str:
+        """Random answer words measuring n_tokens (count_tokens, as the profile measures them)."""
+        target, chosen = max(1, round(n_tokens)), [rng.choice(_WORDS)]
+        while (missing := target - count_tokens(" ".join(chosen))) > 0:
+            chosen += [rng.choice(_WORDS) for _ in range(max(1, missing // MAX_TOKENS_PER_WORD))]
+        return " ".join(chosen)
+
+    if kind == "json":
+        meta = '{"company": "Acme", "title": "Data Engineer"}'
+        # Without an explicit ban, models like to fence JSON and introduce it
+        if drifts:
+            return _drifted(kind, meta, score, rng)
+        return meta if re.search(r"markdown|backticks", question, re.IGNORECASE) else \
+            f"Here is the JSON:\n```json\n{meta}\n```"
+    if kind == "integer":
+        if re.search(r"no text|any text|just the number", question, re.IGNORECASE):
+            answer = str(score)
+        else:
+            answer = f"{score}%" if "%" in question else f"{score}"
+        return _drifted(kind, answer, score, rng) if drifts else answer
+    if kind == "table":
+        evidence = (tokens / (count + 1)) - 2 * TOKENS_PER_CELL / 3
+        rows = [f"| {words(3)} | {rng.choice(['Yes', 'No', 'Partial'])} | {words(evidence)} |" for _ in range(count)]
+        return "\n".join(["| Required Skill | Candidate Match | Evidence |", "|---|---|---|", *rows])
+    if kind == "items":
+        return "\n".join(f"- {words(TOKENS_PER_ITEM)}" for _ in range(count))
+    if kind == "sentences":
+        return " ".join(f"{words(TOKENS_PER_SENTENCE).capitalize()}." for _ in range(count))
+    if "match percentage" in question.lower() or "score" in question.lower():
+        # Loose score question: the score comes with the figures it is based on
+        return f"Overall the candidate matches {rng.randint(3, 7)} of {rng.randint(8, 10)} requirements, " \
+               f"a score of {score} out of 100. {words(tokens - 20)}"
+    return words(tokens)
+
+
+class StandInChatModel(BaseChatModel):
+    """Deterministic offline chat model answering with stand_in_answer (see module docstring)."""
+
+    drift: float = FORMAT_DRIFT
+
+    @property
+    def _llm_type(self) -> str:
+        return "stand-in"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=stand_in_answer(prompt, self.drift)))])
+
+
+class PromptRecorder(BaseCallbackHandler):
+    """Keeps the prompt of the last chat model call, as rendered by the chain."""
+
+    def __init__(self):
+        self.prompt = ""
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.prompt = "\n".join(str(message.content) for message in messages[0])
+
+
+def model_latency_ms(prompt_tokens: int, completion_tokens: int, args: argparse.Namespace) -> float:
+    """Modelled latency of a call: first token (base + prefill), then decoding."""
+    return (args.latency_ms + prompt_tokens / args.prefill_tokens_per_s * 1000
+            + completion_tokens / args.tokens_per_s * 1000)
+
+
+def stored_answer_issues(key: str, answer: str, score: Optional[int] = None) -> list[str]:
+    """
+    What the analysis fails to read from an answer, through the parsers it stores answers with (see
+    analysis.store_answer).
+    :param score: the score the answer gives, when known (stand-in); otherwise only a missing score is an issue
+    """
+    from analysis import parse_job_meta
+    from helper import extract_match_score
+
+    if key == "q_meta":
+        meta = parse_job_meta(answer)
+        if not meta["company"] or not meta["title"] or "Unknown" in meta.values():
+            return [f"parse_job_meta read {meta}"]
+    elif key == "q3":
+        read = extract_match_score(answer)
+        if score is not None and read != score:
+            return [f"extract_match_score read {read}, the answer scores {score}"]
+        if read == 0 and not re.search(r"\b0\b", answer):
+            return ["extract_match_score found no score (stored as 0)"]
+    return []
+
+
+def profile_version(version: str, questions: dict[str, str], pairs: int, llm, args: argparse.Namespace) -> list[dict]:
+    """One row per pair and question."""
+    from rag_implementation import WholeDocumentRetriever, build_qa_chain, count_tokens
+    from analysis import ANALYSIS_STEPS, build_query
+    from Guardrails.prefilter import check_format, check_length
+
+    rows = []
+    recorder = PromptRecorder()
+    for n in range(pairs):
+        chain = build_qa_chain(WholeDocumentRetriever(documents=[Document(page_content=resume_text(n))]), llm=llm)
+        jd = job_description(n)[2]
+        for key, _, _ in ANALYSIS_STEPS:
+            start = time.perf_counter()
+            answer = chain.invoke({"query": build_query(jd, questions[key])},
+                                  config={"callbacks": [recorder]})["result"]
+            issues = [f.detail for f in check_format(key, answer) + check_length(key, answer)]
+            issues += stored_answer_issues(key, answer, None if args.live else stand_in_score(recorder.prompt))
+            elapsed = (time.perf_counter() - start) * 1000
+            prompt_tokens, completion_tokens = count_tokens(recorder.prompt), count_tokens(answer)
+            kind, _, expected = expected_completion(questions[key])
+            latency = elapsed if args.live else model_latency_ms(prompt_tokens, completion_tokens, args)
+            rows.append({
+                "version": version, "pair": n, "question": key, "format": kind,
+                "prompt tokens": prompt_tokens, "expected tokens": expected, "completion tokens": completion_tokens,
+                "latency ms": latency, "overhead ms": None if args.live else elapsed,
+                "parsed": not issues, "parse issue": "; ".join(issues) or None,
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt-version profiler")
+    parser.add_argument("--versions", nargs="+", help="registered prompt versions (default: all)")
+    parser.add_argument("--candidate", help="JSON file {question key: prompt}, profiled as its file name")
+    parser.add_argument("--pairs", type=int, default=10, help="resume / Job Description pairs of the corpus")
+    parser.add_argument("--live", action="store_true", help="real model (OPENAI_API_KEY / OPENAI_BASE_URL)")
+    parser.add_argument("--latency-ms", type=float, default=300, help="stand-in: base time to first token")
+    parser.add_argument("--prefill-tokens-per-s", type=float, default=5000, help="stand-in: prompt processing")
+    parser.add_argument("--tokens-per-s", type=float, default=80, help="stand-in: completion throughput")
+    parser.add_argument("--drift", type=float, default=FORMAT_DRIFT,
+                        help="stand-in: share of the strict answers that drift out of their format")
+    parser.add_argument("--input-usd-per-mtok", type=float, default=2.5, help="prompt price (gpt-4o)")
+    parser.add_argument("--output-usd-per-mtok", type=float, default=10.0, help="completion price (gpt-4o)")
+    parser.add_argument("--details", action="store_true", help="print the parse failures")
+    parser.add_argument("--json", help="write the per-question rows to this file")
+    args = parser.parse_args()
+
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    from prompt_eng_recruiter import PROMPT_VERSIONS, register_prompt_version
+    from rag_implementation import _token_encoder
+    if args.candidate:
+        with open(args.candidate) as f:
+            register_prompt_version(os.path.splitext(os.path.basename(args.candidate))[0], json.load(f))
+    versions = args.versions or list(PROMPT_VERSIONS)
+    unknown = [version for version in versions if version not in PROMPT_VERSIONS]
+    if unknown:
+        parser.error(f"unknown prompt version(s) {unknown}, registered: {list(PROMPT_VERSIONS)}")
+
+    if args.live:
+        import resources
+        llm = resources.get_chat_model(model="gpt-4o", temperature=0)
+    else:
+        llm = StandInChatModel(drift=args.drift)
+    # parse_job_meta logs every answer it cannot read, the report lists them (--details)
+    logging.getLogger("analysis").setLevel(logging.ERROR)
+    rows = [row for version in versions
+            for row in profile_version(version, PROMPT_VERSIONS[version], args.pairs, llm, args)]
+    df = pd.DataFrame(rows)
+
+    per_question = df.groupby(["version", "question"], sort=False).agg(**{
+        "format": ("format", "first"),
+        "prompt tok": ("prompt tokens", "mean"),
+        "expected tok": ("expected tokens", "mean"),
+        "completion tok": ("completion tokens", "mean"),
+        "latency p50 ms": ("latency ms", "median"),
+        "latency p95 ms": ("latency ms", lambda s: s.quantile(0.95)),
+        "overhead ms": ("overhead ms", "median"),
+        "parsed %": ("parsed", lambda s: 100 * s.mean()),
+    }).round(1)
+    analyses = df.groupby(["version", "pair"], sort=False).agg(**{
+        "prompt tok": ("prompt tokens", "sum"), "completion tok": ("completion tokens", "sum"),
+        "model s": ("latency ms", lambda s: s.sum() / 1000), "parsed %": ("parsed", lambda s: 100 * s.mean()),
+    })
+    analyses["cost USD"] = (analyses["prompt tok"] * args.input_usd_per_mtok
+                            + analyses["completion tok"] * args.output_usd_per_mtok) / 1e6
+    summary = analyses.groupby("version", sort=False).mean().round({"prompt tok": 0, "completion tok": 0,
+                                                                    "model s": 2, "parsed %": 1, "cost USD": 4})
+
+    counter = "tiktoken gpt-4o" if _token_encoder() is not None else "~4 chars per token (tiktoken unavailable)"
+    model = "live gpt-4o" if args.live else (f"stand-in ({args.latency_ms:g} ms + {args.prefill_tokens_per_s:g} "
+                                             f"prompt tok/s + {args.tokens_per_s:g} completion tok/s)")
+    print(f"{args.pairs} pair(s), {model}, tokens: {counter}")
+    if not args.live:
+        print(f"parsed %: modelled, {args.drift:.0%} of the strict answers drift out of their format "
+              f"(--drift), only --live measures the model")
+    print()
+    print(per_question.drop(columns=[] if not args.live else ["overhead ms"]).to_string())
+    print("\nPer analysis (every question, sequential model time):")
+    print(summary.to_string())
+    failures = df[~df["parsed"]]
+    if args.details and not failures.empty:
+        print("\nParse failures:")
+        print(failures[["version", "pair", "question", "parse issue"]].to_string(index=False))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"settings": vars(args), "rows": rows}, f, indent=1, default=str)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Tracker storage benchmark: untyped CSV (the former loader) vs typed Parquet, full load and the dashboard's
+column projection (Status, Date Applied).
+
+Usage (from src/):
+    python -m benchmarks.tracker_format
+    python -m benchmarks.tracker_format --rows 200000 --repeats 5
+"""
+from helper import apply_tracker_schema, read_tracker_parquet, TRACKER_STATUSES
+import tempfile
+import argparse
+import time
+import os
+import pandas as pd
+import numpy as np
+
+
+def synthetic_tracker(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    companies = np.array([f"Company {i}" for i in range(max(rows // 20, 1))])
+    titles = np.array(["Data Engineer", "Backend Developer", "ML Engineer", "SRE", "Product Manager"])
+    return apply_tracker_schema(pd.DataFrame({
+        "Date Applied": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 700, rows), unit="D"),
+        "Company": companies[rng.integers(0, len(companies), rows)],
+        "Job Title": titles[rng.integers(0, len(titles), rows)],
+        "Match Score": rng.integers(0, 101, rows),
+        "Status": np.array(TRACKER_STATUSES)[rng.integers(0, len(TRACKER_STATUSES), rows)],
+        "URL": [f"https://jobs.example.com/{i}" for i in range(rows)],
+        "Notes": np.where(rng.random(rows) < 0.3, "Recruiter call scheduled", None),
+        "Application ID": [f"{i:012x}" for i in range(rows)],
+    }))
+
+
+def timed(func, repeats: int):
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def legacy_csv_load(path: str) -> pd.DataFrame:
+    # What load_tracker_data did before the typed schema: object columns, only the date parsed
+    df = pd.read_csv(path)
+    df["Date Applied"] = pd.to_datetime(df["Date Applied"], format="ISO8601", errors="coerce")
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tracker storage benchmark")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    df = synthetic_tracker(args.rows)
+    with tempfile.TemporaryDirectory() as folder:
+        csv_path, parquet_path = f"{folder}/tracker.csv", f"{folder}/tracker.parquet"
+        df.to_csv(csv_path, index=False)
+        df.to_parquet(parquet_path, index=False, compression="zstd")
+
+        cases = [
+            ("csv (object dtypes)", lambda: legacy_csv_load(csv_path), csv_path),
+            ("parquet typed", lambda: read_tracker_parquet(parquet_path), parquet_path),
+            ("parquet Status+Date", lambda: read_tracker_parquet(parquet_path, ["Status", "Date Applied"]),
+             parquet_path),
+        ]
+        print(f"{args.rows} rows")
+        print(f"{'format':<22}{'file MB':>10}{'load ms':>10}{'memory MB':>12}")
+        for name, load, path in cases:
+            seconds, loaded = timed(load, args.repeats)
+            memory = loaded.memory_usage(deep=True).sum() / 1e6
+            print(f"{name:<22}{os.path.getsize(path) / 1e6:>10.2f}{seconds * 1000:>10.1f}{memory:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
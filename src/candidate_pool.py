@@ -0,0 +1,289 @@
+from langchain_community.vectorstores import FAISS
+from vector_store_cache import load_vector_store, save_vector_store, invalidate_vector_store, store_version
+from ann_index import ANN_INDEX_TYPE, ANN_MIN_VECTORS, build_vector_store, index_kind, set_search_params
+from resources import get_cached_chain
+from filelock import FileLock
+from typing import Optional
+import numpy as np
+import pandas as pd
+import threading
+import logging
+import glob
+import os
+
+logger = logging.getLogger("candidate_pool")
+
+# The pool lives next to the per-resume indexes
+POOL_DIR = "vector_db"
+POOL_INDEX_NAME = "candidate_pool"
+# Seconds a pool update waits for the pool lock held by another session or process
+POOL_LOCK_TIMEOUT = float(os.getenv("POOL_LOCK_TIMEOUT", "60"))
+
+# Process-wide pool shared by every session, reloaded when another process saved a newer version
+_pool: Optional[FAISS] = None
+_pool_version: Optional[str] = None
+_pool_lock = threading.RLock()
+_pool_file_locks: dict[int, FileLock] = {}
+
+
+def _pool_file_lock() -> FileLock:
+    """Serializes pool updates (read-modify-save) across sessions and processes, reentrant within a thread."""
+    # One instance per process, a lock inherited across fork must not be reused
+    pid = os.getpid()
+    if pid not in _pool_file_locks:
+        os.makedirs(POOL_DIR, exist_ok=True)
+        _pool_file_locks[pid] = FileLock(f"{POOL_DIR}/{POOL_INDEX_NAME}.lock", timeout=POOL_LOCK_TIMEOUT)
+    return _pool_file_locks[pid]
+
+
+def _save_pool():
+    """Persists the pool (callers hold the pool file lock and _pool_lock)."""
+    global _pool_version
+    save_vector_store(_pool, POOL_DIR, POOL_INDEX_NAME)
+    _pool_version = store_version(POOL_DIR, POOL_INDEX_NAME)
+
+
+def _pool_candidates(pool: FAISS) -> set[str]:
+    """Returns the set of candidate names already stored in the pool."""
+    return {doc.metadata.get("candidate") for doc in pool.docstore._dict.values()}
+
+
+def load_candidate_pool(embeddings) -> Optional[FAISS]:
+    """
+    Loads the pooled candidate index (all resume chunks of all candidates) from disk, again whenever the saved
+    version changed (candidates added by another process).
+    :param embeddings: Embeddings model used to embed the queries
+    :return: FAISS vector store or None when no pool was built yet
+    """
+    global _pool, _pool_version
+    with _pool_lock:
+        version = store_version(POOL_DIR, POOL_INDEX_NAME)
+        if version is not None and version != _pool_version:
+            logger.info("ℹ️  Loading Candidate Pool ..")
+            # The pool grows, so it is loaded in memory (not memory-mapped) and kept out of the LRU
+            _pool = load_vector_store(POOL_DIR, POOL_INDEX_NAME, embeddings, mmap=False)
+            invalidate_vector_store(POOL_DIR, POOL_INDEX_NAME)
+            set_search_params(_pool.index)
+            _pool_version = version
+        return _pool
+
+
+def add_candidate_to_pool(vectorstore: FAISS, candidate: str, embeddings, save: bool = True) -> FAISS:
+    """
+    Merges the chunks of a single resume vector store into the candidate pool.
+    The vectors are copied from the existing index, so no embedding calls are made.
+    :param vectorstore: Per-resume FAISS vector store
+    :param candidate: Candidate name stored in the chunk metadata
+    :param embeddings: Embeddings model of the pool
+    :param save: Persist the pool after the merge
+    :return: the updated pool
+    """
+    global _pool
+    with _pool_file_lock(), _pool_lock:
+        # Latest saved version, candidates added by other processes are kept
+        load_candidate_pool(embeddings)
+        if _pool is not None and candidate in _pool_candidates(_pool):
+            logger.info(f"ℹ️  Candidate {candidate} already in the pool")
+            return _pool
+
+        vectors = vectorstore.index.reconstruct_n(0, vectorstore.index.ntotal)
+        texts, metadatas = [], []
+        for i in range(vectorstore.index.ntotal):
+            doc = vectorstore.docstore.search(vectorstore.index_to_docstore_id[i])
+            texts.append(doc.page_content)
+            metadatas.append({**doc.metadata, "candidate": candidate, "chunk": i})
+
+        text_embeddings = list(zip(texts, vectors.tolist()))
+        if _pool is None:
+            _pool = FAISS.from_embeddings(text_embeddings, embedding=embeddings, metadatas=metadatas)
+        else:
+            _pool.add_embeddings(text_embeddings, metadatas=metadatas)
+        logger.info(f"ℹ️  Candidate {candidate} added to the pool ({len(texts)} chunks)")
+
+        if save:
+            _save_pool()
+        return _pool
+
+
+def sync_candidate_pool(embeddings) -> Optional[FAISS]:
+    """
+    Adds every stored per-resume index (vector_db/index_*.faiss) that is not yet in the pool.
+    Resumes analysed whole (vector_db/doc_*.txt, never embedded) are indexed first.
+    :param embeddings: Embeddings model of the pool
+    :return: the updated pool
+    """
+    from rag_implementation import build_resume_vector_store
+    pool = load_candidate_pool(embeddings)
+    known = _pool_candidates(pool) if pool is not None else set()
+    # Embedding calls happen before the pool is locked
+    for document_path in sorted(glob.glob(f"{POOL_DIR}/doc_*.txt")):
+        candidate = os.path.basename(document_path)[len("doc_"):-len(".txt")]
+        if candidate in known or os.path.exists(f"{POOL_DIR}/index_{candidate}.faiss"):
+            continue
+        with open(document_path, encoding="utf-8") as f:
+            build_resume_vector_store(f.read(), candidate)
+
+    added = 0
+    with _pool_file_lock(), _pool_lock:
+        pool = load_candidate_pool(embeddings)
+        known = _pool_candidates(pool) if pool is not None else set()
+        for faiss_path in sorted(glob.glob(f"{POOL_DIR}/index_*.faiss")):
+            index_name = os.path.basename(faiss_path)[:-len(".faiss")]
+            candidate = index_name[len("index_"):]
+            if candidate in known:
+                continue
+            vectorstore = load_vector_store(POOL_DIR, index_name, embeddings)
+            pool = add_candidate_to_pool(vectorstore, candidate, embeddings, save=False)
+            added += 1
+
+        if added:
+            _save_pool()
+            logger.info(f"ℹ️  Synced {added} new candidates into the pool")
+
+    if pool is not None and ANN_INDEX_TYPE != "flat" and index_kind(pool.index) == "flat" \
+            and pool.index.ntotal >= ANN_MIN_VECTORS:
+        pool = rebuild_pool_index(embeddings, kind=ANN_INDEX_TYPE)
+    return pool
+
+
+def rebuild_pool_index(embeddings, kind: str = ANN_INDEX_TYPE) -> FAISS:
+    """
+    Rebuilds the (flat) pool as an ANN index (IVF-Flat, IVF-PQ or HNSW), trained on a sample of the pool.
+    New candidates are added to the trained index afterwards without re-training.
+    :param embeddings: Embeddings model of the pool
+    :param kind: one of ann_index.INDEX_FACTORIES
+    :return: the rebuilt pool
+    """
+    global _pool
+    with _pool_file_lock(), _pool_lock:
+        load_candidate_pool(embeddings)
+        ids = [_pool.index_to_docstore_id[i] for i in range(_pool.index.ntotal)]
+        docs = [_pool.docstore.search(doc_id) for doc_id in ids]
+        vectors = _pool.index.reconstruct_n(0, _pool.index.ntotal)
+        _pool = build_vector_store(
+            [doc.page_content for doc in docs], vectors, [doc.metadata for doc in docs], embeddings, kind=kind
+        )
+        _save_pool()
+        logger.info(f"ℹ️  Candidate Pool rebuilt as {index_kind(_pool.index)}")
+        return _pool
+
+
+def aggregate_candidate_scores(similarities: np.ndarray, candidate_codes: np.ndarray,
+                               n_candidates: int, top_n: int = 3) -> np.ndarray:
+    """
+    Vectorized per-candidate aggregation: mean of the top_n chunk similarities of each candidate.
+    :param similarities: similarity of every pool chunk against the JD, shape (n_chunks,)
+    :param candidate_codes: integer candidate code of every chunk, shape (n_chunks,)
+    :param n_candidates: number of distinct candidates
+    :param top_n: number of best chunks that count towards the candidate score
+    :return: score per candidate code, shape (n_candidates,)
+    """
+    # Sort by candidate, then by similarity (best first) inside each candidate
+    order = np.lexsort((-similarities, candidate_codes))
+    sorted_codes = candidate_codes[order]
+    sorted_sims = similarities[order]
+
+    # Rank of each chunk inside its candidate group
+    group_start = np.searchsorted(sorted_codes, sorted_codes, side="left")
+    rank = np.arange(len(sorted_codes)) - group_start
+    keep = rank < top_n
+
+    totals = np.bincount(sorted_codes[keep], weights=sorted_sims[keep], minlength=n_candidates)
+    counts = np.bincount(sorted_codes[keep], minlength=n_candidates)
+    return totals / np.maximum(counts, 1)
+
+
+def rank_candidates(jd_text: str, embeddings, top_k: int = 10, top_n: int = 3) -> pd.DataFrame:
+    """
+    Scores every candidate of the pool against a Job Description in a single vector search.
+    :param jd_text: Job Description text
+    :param embeddings: Embeddings model of the pool
+    :param top_k: number of candidates to return
+    :param top_n: number of best chunks per candidate used for the score
+    :return: DataFrame with Candidate, Score (0-100) and Best Match (chunk text), best first
+    """
+    pool = load_candidate_pool(embeddings)
+    if pool is None or pool.index.ntotal == 0:
+        logger.warning("⚠️ Candidate Pool is empty ..")
+        return pd.DataFrame(columns=["Candidate", "Score", "Best Match"])
+
+    # 1. One search against every chunk of the pool (exact), or the nearest chunks only (ANN index)
+    query = np.asarray([embeddings.embed_query(jd_text)], dtype="float32")
+    n_chunks = pool.index.ntotal
+    if index_kind(pool.index) != "flat":
+        n_chunks = min(n_chunks, max(top_k * top_n * 20, 1000))
+    distances, ids = pool.index.search(query, n_chunks)
+    # ANN searches pad missing results with -1
+    found = ids[0] >= 0
+    distances, ids = distances[0][found], ids[0][found]
+
+    # OpenAI embeddings are unit length, squared L2 distance maps to cosine similarity
+    similarities = 1.0 - distances / 2.0
+
+    # 2. Map every chunk to its candidate
+    docs = [pool.docstore.search(pool.index_to_docstore_id[i]) for i in ids]
+    candidates = pd.Categorical([doc.metadata.get("candidate", "Unknown") for doc in docs])
+    codes = candidates.codes.astype(np.int64)
+
+    # 3. Aggregate per candidate
+    scores = aggregate_candidate_scores(similarities, codes, len(candidates.categories), top_n=top_n)
+
+    # First occurrence of each code is its best chunk, because ids are sorted by distance
+    _, best_positions = np.unique(codes, return_index=True)
+
+    ranking = pd.DataFrame({
+        "Candidate": candidates.categories,
+        "Score": np.clip(scores * 100, 0, 100).round(1),
+        "Best Match": [docs[p].page_content[:300] for p in best_positions],
+    })
+    return ranking.sort_values("Score", ascending=False).head(top_k).reset_index(drop=True)
+
+
+def get_candidate_chain(candidate: str, embeddings, k: int = 3):
+    """
+    Creates a RetrievalQA chain restricted to one candidate's chunks in the pool.
+    :param candidate: Candidate name
+    :param embeddings: Embeddings model of the pool
+    :param k: number of chunks retrieved per question
+    :return: RetrievalQA chain
+    """
+    from rag_implementation import build_qa_chain
+    # Prefer the candidate's own index, the filtered pool search is the fallback
+    if os.path.exists(f"{POOL_DIR}/index_{candidate}.faiss"):
+        vectorstore = load_vector_store(POOL_DIR, f"index_{candidate}", embeddings)
+        return get_cached_chain(
+            vectorstore,
+            lambda: build_qa_chain(vectorstore.as_retriever(search_type="similarity", search_kwargs={"k": k}))
+        )
+
+    pool = load_candidate_pool(embeddings)
+    retriever = pool.as_retriever(
+        search_type="similarity",
+        search_kwargs={"k": k, "filter": {"candidate": candidate}, "fetch_k": pool.index.ntotal}
+    )
+    return build_qa_chain(retriever)
+
+
+def analyse_top_candidates(jd_text: str, ranking: pd.DataFrame, questions: dict[str, str],
+                           question_keys: list[str], embeddings, config: Optional[dict] = None) -> dict:
+    """
+    Runs the (expensive) LLM questions only on the candidates of the ranking.
+    :param jd_text: Job Description text
+    :param ranking: output of rank_candidates
+    :param questions: prompt version (see get_prompt_ver)
+    :param question_keys: questions to ask, e.g. ["q3", "q2"]
+    :param embeddings: Embeddings model of the pool
+    :param config: RAG run config (callbacks)
+    :return: {candidate: {question_key: answer}}
+    """
+    from prompt_eng_recruiter import jd_as_context
+    query = jd_as_context(jd=jd_text)
+    results = {}
+    for candidate in ranking["Candidate"]:
+        qa_chain = get_candidate_chain(candidate, embeddings)
+        results[candidate] = {}
+        for key in question_keys:
+            ans = qa_chain.invoke({"query": f"{query}\n\n{questions[key]}"}, config=config or {})
+            results[candidate][key] = ans['result']
+        logger.info(f"ℹ️  Candidate {candidate} analysed")
+    return results
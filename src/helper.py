@@ -1,11 +1,52 @@
-from langchain_core.callbacks import BaseCallbackHandler
 import re
+import io
+import errno
+import shutil
 import logging
 import os
+import uuid
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+from filelock import FileLock
 import pandas as pd
 
 logger = logging.getLogger("helper_debugger")
 
+# Tracker storage: parquet (typed, columnar, default) or csv
+TRACKER_FORMAT = os.getenv("TRACKER_FORMAT", "parquet").lower()
+TRACKER_CSV_FILE = "job_tracker.csv"
+TRACKER_PARQUET_FILE = "job_tracker.parquet"
+TRACKER_FILE = TRACKER_PARQUET_FILE if TRACKER_FORMAT == "parquet" else TRACKER_CSV_FILE
+# Seconds a save waits for the tracker lock held by another session or process
+TRACKER_LOCK_TIMEOUT = float(os.getenv("TRACKER_LOCK_TIMEOUT", "30"))
+# Loaded versions kept as merge bases
+TRACKER_SNAPSHOTS = 16
+
+_tracker_locks: dict[int, FileLock] = {}
+# Trackers already checked by migrate_tracker in this process
+_migrated_trackers: set[str] = set()
+_snapshots: OrderedDict[str, pd.DataFrame] = OrderedDict()
+_snapshots_lock = threading.Lock()
+
+TRACKER_STATUSES = ["Applied", "Screening", "Interviewing", "Offer", "Rejected", "Ghosted"]
+TRACKER_COLUMNS = [
+    "Date Applied", "Company", "Job Title", "Match Score", "Status", "URL", "Notes", "Duplicate Of",
+    "Application ID"
+]
+# Typed schema of the tracker (text as Arrow-backed strings, Status categorical, score 0-100 as a small int)
+TRACKER_DTYPES = {
+    "Date Applied": "datetime64[ns]",
+    "Company": "string[pyarrow]",
+    "Job Title": "string[pyarrow]",
+    "Match Score": "Int8",
+    "Status": pd.CategoricalDtype(TRACKER_STATUSES),
+    "URL": "string[pyarrow]",
+    "Notes": "string[pyarrow]",
+    "Duplicate Of": "string[pyarrow]",
+    "Application ID": "string[pyarrow]",
+}
+
 def extract_match_score(response_text):
     # Search for a number between 0 and 100
     match = re.search(r'\b(100|[1-9]?[0-9])\b', response_text)
@@ -14,45 +55,224 @@ def extract_match_score(response_text):
     return 0
 
 
-def load_tracker_data():
+def apply_tracker_schema(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Bulletproof loader for job tracker data.
-    Ensures 'Date Applied' is forced to datetime type regardless of CSV structure.
+    Casts the tracker columns to the typed schema (missing columns are added empty).
+    Statuses outside TRACKER_STATUSES are kept as extra categories.
     """
-    df = None  # Initialize empty variable
-    TRACKER_FILE = "job_tracker.csv"
+    df = df.copy()
+    for column in TRACKER_COLUMNS:
+        if column not in df.columns:
+            df[column] = None
+    df["Date Applied"] = pd.to_datetime(df["Date Applied"], format="mixed", errors="coerce").astype("datetime64[ns]")
+    df["Match Score"] = pd.to_numeric(df["Match Score"], errors="coerce").round().clip(0, 100).astype("Int8")
+    statuses = df["Status"].astype("string")
+    extra = sorted(set(statuses.dropna()) - set(TRACKER_STATUSES))
+    df["Status"] = statuses.astype(pd.CategoricalDtype(TRACKER_STATUSES + extra))
+    for column, dtype in TRACKER_DTYPES.items():
+        if dtype == "string[pyarrow]":
+            df[column] = df[column].astype(dtype)
+    return df[TRACKER_COLUMNS + [column for column in df.columns if column not in TRACKER_COLUMNS]]
 
-    if os.path.exists(TRACKER_FILE):
-        # 1. Load the data normally as strings/objects first
-        df = pd.read_csv(TRACKER_FILE)
 
-        # 2. Force the conversion immediately after loading.
-        # We tell Pandas to expect "YYYY-MM-DD" format, which is what we save.
-        # errors='coerce' turns unparseable values into 'NaT' (Not a Time), preventing a crash.
-        try:
-            # We use ISO8601 as that's the strict standard (YYYY-MM-DD)
-            # You might need format='%Y-%m-%d' depending on exactly how it's saved.
-            df['Date Applied'] = pd.to_datetime(df['Date Applied'], format='ISO8601', errors='coerce')
-        except Exception as e:
-            # If standard ISO fails, try mixed format
-            print(f"ISO parse failed, trying mixed: {e}")
-            df['Date Applied'] = pd.to_datetime(df['Date Applied'], format='mixed', errors='coerce')
+def read_tracker_parquet(source, columns: Optional[list[str]] = None) -> pd.DataFrame:
+    """
+    Reads a Parquet tracker, only the projected columns are decoded.
+    Text columns stay Arrow-backed strings (no per-value Python objects).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
 
-        # Cleanup: Remove any fully empty rows that might have been accidentally saved
-        df = df.dropna(how='all')
+    string_types = {pa.string(): pd.StringDtype("pyarrow"), pa.large_string(): pd.StringDtype("pyarrow")}
+    return pq.read_table(source, columns=columns).to_pandas(types_mapper=string_types.get)
+
+
+def _tracker_lock() -> FileLock:
+    """Serializes tracker writers (sessions, API workers, other processes), reentrant within a thread."""
+    # One instance per process, a lock inherited across fork must not be reused
+    pid = os.getpid()
+    if pid not in _tracker_locks:
+        _tracker_locks[pid] = FileLock(f"{TRACKER_FILE}.lock", timeout=TRACKER_LOCK_TIMEOUT)
+    return _tracker_locks[pid]
+
+
+def _has_data(path: str) -> bool:
+    # A placeholder created with `touch` (Docker bind mount) counts as no tracker yet
+    return os.path.exists(path) and os.path.getsize(path) > 0
+
+
+def _read_tracker_file(columns: Optional[list[str]] = None) -> pd.DataFrame:
+    """
+    Reads the tracker in the typed schema.
+    :param columns: column projection (only these columns are read from disk)
+    """
+    path = TRACKER_FILE
+    if _needs_parquet_migration():
+        # Not migrated yet (see migrate_tracker), the CSV tracker is read as is
+        path = TRACKER_CSV_FILE
+
+    if not _has_data(path):
+        df = apply_tracker_schema(pd.DataFrame(columns=TRACKER_COLUMNS))
+    elif path == TRACKER_PARQUET_FILE:
+        df = read_tracker_parquet(path, columns)
+        # Dtypes come from the Arrow schema, the full load restores all the Status categories
+        return apply_tracker_schema(df.dropna(how='all')) if columns is None else df
     else:
-        # Define default columns
-        df = pd.DataFrame(columns=[
-            "Date Applied", "Company", "Job Title", "Match Score", "Status", "URL", "Notes"
-        ])
+        available = pd.read_csv(path, nrows=0).columns
+        usecols = None if columns is None else [column for column in columns if column in available]
+        # Cleanup: Remove any fully empty rows that might have been accidentally saved
+        df = apply_tracker_schema(pd.read_csv(path, usecols=usecols).dropna(how='all'))
+    return df if columns is None else df[columns]
+
 
-    # 3. Handle First-Run Integrity: Even for empty dfs or cases where loading failed,
-    # we must guarantee the type of this column so charts/editors don't complain.
-    # We force the empty or Nat-filled column to be a specialized datetime type.
-    df["Date Applied"] = pd.to_datetime(df["Date Applied"])
+def _needs_parquet_migration() -> bool:
+    """A CSV tracker of an older version and no Parquet tracker yet."""
+    return TRACKER_FORMAT == "parquet" and not _has_data(TRACKER_PARQUET_FILE) and _has_data(TRACKER_CSV_FILE)
 
+
+def _write_tracker_file(df: pd.DataFrame):
+    """Atomic write: a temp file in the same folder renamed over the tracker, readers never see a partial file."""
+    path = TRACKER_PARQUET_FILE if TRACKER_FORMAT == "parquet" else TRACKER_CSV_FILE
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        if TRACKER_FORMAT == "parquet":
+            df.to_parquet(tmp_path, index=False, compression="zstd")
+        else:
+            df.to_csv(tmp_path, index=False)
+        try:
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # A file bind-mounted on its own (docker-compose) can't be renamed over, rewrite it in place
+            if e.errno not in (errno.EBUSY, errno.EXDEV):
+                raise
+            shutil.copyfile(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def new_application_id() -> str:
+    """Stable id of a tracker row (rows are matched on it across versions, events and API calls)."""
+    return uuid.uuid4().hex[:12]
+
+
+def tracker_version() -> Optional[str]:
+    """Version token of the saved tracker (changes on every save), None when there is no tracker yet."""
+    if not _has_data(TRACKER_FILE):
+        return None
+    stat = os.stat(TRACKER_FILE)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def _remember_snapshot(version: Optional[str], df: pd.DataFrame):
+    # Loaded versions are kept (a few) as the base of the 3-way merge when a save conflicts
+    if version is None:
+        return
+    with _snapshots_lock:
+        _snapshots[version] = df.copy()
+        _snapshots.move_to_end(version)
+        while len(_snapshots) > TRACKER_SNAPSHOTS:
+            _snapshots.popitem(last=False)
+
+
+def load_tracker_data(columns: Optional[list[str]] = None):
+    """
+    Loads the job tracker data in the typed schema ('Date Applied' datetime, categorical Status, Int8 score,
+    string text columns). Reading never writes the tracker, see migrate_tracker for older trackers.
+    The version that was read is in df.attrs["tracker_version"], save_tracker_data uses it to detect conflicts.
+    :param columns: only read these columns (e.g. ["Status", "Date Applied"] for the dashboard)
+    """
+    if columns is not None:
+        return _read_tracker_file(columns)
+
+    version = tracker_version()
+    df = _read_tracker_file()
+    df.attrs["tracker_version"] = version
+    _remember_snapshot(version, df)
     return df
 
+
+def migrate_tracker():
+    """
+    One-time upgrade of an older tracker, run at startup: a CSV tracker is converted to Parquet (TRACKER_FORMAT
+    parquet), rows without an Application ID get one and are saved, so the status event log and the API can refer
+    to them. Checked once per process.
+    """
+    path = os.path.abspath(TRACKER_FILE)
+    if path in _migrated_trackers:
+        return
+    with _tracker_lock():
+        if _needs_parquet_migration():
+            logger.info(f"ℹ️  Migrating {TRACKER_CSV_FILE} to {TRACKER_PARQUET_FILE}")
+            _write_tracker_file(_read_tracker_file())
+        df = _read_tracker_file()
+        missing = int(df["Application ID"].isna().sum())
+        if missing:
+            logger.info(f"ℹ️  Assigning an Application ID to {missing} tracker row(s)")
+            save_tracker_data(df, base_version=tracker_version())
+    _migrated_trackers.add(path)
+
+
+def concat_tracker_rows(df: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Tracker with rows appended, both in the typed schema.
+    Concatenating onto an empty tracker is skipped (pandas warns about empty / all-NA frames in concat).
+    """
+    rows = apply_tracker_schema(rows)
+    if df.empty:
+        return rows.reset_index(drop=True)
+    if rows.empty:
+        return df
+    return pd.concat([df, rows], ignore_index=True)
+
+
+def export_tracker(file_format: str = "csv") -> bytes:
+    """
+    Exports the tracker.
+    :param file_format: csv or parquet
+    :return: file content
+    """
+    df = load_tracker_data()
+    buffer = io.BytesIO()
+    if file_format == "parquet":
+        df.to_parquet(buffer, index=False, compression="zstd")
+    elif file_format == "csv":
+        df.to_csv(buffer, index=False, date_format="%Y-%m-%d")
+    else:
+        raise ValueError(f"Unknown export format {file_format}, expected csv or parquet")
+    return buffer.getvalue()
+
+
+def import_tracker(content: bytes, file_format: str = "csv", replace: bool = False) -> pd.DataFrame:
+    """
+    Imports applications from a CSV or Parquet export.
+    :param content: file content
+    :param file_format: csv or parquet
+    :param replace: replace the tracker instead of appending the imported rows
+    :return: saved tracker
+    """
+    if file_format == "parquet":
+        imported = read_tracker_parquet(io.BytesIO(content))
+    elif file_format == "csv":
+        imported = pd.read_csv(io.BytesIO(content))
+    else:
+        raise ValueError(f"Unknown import format {file_format}, expected csv or parquet")
+    missing = {"Company", "Job Title"} - set(imported.columns)
+    if missing:
+        raise ValueError(f"Missing columns: {sorted(missing)}")
+
+    imported = apply_tracker_schema(imported.dropna(how='all'))
+    if replace:
+        return update_tracker(lambda df: imported)
+
+    def append(df):
+        # Re-imported rows keep their Application ID, the tracker version wins
+        new_rows = imported[~imported["Application ID"].isin(df["Application ID"].dropna())]
+        return concat_tracker_rows(df, new_rows)
+
+    return update_tracker(append)
+
+
 def load_tracker_data_():
     """Loads the job tracker data from a CSV, or creates an empty DataFrame if it doesn't exist."""
     TRACKER_FILE = "job_tracker.csv"
@@ -69,24 +289,134 @@ def load_tracker_data_():
         df["Date Applied"] = pd.to_datetime(df["Date Applied"])
         return df
 
-def save_tracker_data(df):
-    TRACKER_FILE = "job_tracker.csv"
-    """Saves the DataFrame to the CSV file."""
-    df.to_csv(TRACKER_FILE, index=False)
+def merge_tracker(base: Optional[pd.DataFrame], ours: pd.DataFrame, theirs: pd.DataFrame) -> pd.DataFrame:
+    """
+    3-way merge of two versions of the tracker, rows matched on Application ID.
+    Cells changed on our side win, every other cell keeps their value. A row deleted on one side is only
+    dropped if the other side did not edit it. Without a base, no row is deleted and our rows win.
+    :param base: version both sides started from (None if unknown)
+    :param ours: version being saved
+    :param theirs: version saved meanwhile
+    :return: merged tracker
+    """
+    key = "Application ID"
+    # Object dtypes: categoricals with different categories, and NA, compare safely
+    frames = [frame.astype(object).set_index(key) for frame in (ours, theirs)]
+    ours, theirs = frames
+    base = base.astype(object).set_index(key) if base is not None else theirs.iloc[0:0]
+    columns = ours.columns.union(theirs.columns, sort=False)
+    ours, theirs, base = (frame.reindex(columns=columns) for frame in (ours, theirs, base))
+
+    def differs(left: pd.DataFrame, right: pd.DataFrame) -> pd.DataFrame:
+        right = right.reindex(left.index)
+        return left.ne(right) & ~(left.isna() & right.isna())
+
+    # Rows on both sides: our changed cells over their version
+    both = theirs.index.intersection(ours.index)
+    merged = theirs.copy()
+    merged.loc[both] = theirs.loc[both].mask(differs(ours.loc[both], base), ours.loc[both])
+
+    # Rows we deleted: dropped unless they edited them
+    deleted_by_us = theirs.index.difference(ours.index).intersection(base.index)
+    they_edited = differs(theirs.loc[deleted_by_us], base).any(axis=1)
+    merged = merged.drop(index=deleted_by_us[~they_edited.to_numpy()])
+
+    # Rows only on our side: new ones, or deleted by them (kept if we edited them)
+    ours_only = ours.index.difference(theirs.index)
+    deleted_by_them = ours_only.intersection(base.index)
+    we_edited = differs(ours.loc[deleted_by_them], base).any(axis=1)
+    keep = ours_only.difference(deleted_by_them).union(deleted_by_them[we_edited.to_numpy()], sort=False)
+    merged = pd.concat([merged, ours.loc[ours.index.isin(keep)]])
+    return apply_tracker_schema(merged.reset_index())
+
+
+def save_tracker_data(df, base_version: Optional[str] = None):
+    """
+    Saves the DataFrame in the typed schema, status changes against the saved version go to the event log.
+    Saves are serialized with a file lock (across sessions and processes) and written atomically. If the tracker
+    changed since df was loaded, df is merged with the saved version instead of overwriting it.
+    :param base_version: tracker version df was derived from (default: df.attrs["tracker_version"])
+    :return: saved DataFrame (new rows have their Application ID)
+    """
+    from tracker_events import record_status_changes
+
+    base_version = base_version or df.attrs.get("tracker_version")
+    df = apply_tracker_schema(df)
+    missing_ids = df["Application ID"].isna()
+    df.loc[missing_ids, "Application ID"] = [new_application_id() for _ in range(missing_ids.sum())]
+
+    with _tracker_lock():
+        current_version = tracker_version()
+        previous = _read_tracker_file() if current_version is not None else None
+        if base_version is not None and current_version != base_version and previous is not None:
+            with _snapshots_lock:
+                base = _snapshots.get(base_version)
+            logger.warning(f"⚠️ Tracker changed since it was loaded, merging"
+                           f"{'' if base is not None else ' (base version unknown, nothing is deleted)'}")
+            df = merge_tracker(base, df, previous)
+
+        record_status_changes(previous, df)
+        _write_tracker_file(df)
+        version = tracker_version()
+
+    df.attrs["tracker_version"] = version
+    _remember_snapshot(version, df)
+    return df
+
+
+def update_tracker(mutate: Callable[[pd.DataFrame], pd.DataFrame]) -> pd.DataFrame:
+    """
+    Load-modify-save under the tracker lock, for changes computed from the latest version (no merge needed).
+    :param mutate: function of the current tracker returning the new one
+    :return: saved DataFrame
+    """
+    with _tracker_lock():
+        df = load_tracker_data()
+        return save_tracker_data(mutate(df), base_version=df.attrs["tracker_version"])
+
+
+def append_tracker_rows(rows: list[dict]) -> pd.DataFrame:
+    """
+    Appends applications to the latest version of the tracker.
+    :param rows: one dict per application (TRACKER_COLUMNS)
+    :return: saved DataFrame, the new rows last
+    """
+    return update_tracker(lambda df: concat_tracker_rows(df, pd.DataFrame(rows)))
+
+
+def _build_debug_callback_handler():
+    # langchain_core is only imported when the verbose handler is actually used
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    from logging_config import is_sampled, log_trace
+
+    class DebugCallbackHandler(BaseCallbackHandler):
+        """Captures prompts and responses of a sample of the LLM runs (LOG_TRACE_SAMPLE_RATE), size-capped."""
+
+        def on_llm_start(self, serialized, prompts, *, run_id=None, **kwargs):
+            """Run when LLM starts running. This gives us the FINAL prompt sent to the LLM."""
+            if is_sampled(run_id):
+                # prompts[0] is the final string with context and question injected
+                log_trace(logger, "llm_prompt", prompts[0], run_id, title="📤 PROMPT SENT TO MODEL")
+
+        def on_chat_model_start(self, serialized, messages, *, run_id=None, **kwargs):
+            """Chat models report messages instead of a prompt string."""
+            if is_sampled(run_id):
+                prompt = "\n".join(f"{message.type}: {message.content}" for message in messages[0])
+                log_trace(logger, "llm_prompt", prompt, run_id, title="📤 PROMPT SENT TO MODEL")
 
+        def on_llm_end(self, response, *, run_id=None, **kwargs):
+            """Run when LLM ends running."""
+            if is_sampled(run_id):
+                log_trace(logger, "llm_response", response.generations[0][0].text, run_id,
+                          title="📥 RESPONSE FROM MODEL")
 
-class DebugCallbackHandler(BaseCallbackHandler):
+    return DebugCallbackHandler
 
-    def on_llm_start(self, serialized, prompts, **kwargs):
-        """Run when LLM starts running. This gives us the FINAL prompt sent to the LLM."""
-        logger.info("============== 📤 PROMPT SENT TO MODEL ==============")
-        # prompts[0] is the final string with context and question injected
-        logger.info(prompts[0])
-        logger.info("=====================================================")
 
-    def on_llm_end(self, response, **kwargs):
-        """Run when LLM ends running."""
-        logger.info("============== 📥 RESPONSE FROM MODEL ===============")
-        # Access the actual text generated
-        logger.info(response.generations[0][0].text)
-        logger.info("=====================================================")
\ No newline at end of file
+def __getattr__(name):
+    """Lazy module attributes: `from helper import DebugCallbackHandler` builds the class on first use."""
+    if name == "DebugCallbackHandler":
+        globals()[name] = _build_debug_callback_handler()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
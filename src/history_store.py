@@ -0,0 +1,193 @@
+from contextlib import closing
+from datetime import datetime
+from typing import Optional
+import hashlib
+import logging
+import sqlite3
+import json
+import zlib
+import os
+
+logger = logging.getLogger("history_store")
+
+# SQLite file of the analysis history
+HISTORY_DB = os.getenv("HISTORY_DB", "history.db")
+# Rows per page of the history listing
+HISTORY_PAGE_SIZE = 10
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    resume_hash TEXT NOT NULL,
+    jd_hash TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    resume_name TEXT,
+    jd_source TEXT,
+    company TEXT,
+    title TEXT,
+    score INTEGER,
+    payload BLOB NOT NULL,
+    UNIQUE (resume_hash, jd_hash, prompt_version)
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_created_at ON analyses (created_at);
+CREATE INDEX IF NOT EXISTS idx_analyses_company ON analyses (company);
+"""
+
+# Columns of the listing (everything but the compressed payload)
+_LIST_COLUMNS = "id, created_at, resume_name, jd_source, company, title, score, prompt_version"
+
+
+def content_hash(content) -> str:
+    """
+    SHA-256 of a resume (bytes) or a Job Description (text, whitespace normalized).
+    :param content: bytes or str
+    :return: hex digest
+    """
+    if isinstance(content, str):
+        content = " ".join(content.split()).encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    # One short-lived connection per call: safe across Streamlit sessions, job threads and the API
+    connection = sqlite3.connect(db_path, timeout=30)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+def _compress(results: dict, report: Optional[str], job_description: Optional[str] = None,
+              resume_key: Optional[str] = None) -> bytes:
+    payload = {"results": results, "report": report, "job_description": job_description, "resume_key": resume_key}
+    return zlib.compress(json.dumps(payload).encode("utf-8"), 6)
+
+
+def _decompress(payload: bytes) -> dict:
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+
+def lookup_analysis(resume_hash: str, jd_hash: str, prompt_version: str,
+                    db_path: str = HISTORY_DB) -> Optional[dict]:
+    """
+    Returns the stored analysis of the same resume, Job Description and prompt version.
+    :return: {"id", "created_at", "results", "report"} or None
+    """
+    with closing(_connect(db_path)) as connection:
+        row = connection.execute(
+            "SELECT id, created_at, payload FROM analyses WHERE resume_hash=? AND jd_hash=? AND prompt_version=?",
+            (resume_hash, jd_hash, prompt_version)
+        ).fetchone()
+    if row is None:
+        return None
+    logger.info(f"ℹ️  History hit: analysis #{row['id']} from {row['created_at']}")
+    return {"id": row["id"], "created_at": row["created_at"], **_decompress(row["payload"])}
+
+
+def latest_analysis_for(resume_hash: str, jd_hashes: list[str], prompt_version: str,
+                        db_path: str = HISTORY_DB) -> Optional[dict]:
+    """
+    Newest stored analysis of a resume against any of the given Job Descriptions (listing columns only).
+    """
+    if not jd_hashes:
+        return None
+    placeholders = ", ".join("?" * len(jd_hashes))
+    with closing(_connect(db_path)) as connection:
+        row = connection.execute(
+            f"""SELECT {_LIST_COLUMNS}, jd_hash FROM analyses
+                WHERE resume_hash=? AND prompt_version=? AND jd_hash IN ({placeholders})
+                ORDER BY created_at DESC LIMIT 1""",
+            (resume_hash, prompt_version, *jd_hashes)
+        ).fetchone()
+    return dict(row) if row is not None else None
+
+
+def save_analysis(resume_hash: str, jd_hash: str, prompt_version: str, results: dict, report: Optional[str],
+                  resume_name: Optional[str] = None, jd_source: Optional[str] = None,
+                  job_description: Optional[str] = None, resume_key: Optional[str] = None,
+                  db_path: str = HISTORY_DB) -> int:
+    """
+    Stores (or replaces) an analysis, results and report are zlib-compressed.
+    :param job_description: Job Description text, kept so sections can be generated later on
+    :param resume_key: stored resume the analysis used (see rag_implementation.resume_key), sections generated
+                       later on reload it
+    :return: analysis id
+    """
+    with closing(_connect(db_path)) as connection, connection:
+        cursor = connection.execute(
+            """INSERT INTO analyses (resume_hash, jd_hash, prompt_version, created_at, resume_name, jd_source,
+                                     company, title, score, payload)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (resume_hash, jd_hash, prompt_version) DO UPDATE SET
+                   created_at=excluded.created_at, resume_name=excluded.resume_name, jd_source=excluded.jd_source,
+                   company=excluded.company, title=excluded.title, score=excluded.score, payload=excluded.payload
+               RETURNING id""",
+            (resume_hash, jd_hash, prompt_version, datetime.now().isoformat(timespec="seconds"),
+             resume_name, jd_source, results.get("company"), results.get("title"), results.get("score"),
+             _compress(results, report, job_description, resume_key))
+        )
+        analysis_id = cursor.fetchone()[0]
+    logger.info(f"ℹ️  Analysis #{analysis_id} saved to history")
+    return analysis_id
+
+
+def update_analysis(analysis_id: int, results: dict, report: Optional[str], db_path: str = HISTORY_DB):
+    """Replaces the results and report of a stored analysis (e.g. after generating a section on demand)."""
+    with closing(_connect(db_path)) as connection, connection:
+        row = connection.execute("SELECT payload FROM analyses WHERE id=?", (analysis_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"Analysis #{analysis_id} not found")
+        stored = _decompress(row["payload"])
+        connection.execute(
+            "UPDATE analyses SET company=?, title=?, score=?, payload=? WHERE id=?",
+            (results.get("company"), results.get("title"), results.get("score"),
+             _compress(results, report, stored.get("job_description"), stored.get("resume_key")), analysis_id)
+        )
+
+
+def _search_clause(search: Optional[str]) -> tuple[str, tuple]:
+    if not search:
+        return "", ()
+    pattern = f"%{search}%"
+    return "WHERE company LIKE ? OR title LIKE ? OR resume_name LIKE ? OR jd_source LIKE ?", (pattern,) * 4
+
+
+def list_history(offset: int = 0, limit: int = HISTORY_PAGE_SIZE, search: Optional[str] = None,
+                 db_path: str = HISTORY_DB) -> list[dict]:
+    """
+    One page of the history (newest first), without the payload.
+    :param offset: first row
+    :param limit: page size
+    :param search: filter on company, title, resume name or JD source
+    :return: list of rows
+    """
+    where, params = _search_clause(search)
+    with closing(_connect(db_path)) as connection:
+        rows = connection.execute(
+            f"SELECT {_LIST_COLUMNS} FROM analyses {where} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+            (*params, limit, offset)
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def count_history(search: Optional[str] = None, db_path: str = HISTORY_DB) -> int:
+    where, params = _search_clause(search)
+    with closing(_connect(db_path)) as connection:
+        return connection.execute(f"SELECT COUNT(*) FROM analyses {where}", params).fetchone()[0]
+
+
+def get_analysis(analysis_id: int, db_path: str = HISTORY_DB) -> Optional[dict]:
+    """
+    Full stored analysis.
+    :return: listing columns + results + report, or None
+    """
+    with closing(_connect(db_path)) as connection:
+        row = connection.execute(
+            f"SELECT {_LIST_COLUMNS}, payload FROM analyses WHERE id=?", (analysis_id,)
+        ).fetchone()
+    if row is None:
+        return None
+    analysis = dict(row)
+    analysis.update(_decompress(analysis.pop("payload")))
+    return analysis
@@ -1,21 +1,26 @@
-from langchain_community.document_loaders import WebBaseLoader
-from playwright.async_api import async_playwright
+# Playwright and the LangChain loaders are imported inside the scrapers (loaded on first use)
 from typing import Optional
-from rich.logging import RichHandler
-import logging, requests
+from logging_config import setup_logging
+import logging
 import asyncio
+import os
 
 
-# Configure basic config with RichHandler
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(message)s", # Rich handles the timestamp and level separately
-    datefmt="[%X]",
-    handlers=[RichHandler(rich_tracebacks=True)]
-)
+# Central, queued logging (console and optional JSONL, see logging_config)
+setup_logging()
 
 logger = logging.getLogger("ingestion")
 
+# Resume PDF extraction engine: layout (PyMuPDF, column-aware, default) | pdfplumber | pypdf
+PDF_ENGINE = os.getenv("PDF_ENGINE", "layout").lower()
+# Column gutters: vertical strips at least this wide (pt) where the text blocks cover at most
+# COLUMN_GUTTER_MAX_FILL of the height of the fullest column (full-width headers can cross a gutter)
+COLUMN_GUTTER_MIN_WIDTH = 8
+COLUMN_GUTTER_MAX_FILL = 0.1
+# Not columns but rows (e.g. right-aligned dates) when this share of the blocks of a side start on the same line
+# as a block of the other side
+COLUMN_ROW_ALIGNED_MAX = 0.5
+
 # Function 1: Extract Text from Job Description URL
 """
 Pending wrapper Function to validate and sanitize the input 
@@ -26,8 +31,8 @@ def get_jd_with_playwright(url: str) -> Optional[str]:
     """
     Uses a headless browser to load JS-heavy job boards.
     """
-    # Setup logging
-    logging.basicConfig(level=logging.INFO, format="%(message)s", handlers=[RichHandler()])
+    from playwright.async_api import async_playwright
+
     logger = logging.getLogger("scraper")
 
     def clean_text_output(raw_text: str) -> str:
@@ -105,6 +110,8 @@ def get_jd_from_url(url) -> Optional[str]:
     :param url:
     :return:
     """
+    from langchain_community.document_loaders import WebBaseLoader
+    import requests
     try:
         logger.info(f"ℹ️  Loading URL .. {url}")
         loader = WebBaseLoader(url,
@@ -196,3 +203,109 @@ def get_pdf_text_pymupdf(uploaded_file, split_ratio=0.35, verbose=False)-> str |
         return None
 
 
+def _column_splits(boxes, page_width: float) -> list[float]:
+    """
+    x positions of the column gutters of a page, from a histogram of the text block extents.
+    Every block adds its height over its x range, a gutter is a wide enough strip with (almost) no text inside
+    the text area, text on both sides, and the two sides not aligned line by line.
+    :param boxes: (n, 4) array of the text blocks x0, y0, x1, y1
+    :param page_width: page width (pt)
+    :return: sorted x of the gutter middles, empty for a single column
+    """
+    import numpy as np
+    x0, y0, x1, y1 = boxes.T
+    heights = y1 - y0
+    size = int(np.ceil(page_width)) + 2
+    # Difference array: +height where a block starts, -height where it ends, the cumulative sum is the coverage
+    delta = np.zeros(size)
+    np.add.at(delta, np.clip(np.floor(x0).astype(int), 0, size - 1), heights)
+    np.add.at(delta, np.clip(np.ceil(x1).astype(int), 0, size - 1), -heights)
+    coverage = np.cumsum(delta)[:-1]
+
+    left, right = int(np.floor(x0.min())), int(np.ceil(x1.max()))
+    inside = coverage[left:right]
+    if len(inside) == 0:
+        return []
+    empty = inside <= COLUMN_GUTTER_MAX_FILL * inside.max()
+    # Runs of (almost) empty bins: starts and ends of the True runs
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], empty.astype(np.int8), [0]))))
+    splits = []
+    for start, end in zip(edges[::2], edges[1::2]):
+        if end - start < COLUMN_GUTTER_MIN_WIDTH or start == 0 or end == len(inside):
+            continue
+        split = left + (start + end) / 2
+        left_tops, right_tops = y0[x1 <= split], y0[x0 >= split]
+        if len(left_tops) == 0 or len(right_tops) == 0:
+            continue
+        aligned = np.abs(left_tops[:, None] - right_tops[None, :]) < 3
+        if max(aligned.any(axis=1).mean(), aligned.any(axis=0).mean()) > COLUMN_ROW_ALIGNED_MAX:
+            continue
+        splits.append(float(split))
+    return splits
+
+
+def _reading_order(boxes, splits: list[float]):
+    """
+    Block order of a page: full-width blocks (crossing a gutter) cut the page into bands, each band is read
+    column by column, each column top to bottom.
+    :return: indices of the blocks in reading order
+    """
+    import numpy as np
+    x0, y0, x1, _ = boxes.T
+    if not splits:
+        return np.lexsort((x0, y0))
+    gutters = np.asarray(splits)
+    spanning = ((x0[:, None] < gutters - 1) & (x1[:, None] > gutters + 1)).any(axis=1)
+    column = np.searchsorted(gutters, (x0 + x1) / 2)
+    # Band of a block: number of full-width blocks starting above it, a full-width block opens its band
+    band_tops = np.sort(y0[spanning])
+    band = np.searchsorted(band_tops, y0, side="right")
+    column = np.where(spanning, -1, column)
+    return np.lexsort((x0, y0, column, band))
+
+
+def get_pdf_text_layout(uploaded_file, verbose=False) -> Optional[str]:
+    """
+    Fast layout-aware extraction (PyMuPDF): one text pass per page, columns found per page from the block
+    positions (single column, two columns, left or right sidebar), blocks in reading order.
+    :param uploaded_file: PDF file object (Streamlit UploadedFile or BytesIO with a name)
+    :param verbose: log the extracted text
+    :return: text, pages separated by a blank line (None on error)
+    """
+    import fitz
+    import numpy as np
+    logger.info(f"ℹ️  Reading PDF: {getattr(uploaded_file, 'name', 'resume')}")
+    try:
+        uploaded_file.seek(0)
+        pages = []
+        with fitz.open(stream=uploaded_file.read(), filetype="pdf") as pdf:
+            for page in pdf:
+                # (x0, y0, x1, y1, text, block_no, block_type), type 0 is text
+                blocks = [b for b in page.get_text("blocks") if b[6] == 0 and b[4].strip()]
+                if not blocks:
+                    continue
+                boxes = np.array([b[:4] for b in blocks], dtype=float)
+                splits = _column_splits(boxes, page.rect.width)
+                order = _reading_order(boxes, splits)
+                pages.append("\n".join(blocks[i][4].strip() for i in order))
+        text = "\n\n".join(pages)
+        if verbose:
+            logger.info(f"ℹ️  Extracted Text\n\n {text}")
+        return text
+    except Exception as e:
+        logger.error(f"☠️ Error reading PDF: {e}")
+        return None
+
+
+def get_pdf_text(uploaded_file, engine: str = PDF_ENGINE, verbose=False) -> Optional[str]:
+    """
+    Resume text with the configured engine (PDF_ENGINE).
+    :param uploaded_file: PDF file object
+    :param engine: layout | pdfplumber | pypdf
+    :return: text (None on error)
+    """
+    extractors = {"layout": get_pdf_text_layout, "pdfplumber": get_pdf_text_pdfplumber,
+                  "pypdf": get_pdf_text_pypdf}
+    if engine not in extractors:
+        raise ValueError(f"Unknown PDF engine {engine}, expected one of {list(extractors)}")
+    return extractors[engine](uploaded_file, verbose=verbose)
@@ -0,0 +1,183 @@
+from history_store import HISTORY_DB
+from urllib.parse import urlsplit, parse_qsl, urlencode
+from contextlib import closing
+from datetime import datetime
+from typing import Optional
+import pandas as pd
+import numpy as np
+import hashlib
+import logging
+import sqlite3
+import zlib
+import re
+import os
+
+logger = logging.getLogger("jd_dedup")
+
+# Estimated Jaccard similarity (word shingles) above which two JDs are the same posting
+JD_DUPLICATE_THRESHOLD = float(os.getenv("JD_DUPLICATE_THRESHOLD", "0.8"))
+
+# MinHash / LSH parameters: 16 bands x 8 rows, candidate pairs from ~0.7 Jaccard upwards
+NUM_PERM = 128
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+SHINGLE_SIZE = 5
+
+# Universal hashes (a * x + b) mod p over the 32-bit shingle ids: with p < 2^32, a * x + b fits in uint64
+_PRIME = np.uint64((1 << 32) - 5)
+_rng = np.random.default_rng(1)
+_PERM_A = _rng.integers(1, int(_PRIME), size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, int(_PRIME), size=NUM_PERM, dtype=np.uint64)
+
+# Query parameters that only say where a click came from (utm_* too): dropped when comparing job URLs.
+# The others are kept, job boards put the posting id in the query (Indeed jk, LinkedIn currentJobId, gh_jid)
+TRACKING_PARAMS = {"ref", "refid", "src", "source", "trk", "trkinfo", "trackingid", "gclid", "fbclid", "msclkid",
+                   "mc_cid", "mc_eid", "gh_src", "lever-source", "lever-origin", "from", "tk"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jd_signatures (
+    jd_hash TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    jd_url TEXT,
+    company TEXT,
+    title TEXT,
+    signature BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jd_lsh_buckets (
+    band INTEGER NOT NULL,
+    bucket TEXT NOT NULL,
+    jd_hash TEXT NOT NULL,
+    PRIMARY KEY (band, bucket, jd_hash)
+);
+"""
+
+
+def _shingles(text: str) -> np.ndarray:
+    """CRC32 ids of the word 5-grams of a normalized text."""
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    if len(words) < SHINGLE_SIZE:
+        words = words + [""] * (SHINGLE_SIZE - len(words))
+    grams = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint64, count=len(grams))
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """
+    MinHash signature of a text: min over shingles of NUM_PERM universal hashes (one vectorized pass).
+    :param text: Job Description text
+    :return: uint64 array (NUM_PERM,)
+    """
+    shingles = _shingles(text) % _PRIME
+    hashes = (_PERM_A[:, None] * shingles[None, :] + _PERM_B[:, None]) % _PRIME
+    return hashes.min(axis=1)
+
+
+def estimated_similarity(signature_a: np.ndarray, signature_b: np.ndarray) -> float:
+    """Estimated Jaccard similarity: share of equal MinHash values."""
+    return float(np.mean(signature_a == signature_b))
+
+
+def _band_buckets(signature: np.ndarray) -> list[str]:
+    return [hashlib.md5(band.tobytes()).hexdigest() for band in signature.reshape(LSH_BANDS, LSH_ROWS)]
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(db_path, timeout=30)
+    connection.row_factory = sqlite3.Row
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+def register_jd(jd_text: str, jd_hash: str, jd_url: Optional[str] = None, company: Optional[str] = None,
+                title: Optional[str] = None, db_path: str = HISTORY_DB):
+    """
+    Adds an analysed Job Description to the near-duplicate index.
+    :param jd_text: Job Description text
+    :param jd_hash: content hash (see history_store.content_hash)
+    """
+    signature = minhash_signature(jd_text)
+    with closing(_connect(db_path)) as connection, connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO jd_signatures VALUES (?, ?, ?, ?, ?, ?)",
+            (jd_hash, datetime.now().isoformat(timespec="seconds"), jd_url, company, title, signature.tobytes())
+        )
+        connection.executemany(
+            "INSERT OR IGNORE INTO jd_lsh_buckets VALUES (?, ?, ?)",
+            [(band, bucket, jd_hash) for band, bucket in enumerate(_band_buckets(signature))]
+        )
+
+
+def find_near_duplicates(jd_text: str, threshold: float = JD_DUPLICATE_THRESHOLD,
+                         db_path: str = HISTORY_DB) -> list[dict]:
+    """
+    Previously analysed Job Descriptions that are near-duplicates of a text (LSH candidates, verified on
+    the full signatures).
+    :param jd_text: Job Description text
+    :param threshold: minimum estimated Jaccard similarity
+    :return: matches (jd_hash, similarity, jd_url, company, title, created_at), most similar first
+    """
+    signature = minhash_signature(jd_text)
+    buckets = _band_buckets(signature)
+    with closing(_connect(db_path)) as connection:
+        clause = " OR ".join(["(b.band = ? AND b.bucket = ?)"] * LSH_BANDS)
+        params = [value for band, bucket in enumerate(buckets) for value in (band, bucket)]
+        rows = connection.execute(
+            f"""SELECT DISTINCT s.* FROM jd_lsh_buckets b JOIN jd_signatures s ON s.jd_hash = b.jd_hash
+                WHERE {clause}""",
+            params
+        ).fetchall()
+
+    matches = []
+    for row in rows:
+        similarity = estimated_similarity(signature, np.frombuffer(row["signature"], dtype=np.uint64))
+        if similarity >= threshold:
+            match = dict(row)
+            match.pop("signature")
+            matches.append({**match, "similarity": round(similarity, 3)})
+    return sorted(matches, key=lambda match: match["similarity"], reverse=True)
+
+
+def normalize_url(url: Optional[str]) -> str:
+    """
+    Scheme-less URL with a lower-case host and path, and its query parameters sorted, tracking parameters
+    (TRACKING_PARAMS, utm_*) left out: they differ between clicks on the same posting.
+    """
+    if not isinstance(url, str) or "://" not in url:
+        return ""
+    parts = urlsplit(url.strip())
+    query = sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_"))
+    normalized = f"{parts.netloc.lower().removeprefix('www.')}{parts.path.lower().rstrip('/')}"
+    return f"{normalized}?{urlencode(query)}" if query else normalized
+
+
+def _normalize_name(value) -> pd.Series:
+    return value.fillna("").astype(str).str.lower().str.replace(r"[^a-z0-9]+", " ", regex=True).str.strip()
+
+
+def find_tracker_duplicates(df: pd.DataFrame, url: Optional[str] = None, company: Optional[str] = None,
+                            title: Optional[str] = None) -> list[int]:
+    """
+    Tracker rows matching a posting by URL, or by Company and Job Title.
+    :param df: tracker DataFrame
+    :param url: Job URL
+    :param company: Company name
+    :param title: Job Title
+    :return: matching row indexes
+    """
+    if df.empty:
+        return []
+    mask = pd.Series(False, index=df.index)
+    if normalize_url(url):
+        mask |= df["URL"].map(normalize_url) == normalize_url(url)
+    if company and title:
+        key_company = _normalize_name(pd.Series([company]))[0]
+        key_title = _normalize_name(pd.Series([title]))[0]
+        mask |= (_normalize_name(df["Company"]) == key_company) & (_normalize_name(df["Job Title"]) == key_title)
+    return df.index[mask].tolist()
+
+
+def describe_tracker_row(row: pd.Series) -> str:
+    """Short label of a tracker row, stored in the 'Duplicate Of' column."""
+    date = row["Date Applied"].strftime("%Y-%m-%d") if pd.notna(row["Date Applied"]) else "?"
+    return f"{row['Company']} - {row['Job Title']} ({date})"
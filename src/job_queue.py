@@ -0,0 +1,544 @@
+from history_store import (content_hash, lookup_analysis, latest_analysis_for, get_analysis, save_analysis,
+                           update_analysis)
+from prompt_eng_recruiter import PROMPT_VERSION, PROMPT_VERSIONS
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timedelta
+from typing import Optional
+import concurrent.futures
+import threading
+import asyncio
+import logging
+import socket
+import json
+import uuid
+import sys
+import io
+import os
+
+logger = logging.getLogger("job_queue")
+
+# Persisted job status (one JSON file per job)
+JOBS_DIR = "jobs"
+# Number of analyses running at the same time, the others wait in the queue
+ANALYSIS_MAX_CONCURRENCY = int(os.getenv("ANALYSIS_MAX_CONCURRENCY", "4"))
+
+# Process that owns the jobs it submits: only its own unfinished jobs are marked interrupted on restart
+# (the app and the api share the jobs directory), stable across restarts of the same service
+JOB_QUEUE_INSTANCE = os.getenv("JOB_QUEUE_INSTANCE",
+                               f"{socket.gethostname()}:{os.path.basename(sys.argv[0]) or 'python'}")
+# Finished jobs are kept (memory and jobs/) for this many hours, and at most this many of them
+JOB_RETENTION_HOURS = float(os.getenv("JOB_RETENTION_HOURS", "24"))
+JOB_MAX_FINISHED = int(os.getenv("JOB_MAX_FINISHED", "200"))
+
+# Seconds a job waits for the reuse / refresh decision on a near-duplicate JD before running in full
+DUPLICATE_DECISION_TIMEOUT = int(os.getenv("DUPLICATE_DECISION_TIMEOUT", "600"))
+
+QUEUED, RUNNING, AWAITING_DECISION, DONE, FAILED, CANCELLED, INTERRUPTED = (
+    "queued", "running", "awaiting_decision", "done", "failed", "cancelled", "interrupted"
+)
+FINISHED_STATES = (DONE, FAILED, CANCELLED, INTERRUPTED)
+DUPLICATE_DECISIONS = ("reuse", "refresh", "full")
+ON_DUPLICATE_MODES = ("ask", "reuse", "refresh", "ignore")
+# Results re-computed by an incremental refresh (metadata, score, skills, fit), the other sections are kept
+REFRESH_RESULT_KEYS = ("company", "title", "score", "q1", "q2")
+
+
+@dataclass
+class AnalysisJob:
+    job_id: str
+    resume_name: str
+    jd_url: Optional[str] = None
+    prompt_version: str = PROMPT_VERSION
+    status: str = QUEUED
+    progress: int = 0
+    stage: str = "Waiting in queue..."
+    results: dict = field(default_factory=dict)
+    report: Optional[str] = None
+    error: Optional[str] = None
+    history_id: Optional[int] = None
+    from_history: bool = False
+    # Near-duplicate handling: ask | reuse | refresh | ignore
+    on_duplicate: str = "ask"
+    duplicate: Optional[dict] = None
+    # On-demand generation of lazy sections of a stored analysis
+    sections: Optional[list] = None
+    # Guardrails findings (see Guardrails.prefilter.Finding)
+    guardrails: list = field(default_factory=list)
+    # Resume context given to the model: whole | retrieval (see rag_implementation.select_context_strategy)
+    context_strategy: Optional[str] = None
+    # Sections reused from the semantic answer cache: key -> entry and similarities (see answer_cache)
+    cached_answers: dict = field(default_factory=dict)
+    # Job queue instance that runs the job (see JOB_QUEUE_INSTANCE), None for jobs of older versions
+    owner: Optional[str] = None
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+    updated_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+
+class JobQueue:
+    """
+    Background analysis jobs, independent of the Streamlit script thread.
+    All jobs run as coroutines on one event loop thread (so the async HTTP clients are shared and in-flight
+    requests can be cancelled), blocking steps (scraping, PDF parsing, embeddings) run in a thread pool.
+    Status and partial results are persisted after every question.
+    """
+
+    def __init__(self, max_concurrency: int = ANALYSIS_MAX_CONCURRENCY, jobs_dir: str = JOBS_DIR,
+                 instance: str = JOB_QUEUE_INSTANCE):
+        self.max_concurrency = max_concurrency
+        self.jobs_dir = jobs_dir
+        self.instance = instance
+        self._jobs: dict[str, AnalysisJob] = {}
+        self._futures: dict[str, concurrent.futures.Future] = {}
+        self._decisions: dict[str, asyncio.Future] = {}
+        # Section jobs of the same stored analysis run one after the other (each extends the previous one)
+        self._history_locks: dict[int, asyncio.Lock] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_concurrency * 2, thread_name_prefix="analysis"
+        )
+        os.makedirs(jobs_dir, exist_ok=True)
+        self._recover()
+
+    # --- Persistence ---
+    def _path(self, job_id: str) -> str:
+        return f"{self.jobs_dir}/{job_id}.json"
+
+    def _save(self, job: AnalysisJob):
+        job.updated_at = datetime.now().isoformat(timespec="seconds")
+        tmp_path = f"{self._path(job.job_id)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(asdict(job), f)
+        os.replace(tmp_path, self._path(job.job_id))
+
+    def _recover(self):
+        """
+        Loads the jobs of this instance, the ones that were queued or running when the process stopped are
+        marked interrupted. Jobs of other instances sharing the jobs directory are left alone.
+        """
+        for file_name in os.listdir(self.jobs_dir):
+            if not file_name.endswith(".json") or file_name.endswith(".tmp"):
+                continue
+            try:
+                with open(f"{self.jobs_dir}/{file_name}") as f:
+                    job = AnalysisJob(**json.load(f))
+            except Exception as e:
+                logger.warning(f"⚠️ Skipping unreadable job file {file_name}: {e}")
+                continue
+            if job.owner not in (None, self.instance):
+                continue
+            if not job.finished:
+                job.status, job.stage = INTERRUPTED, "Interrupted by a server restart"
+                self._save(job)
+            self._jobs[job.job_id] = job
+        self._prune()
+
+    def _prune(self):
+        """Forgets finished jobs older than JOB_RETENTION_HOURS or beyond the JOB_MAX_FINISHED most recent ones."""
+        cutoff = (datetime.now() - timedelta(hours=JOB_RETENTION_HOURS)).isoformat(timespec="seconds")
+        with self._lock:
+            finished = sorted((job for job in self._jobs.values()
+                               if job.finished and job.job_id not in self._futures),
+                              key=lambda job: job.updated_at, reverse=True)
+            expired = [job for rank, job in enumerate(finished)
+                       if rank >= JOB_MAX_FINISHED or job.updated_at < cutoff]
+            for job in expired:
+                del self._jobs[job.job_id]
+        for job in expired:
+            try:
+                os.remove(self._path(job.job_id))
+            except FileNotFoundError:
+                pass
+        if expired:
+            logger.info(f"ℹ️  Pruned {len(expired)} finished jobs")
+
+    # --- Event loop thread ---
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                ready = threading.Event()
+
+                def run_loop():
+                    self._loop = asyncio.new_event_loop()
+                    asyncio.set_event_loop(self._loop)
+                    self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                    ready.set()
+                    self._loop.run_forever()
+
+                threading.Thread(target=run_loop, name="analysis-loop", daemon=True).start()
+                ready.wait()
+            return self._loop
+
+    # --- Public API ---
+    def submit(self, resume_bytes: bytes, resume_name: str, jd_url: Optional[str] = None,
+               jd_text: Optional[str] = None, prompt_version: Optional[str] = None,
+               config: Optional[dict] = None, on_duplicate: str = "ask") -> str:
+        """
+        Queues a full analysis (scraping, PDF extraction, RAG questions).
+        :param resume_bytes: resume PDF content
+        :param resume_name: resume file name
+        :param jd_url: Job Description URL (scraped with Playwright)
+        :param jd_text: Job Description raw text, used when no URL is given
+        :param prompt_version: registered prompt version (default PROMPT_VERSION)
+        :param config: RAG run config (callbacks)
+        :param on_duplicate: near-duplicate JD analysed before: ask (wait for resolve_duplicate), reuse,
+                             refresh or ignore
+        :return: job id
+        """
+        if on_duplicate not in ON_DUPLICATE_MODES:
+            raise ValueError(f"Unknown on_duplicate {on_duplicate}, expected one of {ON_DUPLICATE_MODES}")
+        prompt_version = prompt_version or PROMPT_VERSION
+        if prompt_version not in PROMPT_VERSIONS:
+            raise ValueError(f"Unknown prompt version {prompt_version}, expected one of {list(PROMPT_VERSIONS)}")
+        self._prune()
+        job = AnalysisJob(job_id=uuid.uuid4().hex, resume_name=resume_name, jd_url=jd_url or None,
+                          prompt_version=prompt_version, on_duplicate=on_duplicate, owner=self.instance)
+        with self._lock:
+            self._jobs[job.job_id] = job
+        self._save(job)
+
+        return self._schedule(job, self._run(job, resume_bytes, jd_text, config))
+
+    def _schedule(self, job: AnalysisJob, coroutine) -> str:
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(coroutine, loop)
+        self._futures[job.job_id] = future
+        future.add_done_callback(lambda _: self._futures.pop(job.job_id, None))
+        logger.info(f"ℹ️  Job {job.job_id} queued ({self.queue_depth()} waiting or running)")
+        return job.job_id
+
+    def submit_sections(self, history_id: int, sections: list[str], config: Optional[dict] = None) -> str:
+        """
+        Queues the on-demand generation of sections (e.g. the cover letter) of a stored analysis.
+        :param history_id: analysis id in the history store
+        :param sections: question keys (see analysis.LAZY_SECTIONS)
+        :param config: RAG run config (callbacks)
+        :return: job id, its results are the full updated analysis
+        """
+        from analysis import LAZY_SECTIONS
+        unknown = set(sections) - set(LAZY_SECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown sections {sorted(unknown)}, expected some of {LAZY_SECTIONS}")
+        self._prune()
+        job = AnalysisJob(job_id=uuid.uuid4().hex, resume_name="", sections=list(sections),
+                          history_id=history_id, stage="Waiting in queue...", owner=self.instance)
+        with self._lock:
+            self._jobs[job.job_id] = job
+        self._save(job)
+        return self._schedule(job, self._run_sections(job, history_id, config))
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> list[AnalysisJob]:
+        return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def queue_depth(self) -> int:
+        """Number of jobs waiting or running."""
+        return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancels a job, the in-flight model request is cancelled with it.
+        :param job_id: job id
+        :return: True if the job was still running
+        """
+        future = self._futures.get(job_id)
+        job = self._jobs.get(job_id)
+        if future is None or job is None or job.finished:
+            return False
+        future.cancel()
+        job.status, job.stage = CANCELLED, "Cancelled"
+        self._save(job)
+        logger.info(f"ℹ️  Job {job_id} cancelled")
+        return True
+
+    def resolve_duplicate(self, job_id: str, decision: str) -> bool:
+        """
+        Answers a job waiting on a near-duplicate Job Description.
+        :param job_id: job id
+        :param decision: "reuse" (earlier analysis as is), "refresh" (re-run score, metadata, skills and fit only)
+                         or "full" (full analysis)
+        :return: True if the job was waiting
+        """
+        if decision not in DUPLICATE_DECISIONS:
+            raise ValueError(f"Unknown decision {decision}, expected one of {DUPLICATE_DECISIONS}")
+        decision_future = self._decisions.get(job_id)
+        if decision_future is None or self._loop is None:
+            return False
+        self._loop.call_soon_threadsafe(
+            lambda: decision_future.done() or decision_future.set_result(decision)
+        )
+        return True
+
+    # --- Worker ---
+    def _find_duplicate(self, job: AnalysisJob, job_description: str, resume_hash: str) -> Optional[dict]:
+        """Earlier analysis of the same resume against a near-duplicate JD, with the matching tracker rows."""
+        from jd_dedup import find_near_duplicates, find_tracker_duplicates, describe_tracker_row
+        from helper import load_tracker_data
+
+        matches = find_near_duplicates(job_description)
+        earlier = latest_analysis_for(resume_hash, [match["jd_hash"] for match in matches], job.prompt_version)
+        if earlier is None:
+            return None
+        match = next(match for match in matches if match["jd_hash"] == earlier["jd_hash"])
+        df = load_tracker_data()
+        tracker_rows = find_tracker_duplicates(df, job.jd_url or match["jd_url"], earlier["company"], earlier["title"])
+        return {
+            "history_id": earlier["id"],
+            "similarity": match["similarity"],
+            "created_at": earlier["created_at"],
+            "company": earlier["company"],
+            "title": earlier["title"],
+            "jd_source": earlier["jd_source"],
+            "tracker_rows": [describe_tracker_row(df.loc[row]) for row in tracker_rows],
+        }
+
+    async def _run(self, job: AnalysisJob, resume_bytes: bytes, jd_text: Optional[str], config: Optional[dict]):
+        loop = asyncio.get_running_loop()
+
+        def update(progress: int, stage: str, results: Optional[dict] = None):
+            job.progress, job.stage = progress, stage
+            if results is not None:
+                job.results = dict(results)
+            self._save(job)
+
+        def blocking(func, *args):
+            return loop.run_in_executor(self._executor, func, *args)
+
+        try:
+            async with self._semaphore:
+                if job.status == CANCELLED:
+                    return
+                job.status = RUNNING
+                update(1, "Initializing AI 🧠 ..")
+                # Heavy subsystems, loaded on first use (in the pool, the import must not block the loop)
+                await blocking(_load_pipeline)
+                from ingestion import get_jd_with_playwright
+
+                # --- Job Description ---
+                if job.jd_url:
+                    update(2, "Loading Job Description...")
+                    job_description = await blocking(get_jd_with_playwright, job.jd_url)
+                    if job_description in (None, "None"):
+                        raise ValueError("Something went wrong accessing the URL.")
+                else:
+                    job_description = jd_text
+
+                # --- Same resume, JD and prompts analysed before? ---
+                resume_hash, jd_hash = content_hash(resume_bytes), content_hash(job_description or "")
+                stored = await blocking(lookup_analysis, resume_hash, jd_hash, job.prompt_version)
+                if stored is not None:
+                    job.results, job.report = stored["results"], stored["report"]
+                    job.history_id, job.from_history = stored["id"], True
+                    job.status = DONE
+                    update(100, f"Loaded from history ({stored['created_at']})")
+                    return
+
+                # --- Reposted job (near-duplicate JD) analysed before? ---
+                duplicate = None
+                if job.on_duplicate != "ignore" and job_description:
+                    duplicate = await blocking(self._find_duplicate, job, job_description, resume_hash)
+
+            # The decision is awaited without holding a worker slot
+            decision = "full"
+            if duplicate is not None:
+                job.duplicate = duplicate
+                decision = job.on_duplicate
+                if decision == "ask":
+                    # The decision can be given as soon as the status is visible
+                    self._decisions[job.job_id] = loop.create_future()
+                    job.status = AWAITING_DECISION
+                    update(3, f"Near-duplicate of an earlier analysis ({duplicate['similarity']:.0%} similar)")
+                    try:
+                        decision = await asyncio.wait_for(self._decisions[job.job_id], DUPLICATE_DECISION_TIMEOUT)
+                    except asyncio.TimeoutError:
+                        decision = "full"
+                    finally:
+                        self._decisions.pop(job.job_id, None)
+                    job.status = RUNNING
+                    update(3, f"Decision: {decision}")
+
+            async with self._semaphore:
+                from rag_implementation import resume_key
+                candidate = resume_key(job.resume_name, resume_hash)
+                if decision in ("reuse", "refresh"):
+                    earlier = await blocking(get_analysis, duplicate["history_id"])
+                    job.results = earlier["results"]
+                    update(5, f"Reusing analysis #{earlier['id']} ({earlier['created_at']})")
+                    if decision == "reuse":
+                        # Nothing is extracted, later sections use the resume the earlier analysis kept
+                        candidate = earlier.get("resume_key")
+                    if decision == "refresh":
+                        job.results = {key: value for key, value in earlier["results"].items()
+                                       if key not in REFRESH_RESULT_KEYS}
+                if decision != "reuse":
+                    await self._analyse(job, resume_bytes, job_description, config, update, blocking,
+                                        resume_hash, jd_hash, candidate)
+
+                from analysis import build_report
+                from jd_dedup import register_jd
+                job.report = build_report(job.results, job.jd_url)
+                job.history_id = await blocking(lambda: save_analysis(
+                    resume_hash, jd_hash, job.prompt_version, job.results, job.report,
+                    resume_name=job.resume_name, jd_source=job.jd_url or "Provided Text",
+                    job_description=job_description, resume_key=candidate
+                ))
+                await blocking(lambda: register_jd(
+                    job_description, jd_hash, job.jd_url, job.results.get("company"), job.results.get("title")
+                ))
+                job.status = DONE
+                update(100, "Analysis Complete! (100%)")
+        except asyncio.CancelledError:
+            job.status = CANCELLED
+            update(job.progress, "Cancelled")
+            raise
+        except Exception as e:
+            logger.exception(f"☠️ Job {job.job_id} failed")
+            job.status, job.error = FAILED, str(e)
+            update(job.progress, "Failed")
+
+    async def _analyse(self, job: AnalysisJob, resume_bytes: bytes, job_description: str,
+                       config: Optional[dict], update, blocking, resume_hash: str, jd_hash: str, candidate: str):
+        """
+        Resume extraction, vector store and the RAG questions (questions already in job.results are skipped).
+        :param resume_hash: resume content hash
+        :param jd_hash: content hash of the Job Description as fetched (before the guardrails edit it), the key
+                        of the history and of the answer cache
+        :param candidate: stored resume key (see rag_implementation.resume_key)
+        """
+        from ingestion import get_pdf_text
+        from rag_implementation import get_rag_chain, context_strategy
+        from prompt_eng_recruiter import get_prompt_ver
+        from analysis import run_analysis_async, LAZY_SECTIONS_MIN_SCORE
+        from answer_cache import open_answer_cache
+
+        # --- Resume ---
+        update(3, "Extracting text from Resume...")
+        resume_file = io.BytesIO(resume_bytes)
+        resume_file.name = job.resume_name
+        resume_text = await blocking(get_pdf_text, resume_file)
+        if not resume_text or not job_description:
+            raise ValueError("Could not extract text from the Resume or the Job Description.")
+
+        # --- Guardrails (tier 1 inline, the judge runs alongside the questions) ---
+        guardrails = _guardrails()
+        if guardrails is not None:
+            job_description = guardrails.check_job_description(job_description)
+
+        # --- RAG ---
+        update(4, "Preparing the Resume context...")
+        qa_chain = await blocking(get_rag_chain, resume_text, candidate)
+        job.context_strategy = context_strategy(qa_chain)
+        questions = get_prompt_ver(version=job.prompt_version)
+        answer_cache = await blocking(open_answer_cache, job_description, resume_text, resume_hash, jd_hash,
+                                      job.prompt_version)
+
+        # The long generative sections only run with the analysis above the score threshold
+        job.results = await run_analysis_async(
+            qa_chain, job_description, questions, config=config, results=job.results,
+            on_progress=lambda key, progress, text, partial: update(progress, text, partial),
+            lazy_min_score=LAZY_SECTIONS_MIN_SCORE, guardrails=guardrails, answer_cache=answer_cache
+        )
+        if answer_cache is not None:
+            job.cached_answers = answer_cache.hits
+        if guardrails is not None:
+            job.guardrails = await guardrails.finish()
+
+    async def _run_sections(self, job: AnalysisJob, history_id: int, config: Optional[dict]):
+        """Generates sections of a stored analysis and updates it (resume vector store and JD from history)."""
+        loop = asyncio.get_running_loop()
+
+        def update(progress: int, stage: str, results: Optional[dict] = None):
+            job.progress, job.stage = progress, stage
+            if results is not None:
+                job.results = dict(results)
+            self._save(job)
+
+        def blocking(func, *args):
+            return loop.run_in_executor(self._executor, func, *args)
+
+        try:
+            history_lock = self._history_locks.setdefault(history_id, asyncio.Lock())
+            async with history_lock, self._semaphore:
+                if job.status == CANCELLED:
+                    return
+                job.status = RUNNING
+                update(1, "Loading the analysis...")
+                await blocking(_load_pipeline)
+                from rag_implementation import get_rag_chain, context_strategy, resume_stored
+                from prompt_eng_recruiter import get_prompt_ver
+                from analysis import run_analysis_async, build_report
+
+                stored = await blocking(get_analysis, history_id)
+                if stored is None or not stored.get("job_description"):
+                    raise ValueError("The Job Description of this analysis was not kept, run the analysis again.")
+                # The resume (vector store or whole text) was kept by the analysis under its content hash
+                candidate = stored.get("resume_key")
+                if not candidate or not resume_stored(candidate):
+                    raise ValueError("The Resume of this analysis was not kept, run the analysis again.")
+                job.results = stored["results"]
+                qa_chain = await blocking(get_rag_chain, "", candidate)
+                job.context_strategy = context_strategy(qa_chain)
+                guardrails, job_description = _guardrails(), stored["job_description"]
+                if guardrails is not None:
+                    job_description = guardrails.check_job_description(job_description)
+                job.results = await run_analysis_async(
+                    qa_chain, job_description, get_prompt_ver(version=stored["prompt_version"]),
+                    config=config, results=job.results, keys=job.sections,
+                    on_progress=lambda key, progress, text, partial: update(progress, text, partial),
+                    guardrails=guardrails
+                )
+                if guardrails is not None:
+                    job.guardrails = await guardrails.finish()
+                job.report = build_report(job.results, stored["jd_source"] if stored["jd_source"] != "Provided Text"
+                                          else None)
+                await blocking(update_analysis, history_id, job.results, job.report)
+                job.status = DONE
+                update(100, "Sections generated")
+        except asyncio.CancelledError:
+            job.status = CANCELLED
+            update(job.progress, "Cancelled")
+            raise
+        except Exception as e:
+            logger.exception(f"☠️ Job {job.job_id} failed")
+            job.status, job.error = FAILED, str(e)
+            update(job.progress, "Failed")
+        finally:
+            self._release_history_lock(job, history_id)
+
+    def _release_history_lock(self, job: AnalysisJob, history_id: int):
+        """Drops the lock of a stored analysis once no other section job of it is queued or running."""
+        with self._lock:
+            pending = any(other is not job and other.history_id == history_id and other.sections is not None
+                          and not other.finished for other in self._jobs.values())
+        if not pending:
+            self._history_locks.pop(history_id, None)
+
+
+def _load_pipeline():
+    import ingestion, rag_implementation, analysis, answer_cache, Guardrails  # noqa: F401
+
+
+def _guardrails():
+    """Guardrails of one analysis, None when disabled (GUARDRAILS_ENABLED=false)."""
+    from Guardrails import GuardrailPipeline, GUARDRAILS_ENABLED
+    return GuardrailPipeline() if GUARDRAILS_ENABLED else None
+
+
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Process-wide job queue, shared by every Streamlit session."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue()
+        return _job_queue
@@ -0,0 +1,179 @@
+"""
+Central logging configuration (one call to setup_logging() per process, every module just uses getLogger).
+
+Records are put on a bounded queue by the calling thread and formatted / written by a single listener thread
+(Rich console and, optionally, a rotating JSONL file), so logging never blocks a request: when the queue is
+full, records are dropped and counted instead. Prompts and responses (VERBOSE_RAG_LOGS) are sampled per LLM run
+and capped in size before they are queued.
+"""
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from rich.logging import RichHandler
+from datetime import datetime, timezone
+from typing import Optional
+import threading
+import logging
+import atexit
+import queue
+import json
+import copy
+import uuid
+import os
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Records waiting for the listener thread, the newest are dropped beyond this
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Structured output (one JSON object per line), disabled when empty, rotated at LOG_JSONL_MAX_MB
+LOG_JSONL_FILE = os.getenv("LOG_JSONL_FILE", "")
+LOG_JSONL_MAX_MB = float(os.getenv("LOG_JSONL_MAX_MB", "50"))
+LOG_JSONL_BACKUPS = int(os.getenv("LOG_JSONL_BACKUPS", "3"))
+# Share of LLM runs whose prompt and response are captured (VERBOSE_RAG_LOGS), and characters kept of each
+LOG_TRACE_SAMPLE_RATE = float(os.getenv("LOG_TRACE_SAMPLE_RATE", "1.0"))
+LOG_PROMPT_MAX_CHARS = int(os.getenv("LOG_PROMPT_MAX_CHARS", "4000"))
+# Longest message printed on the console (Rich wraps and highlights every character, the JSONL keeps it all)
+LOG_CONSOLE_MAX_CHARS = int(os.getenv("LOG_CONSOLE_MAX_CHARS", "8000"))
+
+_lock = threading.Lock()
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Queues records without waiting: a full queue drops the record (the count is reported once room is back)."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only the message arguments are resolved here, formatting happens on the listener thread.
+        # exc_info is kept so the console still renders rich tracebacks.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            if self._unreported:
+                self.queue.put_nowait(logging.makeLogRecord({
+                    "name": "logging", "levelno": logging.WARNING, "levelname": "WARNING",
+                    "msg": f"⚠️ Log queue full, {self._unreported} record(s) dropped"
+                }))
+                self._unreported = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+
+
+class _Listener(QueueListener):
+
+    def enqueue_sentinel(self):
+        # Blocking: the sentinel must not be dropped on a full queue, or stop() would never return
+        self.queue.put(self._sentinel)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Message, followed by the captured text of trace records (see log_trace), cut to LOG_CONSOLE_MAX_CHARS."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        text = getattr(record, "fields", {}).get("text")
+        if text:
+            message = f"{message}\n{text}"
+        if len(message) > LOG_CONSOLE_MAX_CHARS:
+            message = f"{message[:LOG_CONSOLE_MAX_CHARS]} … [{len(message) - LOG_CONSOLE_MAX_CHARS} chars cut]"
+        return message
+
+
+class JsonlFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, thread, structured fields and traceback."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging(level: str = LOG_LEVEL, jsonl_file: str = LOG_JSONL_FILE):
+    """
+    Routes every logger through the queue (idempotent: Streamlit reruns and every module may call it).
+    :param level: root log level
+    :param jsonl_file: structured log file, none when empty
+    """
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is not None:
+            return
+        console = RichHandler(rich_tracebacks=True)
+        console.setFormatter(ConsoleFormatter("%(message)s", datefmt="[%X]"))
+        handlers = [console]
+        if jsonl_file:
+            jsonl = RotatingFileHandler(jsonl_file, maxBytes=int(LOG_JSONL_MAX_MB * 1024 * 1024),
+                                        backupCount=LOG_JSONL_BACKUPS, encoding="utf-8")
+            jsonl.setFormatter(JsonlFormatter())
+            handlers.append(jsonl)
+
+        log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        _queue_handler = NonBlockingQueueHandler(log_queue)
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(_queue_handler)
+        _listener = _Listener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Writes the queued records and stops the listener thread."""
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is None:
+            return
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener, _queue_handler = None, None
+
+
+def dropped_records() -> int:
+    """Records dropped on a full queue since setup_logging()."""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def is_sampled(run_id, rate: float = LOG_TRACE_SAMPLE_RATE) -> bool:
+    """Deterministic per run, so the prompt and the response of one LLM call are both kept or both skipped."""
+    if rate >= 1:
+        return True
+    if rate <= 0:
+        return False
+    key = run_id.int if isinstance(run_id, uuid.UUID) else hash(run_id)
+    return key % 10_000 < rate * 10_000
+
+
+def log_trace(logger: logging.Logger, event: str, text: str, run_id=None, title: Optional[str] = None,
+              max_chars: int = LOG_PROMPT_MAX_CHARS):
+    """
+    Logs a captured prompt or response: the text is cut to max_chars on the calling thread (cheap), printed
+    and serialized on the listener thread.
+    :param event: e.g. "llm_prompt", "llm_response"
+    :param run_id: LLM run id, recorded in the structured fields
+    :param title: console / message heading (default: the event)
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    size = len(text)
+    fields = {"event": event, "run_id": str(run_id) if run_id else None, "chars": size,
+              "truncated": size > max_chars, "text": text[:max_chars]}
+    note = f", cut to {max_chars}" if size > max_chars else ""
+    logger.info(f"{title or event} ({size} chars{note})", extra={"fields": fields})
@@ -1,15 +1,24 @@
 import logging
-from rich.logging import RichHandler
-# Configure basic config with RichHandler
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(message)s", # Rich handles the timestamp and level separately
-    datefmt="[%X]",
-    handlers=[RichHandler(rich_tracebacks=True)]
-)
+import os
+from logging_config import setup_logging
+# Central, queued logging (console and optional JSONL, see logging_config)
+setup_logging()
 
 logger = logging.getLogger("prompt_eng")
 
+# Question keys every prompt version must answer (see analysis.ANALYSIS_STEPS)
+QUESTION_KEYS = ("q_meta", "q1", "q2", "q3", "q4", "q5", "q6", "q7", "q8", "q9")
+
+# Job metadata for the tracker, shared by every version (parsed by analysis.parse_job_meta)
+q_meta = """
+    Task: Extract the Company Name and the Job Title from the Job Description.
+    Constraint: Output ONLY a valid JSON object. Do not include markdown formatting, backticks, or conversational text.
+    If you cannot find the information, use "Unknown" as the value.
+    
+    Expected Format:
+    {"company": "Extracted Company Name", "title": "Extracted Job Title"}
+    """
+
 v1 = {
             "q1": "Does the candidate meet the required skills?",
             "q2": "Is the candidate a good fit for the job position?",
@@ -22,7 +31,8 @@ v1 = {
                   "contact information",
             "q8": "Suggest ways to stand out for this specific role",
             "q9": "Implementing the STAR Framework, Pretend you are the candidate and put together a speech based on the resume and the job"
-                  "description and requirements"
+                  "description and requirements",
+            "q_meta": q_meta
         }
 
 v2 = {
@@ -95,14 +105,7 @@ v2 = {
       candidate is the perfect fit for THIS job description.
     """,
     ## this prompt is going to ask the LLM to extract the Job Title and Company for the tracker
-    "q_meta":"""
-    Task: Extract the Company Name and the Job Title from the Job Description.
-    Constraint: Output ONLY a valid JSON object. Do not include markdown formatting, backticks, or conversational text.
-    If you cannot find the information, use "Unknown" as the value.
-    
-    Expected Format:
-    {"company": "Extracted Company Name", "title": "Extracted Job Title"}
-    """
+    "q_meta": q_meta
 }
 
 
@@ -121,6 +124,12 @@ prompt_template = """
         2- Fairly Analyze and Interpret the candidate resume based on the job description and provide a professional assessment.
         """
 
+# Registered prompt versions (see register_prompt_version)
+PROMPT_VERSIONS: dict[str, dict[str, str]] = {"v1": v1, "v2": v2}
+# Prompt version of new analyses
+PROMPT_VERSION = os.getenv("PROMPT_VERSION", "v2")
+
+
 def jd_as_context(jd: str)->str:
     """
     This function creates a Based Query that combines the job description
@@ -131,21 +140,28 @@ def jd_as_context(jd: str)->str:
     base_query = f"Based on this Job Description: \n\n {jd} \n\n Answer this: "
     return base_query
 
-def get_prompt_ver(version: str)-> dict[str, str] | None:
+def register_prompt_version(version: str, questions: dict[str, str]):
     """
-
-    :param version:
-    :return:
+    Adds (or replaces) a prompt version, e.g. a candidate set to profile before it ships.
+    :param version: version name
+    :param questions: question key -> prompt, every QUESTION_KEYS entry is required
     """
+    missing = [key for key in QUESTION_KEYS if not questions.get(key)]
+    if missing:
+        raise ValueError(f"Prompt version {version} has no prompt for {missing}")
+    PROMPT_VERSIONS[version] = dict(questions)
 
-    prompt_version = {
-        "v1":v1,
-        "v2":v2
-        }
+
+def get_prompt_ver(version: str)-> dict[str, str] | None:
+    """
+    Prompts of a registered version.
+    :param version: e.g. "v1", "v2" (see PROMPT_VERSIONS)
+    :return: question key -> prompt, None for an unknown version
+    """
     try:
-        prompt = prompt_version[version]
+        prompt = PROMPT_VERSIONS[version]
         logger.info(f"ℹ️  Return Prompt version {version}")
         return prompt
     except Exception as e:
         logger.warning(f"️⚠️️ Prompt version {version} Not Found!!\n\n{e}")
-        return None
\ No newline at end of file
+        return None
@@ -3,118 +3,295 @@ from langchain_classic.chains.retrieval_qa.base import RetrievalQA
 from prompt_eng_recruiter import prompt_template
 # Embeddings & Chat Model
 # (Now live in the dedicated langchain_openai package)
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-import langchain
-from langchain_classic.embeddings import CacheBackedEmbeddings
+# Clients are created once per process in resources
+import resources
+from langchain_core.globals import set_debug
 
 # Vector Store
 # (Lives in langchain_community)
 from langchain_community.vectorstores import FAISS
+from vector_store_cache import load_vector_store, save_vector_store
 
 # Prompts
 # (ChatPromptTemplate is preferred over PromptTemplate for Chat Models)
-from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
+from langchain_core.prompts import PromptTemplate
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.documents import Document
 # 5. Chains
 #from langchain_classic.chains import create_retrieval_chain
 #from langchain_classic.chains.combine_documents import create_stuff_documents_chain
 #from langchain_core.documents import Document
 
 # Logging and OpenAI configuration and logging
-from rich.logging import RichHandler
+from logging_config import setup_logging
 from dotenv import load_dotenv
 from openai import RateLimitError
+from collections import OrderedDict
+from typing import Optional
+import functools
+import threading
 import logging
 
-langchain.debug = True
-
 # OS
 import os
 
-# Configure basic config with RichHandler
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(message)s", # Rich handles the timestamp and level separately
-    datefmt="[%X]",
-    handlers=[RichHandler(rich_tracebacks=True)]
-)
+# Central, queued logging (console and optional JSONL, see logging_config)
+setup_logging()
 
 logger = logging.getLogger("rag")
 
+_prompt = None
+
 # load the env variables
 load_dotenv(dotenv_path=".env")
 
+# Global LangChain debug tracing prints every call synchronously to stdout (not through the log queue),
+# opt-in for local debugging only; VERBOSE_RAG_LOGS captures sampled prompts through logging_config instead
+set_debug(os.getenv("LANGCHAIN_DEBUG", "false").lower() == "true")
+
+# Resume context: auto (whole resume up to the token budget, retrieval above it) | whole | retrieval
+CONTEXT_STRATEGY = os.getenv("CONTEXT_STRATEGY", "auto").lower()
+# Largest resume (tokens) sent whole with every question, instead of the top-k retrieved chunks
+CONTEXT_WHOLE_MAX_TOKENS = int(os.getenv("CONTEXT_WHOLE_MAX_TOKENS", "4000"))
+# Whole-resume chains kept in memory (the retrieval chains live on their cached vector store)
+WHOLE_CHAIN_CACHE_SIZE = int(os.getenv("WHOLE_CHAIN_CACHE_SIZE", "64"))
+WHOLE, RETRIEVAL = "whole", "retrieval"
+VECTOR_DB_DIR = 'vector_db'
+
+_whole_chains: OrderedDict[tuple, RetrievalQA] = OrderedDict()
+_whole_chains_lock = threading.Lock()
+
+
+class WholeDocumentRetriever(BaseRetriever):
+    """Returns the whole resume for every question: no embeddings, no index."""
+    documents: list[Document]
+
+    def _get_relevant_documents(self, query, *, run_manager) -> list[Document]:
+        return self.documents
+
+    async def _aget_relevant_documents(self, query, *, run_manager) -> list[Document]:
+        return self.documents
+
+
+@functools.lru_cache(maxsize=1)
+def _token_encoder():
+    import tiktoken
+    try:
+        return tiktoken.encoding_for_model("gpt-4o")
+    except Exception as e:
+        logger.warning(f"⚠️ tiktoken encoding unavailable, token counts estimated from the length: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Tokens of the text for the chat model (about 4 characters per token without tiktoken)."""
+    encoder = _token_encoder()
+    return len(encoder.encode(text, disallowed_special=())) if encoder is not None else len(text) // 4 + 1
+
+
+def select_context_strategy(resume_text: str) -> tuple[str, int]:
+    """
+    Whole resume when it fits the budget (CONTEXT_WHOLE_MAX_TOKENS), retrieval for long documents.
+    :return: (whole | retrieval, resume tokens)
+    """
+    tokens = count_tokens(resume_text)
+    if CONTEXT_STRATEGY in (WHOLE, RETRIEVAL):
+        return CONTEXT_STRATEGY, tokens
+    return (WHOLE if tokens <= CONTEXT_WHOLE_MAX_TOKENS else RETRIEVAL), tokens
+
+
+def context_strategy(qa_chain) -> str:
+    """Strategy of a chain built by get_rag_chain."""
+    return WHOLE if isinstance(getattr(qa_chain, "retriever", None), WholeDocumentRetriever) else RETRIEVAL
+
+
 def clean_filename(name: str):
     import re
     name = name.replace(".pdf", "")
     return re.sub(r"[^a-zA-Z0-9_-]", "_", name)
 
-def get_rag_chain(resume_text, resume_file_name):
+
+def resume_key(resume_file_name: str, resume_hash: str) -> str:
+    """
+    Id of a stored resume (vector_db/index_<key>, vector_db/doc_<key>.txt, candidate pool label).
+    The content hash keeps two different resumes uploaded under the same file name apart.
+    :param resume_file_name: resume file name
+    :param resume_hash: resume content hash (see history_store.content_hash)
+    """
+    return f"{clean_filename(resume_file_name)}_{resume_hash[:12]}"
 
 
-    # Initialize the OpenAI Embeddings model with API credentials
-    embeddings = OpenAIEmbeddings(
-        api_key=os.getenv("OPENAI_API_KEY"),  # OpenAI API key for authentication
-        chunk_size=10,
-        max_retries=5
+def resume_stored(candidate: str) -> bool:
+    """True when an analysis kept the resume (whole text or vector store) under this key."""
+    return os.path.exists(resume_document_path(candidate)) or os.path.exists(f"{VECTOR_DB_DIR}/index_{candidate}.faiss")
+
+def get_embeddings():
+    """
+    Shared OpenAI Embeddings model (pooled keep-alive HTTP client, created once per process)
+    :return: OpenAIEmbeddings
+    """
+    return resources.get_embeddings()
+
+
+def get_prompt() -> PromptTemplate:
+    global _prompt
+    if _prompt is None:
+        _prompt = PromptTemplate(
+            template=prompt_template, input_variables=["context", "question"]
+        )
+    return _prompt
+
+
+def build_qa_chain(retriever, llm=None):
+    """
+    Creates the RetrievalQA chain (recruiter prompt + gpt-4o) on top of any retriever
+    :param retriever: LangChain retriever providing the resume context
+    :param llm: chat model (default: the shared gpt-4o client), e.g. a stand-in for offline profiling
+    :return: RetrievalQA chain
+    """
+    # 5. Create the Chain (the model client is shared, only the retriever is specific)
+    if llm is None:
+        llm = resources.get_chat_model(model="gpt-4o", temperature=0)  # Use gpt-4 or gpt-3.5-turbo
+
+    qa_chain = RetrievalQA.from_chain_type(
+        llm=llm,
+        chain_type="stuff",
+        retriever=retriever,
+        return_source_documents=True,
+        chain_type_kwargs={"prompt": get_prompt()}
     )
 
+    return qa_chain
+
+
+def resume_document_path(candidate: str) -> str:
+    """Resume text kept for the whole-document strategy (sections generated later, candidate pool)."""
+    return f"{VECTOR_DB_DIR}/doc_{candidate}.txt"
+
+
+def build_resume_vector_store(resume_text: str, candidate: str) -> FAISS:
+    """
+    Splits, embeds and stores the resume (retrieval strategy).
+    :param candidate: stored resume key (see resume_key)
+    :return: FAISS vector store, saved as vector_db/index_<candidate>
+    """
+    embeddings = get_embeddings()
+    # 1. Split the text into chunks
+    logger.info("ℹ️  Split text into chunks")
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1200, chunk_overlap=100)
+    chunks = text_splitter.split_text(resume_text)
+
+    try:
+        # 2. Creating Embeddings
+        logger.info("ℹ️  Creating Embeddings .")
+        # Tag every chunk with its candidate so it can be merged into the candidate pool
+        vectorstore_local = FAISS.from_texts(
+            chunks,
+            embedding=embeddings,
+            metadatas=[{"candidate": candidate, "chunk": i} for i in range(len(chunks))]
+        )
+    except RateLimitError as e:
+        logging.exception("🚨 Rate limit hit!")
+        logging.error(e)
+        raise
+
+    logger.info("ℹ️  Storing Vector Store for Caching ..")
+    save_vector_store(vectorstore_local, folder_path=VECTOR_DB_DIR, index_name=f"index_{candidate}")
+    return vectorstore_local
+
+
+def _whole_document_chain(candidate: str, resume_text: str, write: bool):
+    """
+    Chain giving the whole resume to the model, one per candidate and token budget (LRU, WHOLE_CHAIN_CACHE_SIZE).
+    :param write: keep the text in vector_db/doc_<candidate>.txt when the chain is built
+    """
+    key = (candidate, CONTEXT_WHOLE_MAX_TOKENS)
+    with _whole_chains_lock:
+        qa_chain = _whole_chains.get(key)
+        if qa_chain is not None and qa_chain.retriever.documents[0].page_content == resume_text:
+            _whole_chains.move_to_end(key)
+            return qa_chain
+
+    if write:
+        # Kept for on-demand sections and for the candidate pool (embedded when the pool is synced)
+        document_path = resume_document_path(candidate)
+        tmp_path = f"{document_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(resume_text)
+        os.replace(tmp_path, document_path)
+    document = Document(page_content=resume_text, metadata={"candidate": candidate})
+    qa_chain = build_qa_chain(WholeDocumentRetriever(documents=[document]))
+    with _whole_chains_lock:
+        _whole_chains[key] = qa_chain
+        _whole_chains.move_to_end(key)
+        while len(_whole_chains) > WHOLE_CHAIN_CACHE_SIZE:
+            _whole_chains.popitem(last=False)
+    return qa_chain
+
+
+def get_rag_chain(resume_text, candidate):
+    """
+    RetrievalQA chain over the resume. Short resumes are given whole to the model, long ones go through the
+    vector store (see select_context_strategy).
+    :param resume_text: resume text (empty: reuse what an earlier analysis of this resume stored)
+    :param candidate: stored resume key (see resume_key)
+    :return: RetrievalQA chain (context_strategy(chain) tells which strategy it uses)
+    :raises ValueError: no resume text given and nothing stored for the candidate
+    """
+    if not resume_text and not resume_stored(candidate):
+        raise ValueError(f"no resume text or stored resume for {candidate}")
     ## Vector DB Persistence
-    out_dir = 'vector_db'  # name of the vector database
+    out_dir = VECTOR_DB_DIR  # name of the vector database
     ## Check if the Vector Store exist
     if not os.path.exists(out_dir):
         os.makedirs(out_dir)
+    document_path = resume_document_path(candidate)
+    stored_text = not resume_text
+    if stored_text and os.path.exists(document_path):
+        # Sections of an analysis made with the whole resume: its text was kept, not indexed
+        with open(document_path, encoding="utf-8") as f:
+            resume_text = f.read()
+
+    tokens: Optional[int] = None
+    strategy = RETRIEVAL
+    if resume_text:
+        strategy, tokens = select_context_strategy(resume_text)
+    logger.info(f"ℹ️  Context strategy for {candidate}: {strategy} ({tokens} tokens, "
+                f"budget {CONTEXT_WHOLE_MAX_TOKENS})",
+                extra={"fields": {"event": "context_strategy", "candidate": candidate, "strategy": strategy,
+                                  "tokens": tokens, "budget": CONTEXT_WHOLE_MAX_TOKENS}})
+
+    if strategy == WHOLE:
+        return _whole_document_chain(candidate, resume_text, write=not stored_text)
+
+    embeddings = get_embeddings()
     # Defining index file name
-    db_index_file_name = f"index_{clean_filename(resume_file_name)}"
+    db_index_file_name = f"index_{candidate}"
     # Defining faiss path
     db_faiss_path = f"{out_dir}/{db_index_file_name}.faiss"
     logger.info("ℹ️  Checking for Vector Store ")
     if os.path.exists(db_faiss_path):
         logger.info(f"ℹ️  Existing vector store found: {db_faiss_path}")
-        # Load existing
-        vectorstore_local = FAISS.load_local(
+        # Load existing (memory-mapped, cached across sessions)
+        vectorstore_local = load_vector_store(
             folder_path=out_dir,
-            embeddings=embeddings,
-            allow_dangerous_deserialization=True,
-            index_name=f"{db_index_file_name}"
+            index_name=db_index_file_name,
+            embeddings=embeddings
         )
     else:
         logger.warning("⚠️ No vector store found ..")
-        # 1. Split the text into chunks
-        logger.info("ℹ️  Split text into chunks")
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=1200, chunk_overlap=100)
-        chunks = text_splitter.split_text(resume_text)
+        vectorstore_local = build_resume_vector_store(resume_text, candidate)
 
+        # Keep the pooled candidate index in sync (reuses the vectors, no extra embedding calls)
         try:
-            # 2. Creating Embeddings
-            logger.info("ℹ️  Creating Embeddings .")
-            vectorstore_local = FAISS.from_texts(chunks, embedding=embeddings)
-        except RateLimitError as e:
-            logging.exception("🚨 Rate limit hit!")
-            logging.error(e)
-            raise
-
-        logger.info("ℹ️  Storing Vector Store for Caching ..")
-        vectorstore_local.save_local(folder_path=out_dir, index_name=db_index_file_name)
-
-    # 3. Setup the Retriever
-    # We will retrieve the top 3 most relevant chunks of the resume
-    retriever = vectorstore_local.as_retriever(search_type="similarity", search_kwargs={"k": 3})
-
-
-
-    prompt = PromptTemplate(
-        template=prompt_template, input_variables=["context", "question"]
-    )
-
-    # 5. Create the Chain
-    llm = ChatOpenAI(model="gpt-4o", temperature=0)  # Use gpt-4 or gpt-3.5-turbo
+            from candidate_pool import add_candidate_to_pool
+            add_candidate_to_pool(vectorstore_local, candidate, embeddings)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not add {candidate} to the candidate pool: {e}")
 
-    qa_chain = RetrievalQA.from_chain_type(
-        llm=llm,
-        chain_type="stuff",
-        retriever=retriever,
-        return_source_documents=True,
-        chain_type_kwargs={"prompt": prompt}
+    # 3. Setup the Retriever and the Chain, once per loaded vector store
+    # We will retrieve the top 3 most relevant chunks of the resume
+    return resources.get_cached_chain(
+        vectorstore_local,
+        lambda: build_qa_chain(vectorstore_local.as_retriever(search_type="similarity", search_kwargs={"k": 3}))
     )
-
-    return qa_chain
\ No newline at end of file
@@ -0,0 +1,129 @@
+import threading
+import logging
+import httpx
+import os
+
+logger = logging.getLogger("resources")
+
+# Connection pool of the shared HTTP client (OpenAI API)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "120"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "120"))
+
+# Process-wide resources, shared by every Streamlit session and every question
+_lock = threading.RLock()
+_http_client = None
+_http_async_client = None
+_models: dict = {}
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Returns the shared keep-alive HTTP client, TLS connections to the API are reused across reruns.
+    :return: httpx.Client
+    """
+    global _http_client
+    with _lock:
+        if _http_client is None or _http_client.is_closed:
+            logger.info("ℹ️  Creating shared HTTP client pool")
+            _http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+                ),
+                timeout=HTTP_TIMEOUT,
+            )
+        return _http_client
+
+
+def get_http_async_client() -> httpx.AsyncClient:
+    """
+    Returns the shared async keep-alive HTTP client.
+    Async calls (ainvoke) only run on the analysis job loop (see job_queue), so the pool is bound to that loop.
+    :return: httpx.AsyncClient
+    """
+    global _http_async_client
+    with _lock:
+        if _http_async_client is None or _http_async_client.is_closed:
+            _http_async_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+                ),
+                timeout=HTTP_TIMEOUT,
+            )
+        return _http_async_client
+
+
+def _cached_model(key: tuple, factory):
+    with _lock:
+        if key not in _models:
+            logger.info(f"ℹ️  Creating model client {key[0]} {dict(key[1:])}")
+            _models[key] = factory()
+        return _models[key]
+
+
+def get_embeddings(**kwargs):
+    """
+    Shared OpenAIEmbeddings client, one per configuration.
+    :param kwargs: OpenAIEmbeddings parameters (defaults: chunk_size=10, max_retries=5)
+    :return: OpenAIEmbeddings
+    """
+    from langchain_openai import OpenAIEmbeddings
+    params = {"chunk_size": 10, "max_retries": 5, **kwargs}
+    return _cached_model(
+        ("embeddings", *sorted(params.items())),
+        lambda: OpenAIEmbeddings(
+            api_key=os.getenv("OPENAI_API_KEY"),  # OpenAI API key for authentication
+            http_client=get_http_client(),
+            http_async_client=get_http_async_client(),
+            **params
+        )
+    )
+
+
+def get_chat_model(model: str = "gpt-4o", temperature: float = 0, **kwargs):
+    """
+    Shared ChatOpenAI client, one per configuration.
+    :param model: model name
+    :param temperature: sampling temperature
+    :param kwargs: extra ChatOpenAI parameters
+    :return: ChatOpenAI
+    """
+    from langchain_openai import ChatOpenAI
+    params = {"model": model, "temperature": temperature, **kwargs}
+    return _cached_model(
+        ("chat", *sorted(params.items())),
+        lambda: ChatOpenAI(http_client=get_http_client(), http_async_client=get_http_async_client(), **params)
+    )
+
+
+def get_cached_chain(vectorstore, factory, name: str = "qa"):
+    """
+    Returns the chain built on top of a vector store, building it once per vector store object.
+    The chain is attached to the vector store, so it goes away with it (e.g. evicted from the vector store LRU).
+    :param vectorstore: FAISS vector store
+    :param factory: callable building the chain
+    :param name: chain name, for several chains on the same vector store
+    :return: chain
+    """
+    with _lock:
+        chains = vectorstore.__dict__.setdefault("_cached_chains", {})
+        if name not in chains:
+            chains[name] = factory()
+        return chains[name]
+
+
+def close_resources():
+    """Closes the shared HTTP client and drops every cached model client."""
+    global _http_client, _http_async_client
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+        _http_client = None
+        # The async pool is bound to the job loop, it is dropped (closed with the loop)
+        _http_async_client = None
+        _models.clear()
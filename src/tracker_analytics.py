@@ -0,0 +1,182 @@
+from tracker_events import TRACKER_EVENTS_FILE, EVENT_COLUMNS
+from datetime import datetime
+from typing import Optional
+import pandas as pd
+import numpy as np
+import threading
+import logging
+import io
+import os
+
+logger = logging.getLogger("tracker_analytics")
+
+# Funnel stages in order, an application that reached a stage went through the earlier ones
+PIPELINE_STAGES = ["Applied", "Screening", "Interviewing", "Offer"]
+# Final statuses, no time-in-stage is counted for them
+FINAL_STATUSES = ["Offer", "Rejected", "Ghosted"]
+
+_STAGE_CODES = {stage: code for code, stage in enumerate(PIPELINE_STAGES)}
+_DAY = np.timedelta64(1, "D")
+
+
+def _stage_codes(statuses: pd.Series) -> np.ndarray:
+    """Funnel position of a status, -1 for statuses outside the funnel (Rejected, Ghosted)."""
+    return statuses.map(_STAGE_CODES).fillna(-1).to_numpy(dtype=np.int8)
+
+
+class FunnelAnalytics:
+    """
+    Funnel, time-in-stage and weekly cohort analytics over the status event log.
+    The log is append-only, so only the bytes added since the last refresh are parsed. The state is one row
+    per application (first event, furthest stage, current status) plus the closed stage durations.
+    """
+
+    def __init__(self, path: str = TRACKER_EVENTS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._offset = 0
+        self._inode = None
+        self._applications = pd.DataFrame(
+            {"first_ts": pd.Series(dtype="datetime64[ns]"), "reached": pd.Series(dtype=np.int8),
+             "status": pd.Series(dtype=object), "status_ts": pd.Series(dtype="datetime64[ns]")}
+        ).rename_axis("Application ID")
+        self._durations = pd.DataFrame({"stage": pd.Series(dtype=object), "days": pd.Series(dtype=float)})
+
+    # --- Incremental precompute ---
+    def _read_new_events(self) -> pd.DataFrame:
+        if not os.path.exists(self.path):
+            self._reset()
+            return pd.DataFrame(columns=EVENT_COLUMNS)
+        stat = os.stat(self.path)
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            # Log replaced or truncated: start over
+            self._reset()
+            self._inode = stat.st_ino
+        with open(self.path, "rb") as f:
+            if self._offset == 0:
+                # Skip the header
+                self._offset = len(f.readline())
+            f.seek(self._offset)
+            data = f.read()
+        # Only complete lines, a concurrent append may be half written
+        data = data[:data.rfind(b"\n") + 1]
+        self._offset += len(data)
+        if not data:
+            return pd.DataFrame(columns=EVENT_COLUMNS)
+        events = pd.read_csv(io.BytesIO(data), names=EVENT_COLUMNS, header=None,
+                             dtype={"Application ID": str, "From Status": str, "To Status": str},
+                             keep_default_na=False)
+        events["Timestamp"] = pd.to_datetime(events["Timestamp"], format="ISO8601")
+        return events
+
+    def refresh(self) -> "FunnelAnalytics":
+        """Folds the events appended since the last refresh into the precomputed state."""
+        with self._lock:
+            events = self._read_new_events()
+            if events.empty:
+                return self
+
+            # The open stage of every application seen before continues from its last event
+            known = self._applications.index.intersection(events["Application ID"].unique())
+            carried = pd.DataFrame({
+                "Application ID": known,
+                "Timestamp": self._applications.loc[known, "status_ts"].to_numpy(),
+                "To Status": self._applications.loc[known, "status"].to_numpy(),
+            })
+            sequence = pd.concat([carried, events[["Application ID", "Timestamp", "To Status"]]], ignore_index=True)
+            sequence = sequence.sort_values(["Application ID", "Timestamp"], kind="stable")
+
+            # Closed stage durations: from one event to the next of the same application
+            next_ts = sequence.groupby("Application ID")["Timestamp"].shift(-1)
+            closed = next_ts.notna().to_numpy()
+            self._durations = pd.concat([self._durations, pd.DataFrame({
+                "stage": sequence["To Status"].to_numpy()[closed],
+                "days": (next_ts.to_numpy()[closed] - sequence["Timestamp"].to_numpy()[closed]) / _DAY,
+            })], ignore_index=True)
+
+            sequence["reached"] = _stage_codes(sequence["To Status"])
+            batch = sequence.groupby("Application ID").agg(
+                first_ts=("Timestamp", "min"), reached=("reached", "max"),
+                status=("To Status", "last"), status_ts=("Timestamp", "last"),
+            )
+            merged = batch.combine_first(self._applications)
+            merged.loc[known, "first_ts"] = np.minimum(
+                self._applications.loc[known, "first_ts"].to_numpy(), batch.loc[known, "first_ts"].to_numpy()
+            )
+            merged.loc[known, "reached"] = np.maximum(
+                self._applications.loc[known, "reached"].to_numpy(), batch.loc[known, "reached"].to_numpy()
+            )
+            self._applications = merged
+            logger.info(f"ℹ️  Funnel analytics: {len(events)} new event(s), {len(merged)} application(s)")
+        return self
+
+    # --- Views ---
+    def funnel(self) -> pd.DataFrame:
+        """
+        Applications that reached each stage, with the conversion from the previous stage.
+        :return: DataFrame indexed by stage (Applications, Conversion %, Overall %)
+        """
+        reached = self._applications["reached"].to_numpy()
+        counts = np.array([(reached >= code).sum() for code in range(len(PIPELINE_STAGES))])
+        # Applications only seen as Rejected / Ghosted still entered the funnel
+        counts[0] = len(reached)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            conversion = np.where(np.r_[counts[0], counts[:-1]] > 0, counts / np.r_[counts[0], counts[:-1]], 0)
+            overall = np.where(counts[0] > 0, counts / max(counts[0], 1), 0)
+        return pd.DataFrame({
+            "Applications": counts,
+            "Conversion %": np.round(conversion * 100, 1),
+            "Overall %": np.round(overall * 100, 1),
+        }, index=pd.Index(PIPELINE_STAGES, name="Stage"))
+
+    def time_in_stage(self, now: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        Days spent per stage: closed stays plus the open stay of applications still in a non-final stage.
+        :return: DataFrame indexed by stage (Count, Mean, Median, P75, P90 in days)
+        """
+        now = np.datetime64(pd.Timestamp(now or datetime.now()))
+        open_stays = self._applications[~self._applications["status"].isin(FINAL_STATUSES)]
+        durations = pd.concat([self._durations, pd.DataFrame({
+            "stage": open_stays["status"].to_numpy(),
+            "days": (now - open_stays["status_ts"].to_numpy()) / _DAY,
+        })], ignore_index=True)
+        durations = durations[~durations["stage"].isin(FINAL_STATUSES) & (durations["stage"] != "")]
+        grouped = durations.groupby("stage")["days"]
+        table = pd.DataFrame({
+            "Count": grouped.size(),
+            "Mean": grouped.mean(),
+            "Median": grouped.median(),
+            "P75": grouped.quantile(0.75),
+            "P90": grouped.quantile(0.9),
+        }).round(1)
+        order = [stage for stage in PIPELINE_STAGES if stage in table.index]
+        return table.loc[order + [stage for stage in table.index if stage not in order]].rename_axis("Stage")
+
+    def weekly_cohorts(self) -> pd.DataFrame:
+        """
+        Share of each weekly cohort (week of the first event) that reached every stage.
+        :return: DataFrame indexed by cohort week (Applications, then one % column per stage)
+        """
+        applications = self._applications
+        if applications.empty:
+            return pd.DataFrame(columns=["Applications", *PIPELINE_STAGES[1:]])
+        week = applications["first_ts"].dt.to_period("W").dt.start_time.rename("Week")
+        reached = applications["reached"].to_numpy()[:, None] >= np.arange(1, len(PIPELINE_STAGES))[None, :]
+        flags = pd.DataFrame(reached, index=applications.index, columns=PIPELINE_STAGES[1:])
+        cohorts = flags.groupby(week.to_numpy()).mean().mul(100).round(1)
+        cohorts.insert(0, "Applications", flags.groupby(week.to_numpy()).size())
+        return cohorts.rename_axis("Week").sort_index()
+
+
+_analytics: dict[str, FunnelAnalytics] = {}
+_analytics_lock = threading.Lock()
+
+
+def get_funnel_analytics(path: str = TRACKER_EVENTS_FILE) -> FunnelAnalytics:
+    """Process-wide analytics of an event log, refreshed with the events appended since the last call."""
+    with _analytics_lock:
+        analytics = _analytics.setdefault(os.path.abspath(path), FunnelAnalytics(path))
+    return analytics.refresh()
@@ -0,0 +1,72 @@
+from datetime import datetime
+from typing import Optional
+import pandas as pd
+import logging
+import os
+
+logger = logging.getLogger("tracker_events")
+
+# Append-only log of the application status transitions
+TRACKER_EVENTS_FILE = "tracker_events.csv"
+EVENT_COLUMNS = ["Timestamp", "Application ID", "From Status", "To Status"]
+
+
+def status_changes(previous: Optional[pd.DataFrame], current: pd.DataFrame,
+                   now: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Status transitions between two versions of the tracker, matched on Application ID.
+    New applications start with an event at their Date Applied (from an empty status).
+    :param previous: saved tracker (None when there is none yet)
+    :param current: tracker about to be saved
+    :param now: timestamp of the changes
+    :return: events DataFrame (EVENT_COLUMNS)
+    """
+    now = pd.Timestamp(now or datetime.now()).floor("s")
+    current = current[["Application ID", "Status", "Date Applied"]].dropna(subset=["Application ID", "Status"])
+    if previous is None or previous.empty:
+        previous = pd.DataFrame(columns=["Application ID", "Status"])
+
+    # Plain strings: categorical statuses with different categories can't be compared
+    current = current.astype({"Application ID": object, "Status": object})
+    previous = previous[["Application ID", "Status"]].astype(object)
+    merged = current.merge(previous, on="Application ID", how="left", suffixes=("", " Before"))
+    changed = merged[merged["Status"] != merged["Status Before"]]
+
+    created = changed["Status Before"].isna()
+    applied = pd.to_datetime(changed["Date Applied"], errors="coerce")
+    timestamps = applied.where(created & applied.notna(), now)
+    return pd.DataFrame({
+        "Timestamp": timestamps.dt.strftime("%Y-%m-%dT%H:%M:%S"),
+        "Application ID": changed["Application ID"],
+        "From Status": changed["Status Before"].fillna(""),
+        "To Status": changed["Status"],
+    }, columns=EVENT_COLUMNS)
+
+
+def append_events(events: pd.DataFrame, path: str = TRACKER_EVENTS_FILE):
+    """Appends events to the log (the file is never rewritten)."""
+    if events.empty:
+        return
+    write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+    events.to_csv(path, mode="a", header=write_header, index=False)
+    logger.info(f"ℹ️  {len(events)} status event(s) logged")
+
+
+def record_status_changes(previous: Optional[pd.DataFrame], current: pd.DataFrame,
+                          path: str = TRACKER_EVENTS_FILE):
+    """Logs the status transitions between the saved tracker and the one about to be saved."""
+    try:
+        append_events(status_changes(previous, current), path)
+    except Exception as e:
+        # The tracker itself must still be saved
+        logger.warning(f"⚠️ Could not log status changes: {e}")
+
+
+def load_events(path: str = TRACKER_EVENTS_FILE) -> pd.DataFrame:
+    """Full event log, oldest first."""
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+    events = pd.read_csv(path, dtype={"Application ID": str, "From Status": str, "To Status": str},
+                         keep_default_na=False)
+    events["Timestamp"] = pd.to_datetime(events["Timestamp"], format="ISO8601")
+    return events
@@ -0,0 +1,201 @@
+from langchain_community.vectorstores import FAISS
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_core.documents import Document
+from collections import OrderedDict
+from typing import Optional
+import threading
+import logging
+import orjson
+import faiss
+import time
+import os
+
+logger = logging.getLogger("vector_store_cache")
+
+# Memory budget of the in-process LRU (MB)
+VECTOR_STORE_CACHE_MB = int(os.getenv("VECTOR_STORE_CACHE_MB", "512"))
+
+# Memory-mapped, read-only indexes: pages are shared between Streamlit workers through the OS page cache.
+# IMPORTANT: a mapped index cannot be modified (faiss aborts on add), use mmap=False for indexes that grow.
+MMAP_IO_FLAGS = faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY
+# Reads of an index and a docstore that don't belong together (a save in progress) are retried this many times
+PAIR_READ_ATTEMPTS = 5
+
+
+def _docstore_path(folder_path: str, index_name: str) -> str:
+    return f"{folder_path}/{index_name}.docstore.json"
+
+
+def _tmp_path(path: str) -> str:
+    return f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+
+
+def save_vector_store(vectorstore: FAISS, folder_path: str, index_name: str):
+    """
+    Persists a FAISS vector store as <index_name>.faiss + <index_name>.docstore.json (no pickle).
+    Both files are written to temp files first and renamed, the docstore last: readers (and existing mmaps)
+    never see a partial file, and a reader between the two renames sees more vectors than documents (retried).
+    :param vectorstore: FAISS vector store
+    :param folder_path: output folder
+    :param index_name: index file name (without extension)
+    """
+    os.makedirs(folder_path, exist_ok=True)
+    index_path = f"{folder_path}/{index_name}.faiss"
+    docstore_path = _docstore_path(folder_path, index_name)
+
+    ids = [vectorstore.index_to_docstore_id[i] for i in range(len(vectorstore.index_to_docstore_id))]
+    documents = {}
+    for doc_id in ids:
+        doc = vectorstore.docstore.search(doc_id)
+        documents[doc_id] = {"page_content": doc.page_content, "metadata": doc.metadata}
+
+    tmp_index_path, tmp_docstore_path = _tmp_path(index_path), _tmp_path(docstore_path)
+    try:
+        faiss.write_index(vectorstore.index, tmp_index_path)
+        with open(tmp_docstore_path, "wb") as f:
+            f.write(orjson.dumps({"index_to_docstore_id": ids, "documents": documents}))
+        os.replace(tmp_index_path, index_path)
+        os.replace(tmp_docstore_path, docstore_path)
+    finally:
+        for path in (tmp_index_path, tmp_docstore_path):
+            if os.path.exists(path):
+                os.remove(path)
+    invalidate_vector_store(folder_path, index_name)
+
+
+def _read_vector_store(folder_path: str, index_name: str, embeddings, mmap: bool) -> FAISS:
+    index_path = f"{folder_path}/{index_name}.faiss"
+    docstore_path = _docstore_path(folder_path, index_name)
+
+    if not os.path.exists(docstore_path):
+        # Legacy store saved with save_local (pickle), migrate it once to the safe format
+        logger.warning(f"⚠️ Migrating legacy pickle docstore: {index_name}")
+        legacy = FAISS.load_local(
+            folder_path=folder_path,
+            embeddings=embeddings,
+            allow_dangerous_deserialization=True,
+            index_name=index_name
+        )
+        save_vector_store(legacy, folder_path, index_name)
+
+    for attempt in range(PAIR_READ_ATTEMPTS):
+        index = faiss.read_index(index_path, MMAP_IO_FLAGS if mmap else 0)
+        with open(docstore_path, "rb") as f:
+            payload = orjson.loads(f.read())
+        # Every vector needs its document, fewer vectors than documents is fine (never returned by a search)
+        if index.ntotal <= len(payload["index_to_docstore_id"]):
+            break
+        if attempt == PAIR_READ_ATTEMPTS - 1:
+            raise ValueError(f"{index_name}: {index.ntotal} vectors but "
+                             f"{len(payload['index_to_docstore_id'])} documents, the store is inconsistent")
+        # A save in progress, the docstore is renamed right after the index
+        time.sleep(0.05 * (attempt + 1))
+
+    docstore = InMemoryDocstore({
+        doc_id: Document(id=doc_id, page_content=doc["page_content"], metadata=doc["metadata"])
+        for doc_id, doc in payload["documents"].items()
+    })
+    index_to_docstore_id = dict(enumerate(payload["index_to_docstore_id"]))
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=index_to_docstore_id
+    )
+
+
+def _estimate_size(vectorstore: FAISS) -> int:
+    """Rough memory footprint in bytes: vectors + stored texts."""
+    index_bytes = vectorstore.index.ntotal * vectorstore.index.d * 4
+    text_bytes = sum(len(doc.page_content) for doc in vectorstore.docstore._dict.values())
+    return index_bytes + text_bytes
+
+
+class VectorStoreCache:
+    """
+    Process-wide, thread-safe LRU of loaded FAISS vector stores bounded by a memory budget.
+    Entries are keyed by (folder, index name) and invalidated when the index or the docstore file changes on disk.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()  # key -> (file token, size, vectorstore)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, folder_path: str, index_name: str, embeddings, mmap: bool = True) -> FAISS:
+        key = (os.path.abspath(folder_path), index_name, mmap)
+        version = store_version(folder_path, index_name)
+        if version is None:
+            raise FileNotFoundError(f"{folder_path}/{index_name}.faiss")
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                logger.info(f"ℹ️  Vector store cache hit: {index_name}")
+                return entry[2]
+
+        # Load outside the lock, other sessions keep being served meanwhile
+        vectorstore = _read_vector_store(folder_path, index_name, embeddings, mmap)
+        size = _estimate_size(vectorstore)
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (version, size, vectorstore)
+            self._size += size
+            # Evict least recently used stores until we are back under budget (always keep the newest)
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                evicted_key, _ = next(iter(self._entries.items()))
+                self._pop(evicted_key)
+                logger.info(f"ℹ️  Vector store evicted: {evicted_key[1]}")
+        return vectorstore
+
+    def _pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[1]
+
+    def invalidate(self, folder_path: str, index_name: str):
+        with self._lock:
+            for mmap in (True, False):
+                self._pop((os.path.abspath(folder_path), index_name, mmap))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+vector_store_cache = VectorStoreCache(max_bytes=VECTOR_STORE_CACHE_MB * 1024 * 1024)
+
+
+def load_vector_store(folder_path: str, index_name: str, embeddings, mmap: bool = True) -> FAISS:
+    """
+    Returns a (cached) FAISS vector store.
+    :param folder_path: folder of the index
+    :param index_name: index file name (without extension)
+    :param embeddings: Embeddings model used for the queries
+    :param mmap: memory-map the index read-only, use False for indexes that are modified
+    :return: FAISS vector store
+    """
+    return vector_store_cache.get(folder_path, index_name, embeddings, mmap=mmap)
+
+
+def invalidate_vector_store(folder_path: str, index_name: str):
+    vector_store_cache.invalidate(folder_path, index_name)
+
+
+def store_version(folder_path: str, index_name: str) -> Optional[str]:
+    """Version token of a saved store (changes with the index or the docstore file), None when not saved."""
+    try:
+        stats = [os.stat(path) for path in (f"{folder_path}/{index_name}.faiss",
+                                            _docstore_path(folder_path, index_name))]
+    except FileNotFoundError:
+        # Legacy pickle stores have no docstore yet, the index alone identifies them until they are migrated
+        if not os.path.exists(f"{folder_path}/{index_name}.faiss"):
+            return None
+        stats = [os.stat(f"{folder_path}/{index_name}.faiss")]
+    return "-".join(f"{stat.st_mtime_ns}:{stat.st_size}" for stat in stats)
+
+
+def vector_store_exists(folder_path: str, index_name: str) -> bool:
+    return os.path.exists(f"{folder_path}/{index_name}.faiss")
@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+# The app runs from src/ with flat imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """Tracker, history, job and vector store files are relative to the working directory, one per test."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class KeywordEmbeddings(Embeddings):
+    """Offline embeddings: unit vectors of keyword counts, texts sharing keywords are similar."""
+
+    KEYWORDS = ("python", "sql", "spark", "java", "spring", "kotlin", "design", "figma")
+
+    def _embed(self, text: str) -> list[float]:
+        words = text.lower().split()
+        vector = [words.count(keyword) + 0.01 for keyword in self.KEYWORDS]
+        norm = sum(value ** 2 for value in vector) ** 0.5
+        return [value / norm for value in vector]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed(text)
+
+
+@pytest.fixture
+def keyword_embeddings():
+    return KeywordEmbeddings()
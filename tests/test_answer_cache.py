@@ -0,0 +1,179 @@
+import sqlite3
+import threading
+
+import numpy as np
+import pytest
+
+import answer_cache
+from answer_cache import (AnswerCache, AnalysisAnswerCache, open_answer_cache, pair_vector, pair_similarities,
+                          ANSWER_CACHE_THRESHOLDS)
+
+DIM = 8
+SPACE = ("v2", "text-embedding-3-small")
+
+
+def embedding(similarity: float, axis: int = 0) -> np.ndarray:
+    """Unit vector with the given cosine similarity to the unit vector of `axis`."""
+    vector = np.zeros(DIM, dtype="float32")
+    vector[axis] = similarity
+    vector[(axis + 1) % DIM] = np.sqrt(1 - similarity ** 2)
+    return vector
+
+
+BASE = pair_vector(embedding(1.0), embedding(1.0, axis=4))
+
+
+def pair(jd_similarity: float, resume_similarity: float) -> np.ndarray:
+    return pair_vector(embedding(jd_similarity), embedding(resume_similarity, axis=4))
+
+
+@pytest.fixture
+def cache():
+    return AnswerCache(db_path="history.db")
+
+
+def analysis(cache, vector, thresholds=None) -> AnalysisAnswerCache:
+    return AnalysisAnswerCache(cache, SPACE, vector, "resume", "jd", thresholds)
+
+
+def test_pair_similarities():
+    jd, resume = pair_similarities(BASE, pair(0.9, 0.8))
+    assert jd == pytest.approx(0.9, abs=1e-5)
+    assert resume == pytest.approx(0.8, abs=1e-5)
+    # Inner product of two pair vectors is the mean similarity
+    assert float(BASE @ pair(0.9, 0.8)) == pytest.approx(0.85, abs=1e-5)
+
+
+def test_per_question_thresholds(cache):
+    stored = analysis(cache, BASE)
+    stored.put("q1", "skills table")
+    stored.put("q4", "selling points")
+    # q1 needs 0.96 on both sides, q4 0.97
+    near = analysis(cache, pair(0.965, 0.99))
+    assert near.get("q1") == "skills table"
+    assert near.get("q4") is None
+    assert set(near.hits) == {"q1"}
+    assert near.hits["q1"]["jd_similarity"] == pytest.approx(0.965, abs=1e-3)
+
+
+def test_both_sides_must_reach_the_threshold(cache):
+    analysis(cache, BASE).put("q1", "skills table")
+    assert analysis(cache, pair(0.999, 0.9)).get("q1") is None
+    assert analysis(cache, pair(0.9, 0.999)).get("q1") is None
+
+
+def test_live_only_questions_are_never_cached(cache):
+    assert "q3" not in ANSWER_CACHE_THRESHOLDS
+    stored = analysis(cache, BASE)
+    stored.put("q3", "85")
+    assert stored.get("q3") is None
+
+
+def test_other_prompt_versions_do_not_share_answers(cache):
+    analysis(cache, BASE).put("q1", "skills table")
+    assert AnalysisAnswerCache(cache, ("v1", SPACE[1]), BASE, "resume", "jd").get("q1") is None
+
+
+def test_entries_of_other_processes_are_found(cache):
+    assert analysis(cache, BASE).get("q1") is None
+    analysis(AnswerCache(db_path="history.db"), BASE).put("q1", "from another process")
+    assert analysis(cache, BASE).get("q1") == "from another process"
+
+
+def test_expired_entries_are_missed_and_evicted(cache):
+    analysis(cache, BASE).put("q1", "old answer")
+    with sqlite3.connect("history.db") as connection:
+        connection.execute("UPDATE answer_cache SET created_at='2000-01-01T00:00:00'")
+    assert analysis(AnswerCache(db_path="history.db"), BASE).get("q1") is None
+    assert analysis(cache, BASE).get("q1") is None
+
+    AnalysisAnswerCache(cache, SPACE, pair(0.5, 0.5), "resume", "other jd").put("q1", "new answer")
+    with sqlite3.connect("history.db") as connection:
+        assert [row[0] for row in connection.execute("SELECT jd_hash FROM answer_cache")] == ["other jd"]
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = AnswerCache(db_path="history.db", max_entries=2)
+    AnalysisAnswerCache(cache, SPACE, BASE, "resume", "jd 1").put("q1", "first")
+    AnalysisAnswerCache(cache, SPACE, pair(0.1, 0.1), "resume", "jd 2").put("q1", "second")
+    with sqlite3.connect("history.db") as connection:
+        connection.execute("UPDATE answer_cache SET last_used_at='2020-01-01T00:00:00'")
+    # A hit makes the first entry the most recently used
+    assert analysis(cache, BASE).get("q1") == "first"
+
+    AnalysisAnswerCache(cache, SPACE, pair(0.2, 0.2), "resume", "jd 3").put("q1", "third")
+    with sqlite3.connect("history.db") as connection:
+        kept = sorted(row[0] for row in connection.execute("SELECT jd_hash FROM answer_cache"))
+    assert kept == ["jd 1", "jd 3"]
+    assert analysis(cache, BASE).get("q1") == "first"
+
+
+def test_answers_of_one_pair_share_an_entry(cache):
+    stored = analysis(cache, BASE)
+    stored.put("q1", "skills table")
+    stored.put("q5", "upskilling")
+    with sqlite3.connect("history.db") as connection:
+        assert connection.execute("SELECT COUNT(*) FROM answer_cache").fetchone()[0] == 1
+    assert analysis(cache, BASE).get("q5") == "upskilling"
+
+
+def test_concurrent_lookups_and_stores(cache):
+    errors = []
+
+    def worker(n: int):
+        try:
+            vector = pair(1.0 - n / 1000, 1.0)
+            for _ in range(5):
+                AnalysisAnswerCache(cache, SPACE, vector, "resume", f"jd {n}").put("q1", f"answer {n}")
+                assert analysis(cache, vector).get("q1") is not None
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    with sqlite3.connect("history.db") as connection:
+        assert connection.execute("SELECT COUNT(*) FROM answer_cache").fetchone()[0] == 8
+
+
+class CountingEmbeddings:
+    model = "text-embedding-3-small"
+
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("embeddings unavailable")
+        return [embedding(1.0), embedding(1.0, axis=4)]
+
+
+def test_pair_is_embedded_once_on_the_first_cacheable_question(monkeypatch):
+    monkeypatch.setattr(answer_cache, "_answer_cache", AnswerCache(db_path="history.db"))
+    embeddings = CountingEmbeddings()
+    opened = open_answer_cache("JD", "resume", "resume", "jd", "v2", embeddings=embeddings)
+    # Metadata, score and letters are always live: no embedding call
+    assert opened.get("q7") is None and opened.get("score") is None
+    opened.put("q7", "Dear hiring manager")
+    assert embeddings.calls == 0
+
+    assert opened.get("q1") is None
+    opened.put("q1", "skills table")
+    assert embeddings.calls == 1
+    assert analysis(answer_cache.get_answer_cache(), BASE).get("q1") == "skills table"
+
+
+def test_failed_embedding_answers_live(monkeypatch):
+    monkeypatch.setattr(answer_cache, "_answer_cache", AnswerCache(db_path="history.db"))
+    embeddings = CountingEmbeddings(fail=True)
+    opened = open_answer_cache("JD", "resume", "resume", "jd", "v2", embeddings=embeddings)
+    assert opened.get("q1") is None
+    opened.put("q1", "skills table")
+    assert opened.get("q4") is None
+    # Tried once, the cache is off for the rest of the analysis
+    assert embeddings.calls == 1
@@ -0,0 +1,229 @@
+import asyncio
+import multiprocessing
+import os
+import time
+
+import pytest
+from aiohttp import FormData
+from aiohttp.test_utils import TestClient, TestServer
+
+from benchmarks.mock_servers import MockSettings, serve, free_port, resume_text
+from benchmarks.load_test import resume_pdf, wait_for_server
+import job_queue
+import api
+
+
+def call_api(scenario, app=None):
+    """Runs scenario(client) against the API app on a test server."""
+    async def run():
+        async with TestClient(TestServer(app or api.create_app())) as client:
+            return await scenario(client)
+    return asyncio.run(run())
+
+
+async def wait_for_job(client, status_url: str, timeout: float = 60) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        response = await client.get(status_url)
+        assert response.status == 200
+        job = await response.json()
+        if job["status"] in job_queue.FINISHED_STATES or time.monotonic() > deadline:
+            return job
+        await asyncio.sleep(0.2)
+
+
+async def submit(client, resume: int, jd: int, filename: str = "candidate.pdf") -> dict:
+    form = FormData()
+    form.add_field("resume", resume_pdf(resume), filename=filename, content_type="application/pdf")
+    form.add_field("jd_text", resume_text(jd))
+    response = await client.post("/analyses", data=form)
+    assert response.status == 202, await response.text()
+    return await response.json()
+
+
+@pytest.fixture
+def fresh_queue(monkeypatch):
+    """A job queue of its own per test (the jobs directory is the test's working directory)."""
+    monkeypatch.setattr(job_queue, "_job_queue", None)
+
+
+@pytest.fixture(scope="module")
+def mock_openai():
+    """Fast OpenAI stand-in, every model client of the pipeline talks to it."""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    settings = MockSettings(latency_ms=5, jitter_ms=0, tokens_per_s=100_000, completion_tokens=40,
+                            embedding_latency_ms=0, embedding_dim=64)
+    server = multiprocessing.Process(target=serve, args=(settings, "127.0.0.1", port), daemon=True)
+    server.start()
+    wait_for_server(base_url)
+    saved = {name: os.environ.get(name) for name in ("OPENAI_BASE_URL", "OPENAI_API_BASE", "OPENAI_API_KEY")}
+    os.environ.update({"OPENAI_BASE_URL": f"{base_url}/v1", "OPENAI_API_BASE": f"{base_url}/v1",
+                       "OPENAI_API_KEY": "mock"})
+    yield base_url
+    for name, value in saved.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+    server.terminate()
+
+
+@pytest.fixture
+def offline_embeddings(monkeypatch):
+    import resources
+    # No tiktoken download: the stand-in embeds whatever it is given
+    get_embeddings = resources.get_embeddings
+    monkeypatch.setattr(resources, "get_embeddings",
+                        lambda **kwargs: get_embeddings(check_embedding_ctx_length=False, **kwargs))
+
+
+def test_submit_poll_result(mock_openai, fresh_queue, offline_embeddings):
+    async def scenario(client):
+        submitted = await submit(client, resume=1, jd=2)
+        return await wait_for_job(client, submitted["status_url"])
+
+    job = call_api(scenario)
+    assert job["status"] == job_queue.DONE, job["error"]
+    assert job["results"]["score"] == MockSettings().score
+    assert job["report"]
+    assert job["history_id"] is not None
+
+
+def test_sections_use_the_resume_of_the_analysis(mock_openai, fresh_queue, offline_embeddings):
+    from history_store import get_analysis
+    from rag_implementation import resume_document_path
+
+    async def scenario(client):
+        # Two different resumes uploaded under the same file name
+        first = await wait_for_job(client, (await submit(client, resume=1, jd=2))["status_url"])
+        second = await wait_for_job(client, (await submit(client, resume=3, jd=4))["status_url"])
+        response = await client.post(f"/analyses/{first['job_id']}/sections", json={"sections": ["q7"]})
+        assert response.status == 202, await response.text()
+        sections = await wait_for_job(client, (await response.json())["status_url"])
+        return first, second, sections
+
+    first, second, sections = call_api(scenario)
+    assert sections["status"] == job_queue.DONE, sections["error"]
+    first_key = get_analysis(first["history_id"])["resume_key"]
+    assert first_key != get_analysis(second["history_id"])["resume_key"]
+    with open(resume_document_path(first_key), encoding="utf-8") as f:
+        assert "Candidate 1" in f.read()
+    assert get_analysis(first["history_id"])["resume_key"] == first_key
+    assert "q7" in get_analysis(first["history_id"])["results"]
+
+
+def test_unknown_analysis_is_404(fresh_queue):
+    async def scenario(client):
+        return (await client.get("/analyses/missing")).status
+
+    assert call_api(scenario) == 404
+
+
+def test_full_queue_is_429(fresh_queue, monkeypatch):
+    monkeypatch.setattr(api, "API_MAX_QUEUE_DEPTH", 0)
+
+    async def scenario(client):
+        response = await client.post("/analyses", data={"jd_text": "Data Engineer"})
+        return response.status, response.headers.get("Retry-After"), await response.json()
+
+    status, retry_after, body = call_api(scenario)
+    assert status == 429
+    assert retry_after == "30"
+    assert body["queue_depth"] == 0
+
+
+def test_too_many_requests_is_429(fresh_queue):
+    app = api.create_app()
+    # Every request slot taken
+    app[api.SEMAPHORE] = asyncio.Semaphore(0)
+
+    async def scenario(client):
+        return (await client.get("/health")).status
+
+    assert call_api(scenario, app) == 429
+
+
+def test_no_pending_section_is_409(fresh_queue):
+    queue = job_queue.get_job_queue()
+    queue._jobs["done"] = job_queue.AnalysisJob(job_id="done", resume_name="a.pdf", status=job_queue.DONE,
+                                                history_id=1, results={"q7": "letter", "q8": "tips", "q9": "pitch"})
+
+    async def scenario(client):
+        response = await client.post("/analyses/done/sections")
+        return response.status, await response.json()
+
+    status, payload = call_api(scenario)
+    assert status == 409
+    assert "Nothing to generate" in payload["error"]
+    assert queue.queue_depth() == 0
+
+
+@pytest.mark.parametrize("method, path", [
+    ("post", "/tracker"),
+    ("put", "/tracker/0"),
+    ("post", "/analyses/waiting/duplicate"),
+])
+@pytest.mark.parametrize("body", ["{not json", "[1, 2]", ""])
+def test_bad_json_is_400(fresh_queue, method, path, body):
+    queue = job_queue.get_job_queue()
+    queue._jobs["waiting"] = job_queue.AnalysisJob(job_id="waiting", resume_name="a.pdf",
+                                                   status=job_queue.AWAITING_DECISION)
+
+    async def scenario(client):
+        response = await getattr(client, method)(path, data=body, headers={"Content-Type": "application/json"})
+        return response.status, await response.json()
+
+    status, payload = call_api(scenario)
+    assert status == 400
+    assert "JSON" in payload["error"]
+
+
+def test_bad_multipart_is_400(fresh_queue):
+    async def scenario(client):
+        response = await client.post("/analyses", data=b"--x\r\nbroken",
+                                     headers={"Content-Type": "multipart/form-data; boundary=y"})
+        return response.status
+
+    assert call_api(scenario) == 400
+
+
+def test_tracker_crud(fresh_queue):
+    async def scenario(client):
+        response = await client.post("/tracker", json={"Company": "Acme", "Job Title": "Data Engineer",
+                                                       "Match Score": 81.6})
+        assert response.status == 201, await response.text()
+        acme = await response.json()
+        assert acme["Match Score"] == 82
+        assert acme["Status"] == "Applied"
+        assert acme["Application ID"]
+
+        response = await client.post("/tracker", json={"Company": "Globex", "Job Title": "ML Engineer"})
+        assert response.status == 201
+        globex = await response.json()
+
+        response = await client.put(f"/tracker/{acme['Application ID']}", json={"Status": "Interviewing"})
+        assert response.status == 200
+        assert (await response.json())["Status"] == "Interviewing"
+
+        response = await client.put(f"/tracker/{acme['Application ID']}", json={"Status": "Hired"})
+        assert response.status == 400
+        response = await client.put("/tracker/unknown", json={"Status": "Offer"})
+        assert response.status == 404
+
+        rows = await (await client.get("/tracker")).json()
+        assert [(row["Company"], row["Status"]) for row in rows] == [("Acme", "Interviewing"),
+                                                                    ("Globex", "Applied")]
+
+        # Deleting a row does not shift the others
+        response = await client.delete(f"/tracker/{acme['Application ID']}")
+        assert response.status == 200
+        response = await client.delete(f"/tracker/{acme['Application ID']}")
+        assert response.status == 404
+        response = await client.put(f"/tracker/{globex['Application ID']}", json={"Status": "Offer"})
+        assert (await response.json())["Company"] == "Globex"
+
+        return await (await client.get("/tracker")).json()
+
+    rows = call_api(scenario)
+    assert [(row["Company"], row["Status"]) for row in rows] == [("Globex", "Offer")]
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+from filelock import FileLock, Timeout
+from langchain_community.vectorstores import FAISS
+
+import candidate_pool
+from candidate_pool import (add_candidate_to_pool, aggregate_candidate_scores, load_candidate_pool, rank_candidates,
+                            sync_candidate_pool, POOL_DIR, POOL_INDEX_NAME)
+from vector_store_cache import save_vector_store
+
+RESUMES = {
+    "alice": ["python sql pipelines", "python spark sql", "design reviews"],
+    "bob": ["java spring services", "kotlin java", "python scripts"],
+    "carol": ["figma design", "design systems figma"],
+}
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool(monkeypatch):
+    """No pool loaded in this process yet (the pool files are in the test's working directory)."""
+    monkeypatch.setattr(candidate_pool, "_pool", None)
+    monkeypatch.setattr(candidate_pool, "_pool_version", None)
+    monkeypatch.setattr(candidate_pool, "_pool_file_locks", {})
+
+
+def resume_store(candidate: str, embeddings) -> FAISS:
+    return FAISS.from_texts(RESUMES[candidate], embeddings, metadatas=[{"source": candidate}] * len(RESUMES[candidate]))
+
+
+def pool_candidates(pool: FAISS) -> set[str]:
+    return {doc.metadata["candidate"] for doc in pool.docstore._dict.values()}
+
+
+def test_aggregate_is_the_mean_of_the_best_chunks():
+    similarities = np.array([0.9, 0.1, 0.8, 0.7, 0.5, 0.6])
+    codes = np.array([0, 0, 0, 0, 1, 1])
+    scores = aggregate_candidate_scores(similarities, codes, n_candidates=3, top_n=3)
+    # Candidate 0: best three of four chunks, candidate 1: both chunks, candidate 2: no chunk
+    assert scores.tolist() == pytest.approx([0.8, 0.55, 0.0])
+
+
+def test_aggregate_matches_a_per_candidate_loop():
+    rng = np.random.default_rng(7)
+    similarities, codes = rng.random(500), rng.integers(0, 20, 500)
+    scores = aggregate_candidate_scores(similarities, codes, n_candidates=20, top_n=4)
+    expected = [np.sort(similarities[codes == code])[::-1][:4].mean() for code in range(20)]
+    assert scores.tolist() == pytest.approx(expected)
+
+
+def test_ranking_puts_the_closest_candidate_first(keyword_embeddings):
+    for candidate in RESUMES:
+        add_candidate_to_pool(resume_store(candidate, keyword_embeddings), candidate, keyword_embeddings)
+    ranking = rank_candidates("python sql engineer", keyword_embeddings, top_k=2, top_n=2)
+    assert ranking["Candidate"].tolist() == ["alice", "bob"]
+    assert ranking["Score"].is_monotonic_decreasing
+    assert ranking["Best Match"][0] in RESUMES["alice"]
+    assert rank_candidates("figma design", keyword_embeddings, top_k=1)["Candidate"].tolist() == ["carol"]
+
+
+def test_empty_pool_ranks_nobody(keyword_embeddings):
+    assert rank_candidates("python", keyword_embeddings).empty
+
+
+def test_adding_a_candidate_twice_keeps_one_copy(keyword_embeddings):
+    store = resume_store("alice", keyword_embeddings)
+    add_candidate_to_pool(store, "alice", keyword_embeddings)
+    pool = add_candidate_to_pool(store, "alice", keyword_embeddings)
+    assert pool.index.ntotal == len(RESUMES["alice"])
+
+
+def test_sync_adds_every_stored_resume(keyword_embeddings):
+    for candidate in ("alice", "bob"):
+        save_vector_store(resume_store(candidate, keyword_embeddings), POOL_DIR, f"index_{candidate}")
+    pool = sync_candidate_pool(keyword_embeddings)
+    assert pool_candidates(pool) == {"alice", "bob"}
+
+    save_vector_store(resume_store("carol", keyword_embeddings), POOL_DIR, "index_carol")
+    assert pool_candidates(sync_candidate_pool(keyword_embeddings)) == {"alice", "bob", "carol"}
+    assert sync_candidate_pool(keyword_embeddings).index.ntotal == sum(map(len, RESUMES.values()))
+
+
+def test_candidates_saved_by_another_process_are_kept(keyword_embeddings, monkeypatch):
+    add_candidate_to_pool(resume_store("alice", keyword_embeddings), "alice", keyword_embeddings)
+    # Another process loaded the same pool, added bob and saved it
+    theirs = FAISS.from_texts(RESUMES["alice"] + RESUMES["bob"], keyword_embeddings,
+                              metadatas=[{"candidate": "alice"}] * 3 + [{"candidate": "bob"}] * 3)
+    save_vector_store(theirs, POOL_DIR, POOL_INDEX_NAME)
+
+    assert pool_candidates(load_candidate_pool(keyword_embeddings)) == {"alice", "bob"}
+    pool = add_candidate_to_pool(resume_store("carol", keyword_embeddings), "carol", keyword_embeddings)
+    assert pool_candidates(pool) == {"alice", "bob", "carol"}
+
+    # A fresh process reads all three back
+    monkeypatch.setattr(candidate_pool, "_pool", None)
+    monkeypatch.setattr(candidate_pool, "_pool_version", None)
+    assert pool_candidates(load_candidate_pool(keyword_embeddings)) == {"alice", "bob", "carol"}
+
+
+def test_updates_wait_for_the_pool_lock(keyword_embeddings, monkeypatch):
+    monkeypatch.setattr(candidate_pool, "POOL_LOCK_TIMEOUT", 0.2)
+    store = resume_store("alice", keyword_embeddings)
+    add_candidate_to_pool(store, "alice", keyword_embeddings)
+    # Held by another process (a lock file handle of its own)
+    with FileLock(f"{POOL_DIR}/{POOL_INDEX_NAME}.lock"):
+        with pytest.raises(Timeout):
+            add_candidate_to_pool(resume_store("bob", keyword_embeddings), "bob", keyword_embeddings)
+    assert pool_candidates(add_candidate_to_pool(store, "bob", keyword_embeddings)) == {"alice", "bob"}
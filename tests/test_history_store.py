@@ -0,0 +1,105 @@
+import sqlite3
+import zlib
+from datetime import datetime
+
+import pytest
+
+import history_store
+from history_store import (content_hash, lookup_analysis, latest_analysis_for, save_analysis, update_analysis,
+                           get_analysis, list_history, count_history, _compress, _decompress)
+
+RESULTS = {"company": "Acme", "title": "Data Engineer", "score": 82, "q1": "| Skill | Match |\n" * 200,
+           "q2": "Strong fit ✅"}
+
+
+def save(resume="r1", jd="j1", version="v2", results=None, **kwargs) -> int:
+    return save_analysis(resume, jd, version, results or RESULTS, "# Report", **kwargs)
+
+
+def test_content_hash_normalizes_jd_whitespace_only():
+    assert content_hash("Data  Engineer\n\nPython") == content_hash("Data Engineer Python")
+    assert content_hash("Data Engineer") != content_hash("data engineer")
+    assert content_hash(b"%PDF a") != content_hash(b"%PDF  a")
+    assert len(content_hash(b"")) == 64
+
+
+def test_payload_round_trip_is_compressed():
+    payload = _compress(RESULTS, "# Report", "JD text", "jane_1")
+    assert len(payload) < len(str(RESULTS)) / 5
+    assert _decompress(payload) == {"results": RESULTS, "report": "# Report", "job_description": "JD text",
+                                    "resume_key": "jane_1"}
+    assert zlib.decompress(payload).startswith(b"{")
+
+
+def test_lookup_by_resume_jd_and_prompt_version():
+    analysis_id = save(job_description="JD text", resume_key="jane_1")
+    stored = lookup_analysis("r1", "j1", "v2")
+    assert stored["id"] == analysis_id
+    assert stored["results"] == RESULTS and stored["report"] == "# Report"
+    assert stored["job_description"] == "JD text" and stored["resume_key"] == "jane_1"
+    # Any part of the key differs: not the same analysis
+    assert lookup_analysis("r2", "j1", "v2") is None
+    assert lookup_analysis("r1", "j2", "v2") is None
+    assert lookup_analysis("r1", "j1", "v1") is None
+
+
+def test_saving_the_same_key_replaces_the_analysis():
+    first = save()
+    second = save(results={**RESULTS, "score": 90})
+    assert second == first
+    assert count_history() == 1
+    assert get_analysis(first)["score"] == 90
+    assert save(version="v1") != first
+    assert count_history() == 2
+
+
+def test_listing_columns_are_denormalized():
+    analysis_id = save(resume_name="jane.pdf", jd_source="https://jobs.example.com/1")
+    with sqlite3.connect("history.db") as connection:
+        row = connection.execute("SELECT company, title, score, resume_name FROM analyses WHERE id=?",
+                                 (analysis_id,)).fetchone()
+    assert row == ("Acme", "Data Engineer", 82, "jane.pdf")
+
+
+def test_update_keeps_the_job_description_and_resume():
+    analysis_id = save(job_description="JD text", resume_key="jane_1")
+    update_analysis(analysis_id, {**RESULTS, "q7": "Dear hiring manager", "score": 85}, "# New report")
+    stored = get_analysis(analysis_id)
+    assert stored["results"]["q7"] == "Dear hiring manager" and stored["score"] == 85
+    assert stored["report"] == "# New report"
+    assert stored["job_description"] == "JD text" and stored["resume_key"] == "jane_1"
+    with pytest.raises(KeyError):
+        update_analysis(999, RESULTS, None)
+
+
+def test_latest_analysis_for_any_of_the_jds(monkeypatch):
+    times = iter(["2025-03-01T09:00:00", "2025-03-02T09:00:00", "2025-03-03T09:00:00"])
+
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.fromisoformat(next(times))
+
+    monkeypatch.setattr(history_store, "datetime", Clock)
+    save(jd="j1")
+    newest = save(jd="j2", results={**RESULTS, "company": "Globex"})
+    save(resume="r2", jd="j3")
+    latest = latest_analysis_for("r1", ["j1", "j2", "j3"], "v2")
+    assert latest["id"] == newest and latest["jd_hash"] == "j2" and latest["company"] == "Globex"
+    assert "payload" not in latest
+    assert latest_analysis_for("r1", ["j3"], "v2") is None
+    assert latest_analysis_for("r1", [], "v2") is None
+
+
+def test_paging_and_search():
+    ids = [save(jd=f"j{n}", results={**RESULTS, "company": "Acme" if n % 2 else "Globex"}) for n in range(25)]
+    # Newest first, rows saved within the same second by id
+    pages = [list_history(offset=offset, limit=10) for offset in (0, 10, 20)]
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [row["id"] for page in pages for row in page] == ids[::-1]
+    assert "payload" not in pages[0][0]
+
+    assert count_history() == 25
+    assert count_history(search="globex") == 13
+    assert {row["company"] for row in list_history(limit=50, search="Glob")} == {"Globex"}
+    assert count_history(search="Initech") == 0
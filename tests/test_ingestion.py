@@ -0,0 +1,98 @@
+import io
+
+import fitz
+import numpy as np
+import pytest
+
+from ingestion import get_pdf_text_layout, get_pdf_text, _column_splits, _reading_order
+
+LEFT = ["Experience Acme Data Engineer built pipelines", "Experience Globex Analyst reporting in SQL",
+        "Education BSc Computer Science"]
+RIGHT = ["Skills Python SQL Spark", "Languages English German", "Interests Climbing Chess"]
+
+
+def pdf(blocks: list[tuple[float, float, float, float, str]]) -> io.BytesIO:
+    """One A4 page with a text box per block (x0, y0, x1, y1, text)."""
+    with fitz.open() as doc:
+        page = doc.new_page()
+        for x0, y0, x1, y1, text in blocks:
+            assert page.insert_textbox(fitz.Rect(x0, y0, x1, y1), text, fontsize=8) >= 0
+        file = io.BytesIO(doc.tobytes())
+    file.name = "resume.pdf"
+    return file
+
+
+# Body of a section: wrapped lines filling its column
+DETAILS = " designed and shipped reliable batch and streaming data products with the team" * 2
+
+
+def two_columns(left_x=(50, 290), right_x=(320, 545)) -> list:
+    """A full-width header, then two columns of sections starting on different lines."""
+    blocks = [(50, 40, 545, 60, "Jane Doe Senior Data Engineer jane@example.com")]
+    blocks += [(left_x[0], 100 + 120 * i, left_x[1], 200 + 120 * i, text + DETAILS) for i, text in enumerate(LEFT)]
+    blocks += [(right_x[0], 140 + 120 * i, right_x[1], 240 + 120 * i, text + DETAILS)
+               for i, text in enumerate(RIGHT)]
+    return blocks
+
+
+def positions(text: str, parts: list[str]) -> list[int]:
+    flat = " ".join(text.split())
+    return [flat.index(part) for part in parts]
+
+
+def test_two_columns_are_read_left_then_right():
+    text = get_pdf_text_layout(pdf(two_columns()))
+    order = positions(text, ["Jane Doe"] + LEFT + RIGHT)
+    assert order == sorted(order)
+
+
+def test_sidebar_is_read_as_a_column():
+    # Narrow left sidebar, wide main column
+    text = get_pdf_text_layout(pdf(two_columns(left_x=(50, 180), right_x=(210, 545))))
+    order = positions(text, LEFT + RIGHT)
+    assert order == sorted(order)
+
+
+def test_full_width_block_starts_a_new_band():
+    # The heading crosses the gutter: the columns below it are read after the ones above
+    heading = "Projects: open source maintainer of data tools, conference speaker, mentor"
+    blocks = two_columns() + [(50, 480, 545, 500, heading)]
+    blocks += [(50, 520, 290, 620, "Project Alpha" + DETAILS), (320, 560, 545, 660, "Project Beta" + DETAILS),
+               (50, 640, 290, 740, "Project Gamma" + DETAILS)]
+    text = get_pdf_text_layout(pdf(blocks))
+    order = positions(text, LEFT + RIGHT + ["Projects: open source", "Project Alpha", "Project Gamma", "Project Beta"])
+    assert order == sorted(order)
+
+
+def test_right_aligned_dates_are_rows_not_a_column():
+    blocks = []
+    for i, (role, dates) in enumerate([("Data Engineer Acme", "2021 2024"), ("Analyst Globex", "2018 2021"),
+                                       ("Intern Initech", "2017 2018")]):
+        blocks += [(50, 100 + 60 * i, 300, 130 + 60 * i, role), (450, 100 + 60 * i, 545, 130 + 60 * i, dates)]
+    with fitz.open(stream=pdf(blocks).read(), filetype="pdf") as doc:
+        page_blocks = [b for b in doc[0].get_text("blocks") if b[4].strip()]
+        assert _column_splits(np.array([b[:4] for b in page_blocks]), doc[0].rect.width) == []
+    text = get_pdf_text_layout(pdf(blocks))
+    order = positions(text, ["Data Engineer Acme", "2021 2024", "Analyst Globex", "2018 2021", "Intern Initech"])
+    assert order == sorted(order)
+
+
+def test_reading_order_of_boxes():
+    boxes = np.array([
+        [50, 10, 545, 20],    # 0 full-width header
+        [320, 40, 545, 60],   # 1 right column, top
+        [50, 50, 290, 70],    # 2 left column, top
+        [50, 90, 290, 110],   # 3 left column
+        [320, 100, 545, 120],  # 4 right column
+    ], dtype=float)
+    assert _reading_order(boxes, [305.0]).tolist() == [0, 2, 3, 1, 4]
+    # Single column: top to bottom
+    assert _reading_order(boxes, []).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_unknown_engine_and_unreadable_pdf():
+    with pytest.raises(ValueError, match="PDF engine"):
+        get_pdf_text(pdf(two_columns()), engine="ocr")
+    broken = io.BytesIO(b"not a pdf")
+    broken.name = "broken.pdf"
+    assert get_pdf_text_layout(broken) is None
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.mock_servers import job_description
+import jd_dedup
+from jd_dedup import (minhash_signature, estimated_similarity, register_jd, find_near_duplicates, normalize_url,
+                      find_tracker_duplicates, _shingles, _band_buckets)
+
+
+def words(n: int, start: int = 0) -> list[str]:
+    return [f"w{i}" for i in range(start, start + n)]
+
+
+def jaccard(text_a: str, text_b: str) -> float:
+    a, b = set(_shingles(text_a).tolist()), set(_shingles(text_b).tolist())
+    return len(a & b) / len(a | b)
+
+
+def edited(base: list[str], every: int) -> str:
+    """base with one word in every `every` replaced (each edit breaks the SHINGLE_SIZE shingles covering it)."""
+    return " ".join(f"x{i}" if i % every == 0 else word for i, word in enumerate(base))
+
+
+def test_signature_is_deterministic_and_sized():
+    text = " ".join(words(50))
+    signature = minhash_signature(text)
+    assert signature.shape == (jd_dedup.NUM_PERM,)
+    assert signature.dtype == np.uint64
+    assert np.array_equal(signature, minhash_signature(text.upper()))
+
+
+def test_short_text_has_a_signature():
+    assert minhash_signature("Data Engineer").shape == (jd_dedup.NUM_PERM,)
+
+
+@pytest.mark.parametrize("every", [10, 20, 40, 80])
+def test_estimate_tracks_true_jaccard(every):
+    base = words(2000)
+    text_a, text_b = " ".join(base), edited(base, every)
+    estimate = estimated_similarity(minhash_signature(text_a), minhash_signature(text_b))
+    # Standard error of 128 permutations is at most 0.045
+    assert estimate == pytest.approx(jaccard(text_a, text_b), abs=0.15)
+
+
+def test_bands_split_the_signature():
+    buckets = _band_buckets(minhash_signature(" ".join(words(100))))
+    assert len(buckets) == jd_dedup.LSH_BANDS
+    assert jd_dedup.LSH_BANDS * jd_dedup.LSH_ROWS == jd_dedup.NUM_PERM
+
+
+def test_identical_jd_is_found(workdir):
+    _, _, text = job_description(1)
+    register_jd(text, "h1", jd_url="https://jobs.example.com/1", company="Acme", title="Data Engineer",
+                db_path="history.db")
+    matches = find_near_duplicates(text, db_path="history.db")
+    assert [match["jd_hash"] for match in matches] == ["h1"]
+    assert matches[0]["similarity"] == 1.0
+    assert matches[0]["company"] == "Acme"
+    assert "signature" not in matches[0]
+
+
+def test_repost_with_small_edits_is_found(workdir):
+    base = words(2000)
+    register_jd(" ".join(base), "h1", db_path="history.db")
+    repost = edited(base, 80)
+    assert jaccard(" ".join(base), repost) > 0.85
+    assert [match["jd_hash"] for match in find_near_duplicates(repost, db_path="history.db")] == ["h1"]
+
+
+def test_different_jds_are_not_candidates(workdir):
+    for n in range(5):
+        _, _, text = job_description(n)
+        register_jd(text, f"h{n}", db_path="history.db")
+    _, _, other = job_description(99)
+    # Below the banding curve (~0.7) the pair is not even an LSH candidate
+    assert find_near_duplicates(other, threshold=0.0, db_path="history.db") == []
+
+
+def test_threshold_filters_candidates(workdir):
+    base = words(2000)
+    register_jd(" ".join(base), "h1", db_path="history.db")
+    repost = edited(base, 40)
+    similarity = find_near_duplicates(repost, threshold=0.0, db_path="history.db")[0]["similarity"]
+    assert 0.65 < similarity < 0.9
+    assert find_near_duplicates(repost, threshold=similarity + 0.05, db_path="history.db") == []
+
+
+def test_low_similarity_is_not_a_candidate(workdir):
+    base = words(2000)
+    register_jd(" ".join(base), "h1", db_path="history.db")
+    # Jaccard ~0.33: a band of 8 rows all equal is unlikely (0.33^8), no bucket is shared
+    assert find_near_duplicates(edited(base, 10), threshold=0.0, db_path="history.db") == []
+
+
+def test_most_similar_first(workdir):
+    base = words(2000)
+    register_jd(edited(base, 40), "far", db_path="history.db")
+    register_jd(edited(base, 200), "near", db_path="history.db")
+    matches = find_near_duplicates(" ".join(base), threshold=0.5, db_path="history.db")
+    assert [match["jd_hash"] for match in matches] == ["near", "far"]
+
+
+def test_normalize_url_ignores_tracking_and_scheme():
+    assert normalize_url("https://www.Jobs.example.com/posting/1/?utm_source=x") == "jobs.example.com/posting/1"
+    assert normalize_url("http://jobs.example.com/posting/1") == "jobs.example.com/posting/1"
+    assert normalize_url("not a url") == ""
+    assert normalize_url(None) == ""
+
+
+@pytest.mark.parametrize("url_a, url_b", [
+    ("https://www.indeed.com/viewjob?jk=abc123&utm_source=mail", "https://indeed.com/viewjob?utm_campaign=x&jk=abc123"),
+    ("https://www.linkedin.com/jobs/view?currentJobId=42&trk=public_jobs&refId=AbC",
+     "https://www.linkedin.com/jobs/view/?currentJobId=42"),
+    ("https://boards.example.com/acme?gh_jid=7&gh_src=li&page=2", "https://boards.example.com/acme?page=2&gh_jid=7"),
+])
+def test_same_posting_with_other_tracking_matches(url_a, url_b):
+    assert normalize_url(url_a) == normalize_url(url_b)
+
+
+@pytest.mark.parametrize("url_a, url_b", [
+    ("https://www.indeed.com/viewjob?jk=abc123", "https://www.indeed.com/viewjob?jk=def456"),
+    ("https://www.linkedin.com/jobs/view?currentJobId=42", "https://www.linkedin.com/jobs/view?currentJobId=43"),
+    ("https://boards.example.com/acme?gh_jid=7", "https://boards.example.com/acme"),
+])
+def test_postings_told_apart_by_the_query_do_not_match(url_a, url_b):
+    assert normalize_url(url_a) != normalize_url(url_b)
+
+
+def test_tracker_duplicates_by_url_or_company_and_title():
+    df = pd.DataFrame({
+        "URL": ["https://jobs.example.com/1?ref=a", None, "https://jobs.example.com/3"],
+        "Company": ["Acme", "Globex Inc.", "Hooli"],
+        "Job Title": ["Data Engineer", "ML Engineer", "SRE"],
+    })
+    assert find_tracker_duplicates(df, url="http://www.jobs.example.com/1?ref=b") == [0]
+    assert find_tracker_duplicates(df, company="globex inc", title="ml  engineer") == [1]
+    assert find_tracker_duplicates(df, url="https://jobs.example.com/9", company="Acme", title="SRE") == []
+    assert find_tracker_duplicates(df.iloc[0:0]) == []
+
+
+def test_tracker_rows_with_another_posting_id_are_not_duplicates():
+    df = pd.DataFrame({"URL": ["https://www.indeed.com/viewjob?jk=abc123&from=serp"], "Company": ["Acme"],
+                       "Job Title": ["Data Engineer"]})
+    assert find_tracker_duplicates(df, url="https://indeed.com/viewjob?jk=abc123&utm_medium=email") == [0]
+    assert find_tracker_duplicates(df, url="https://www.indeed.com/viewjob?jk=def456") == []
@@ -0,0 +1,200 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+import job_queue
+from job_queue import (JobQueue, AnalysisJob, AWAITING_DECISION, CANCELLED, DONE, FAILED, INTERRUPTED, RUNNING,
+                       REFRESH_RESULT_KEYS)
+from history_store import content_hash, get_analysis, save_analysis
+from rag_implementation import resume_key
+
+RESUME, JD = b"%PDF resume of Jane Doe", "Data Engineer at Acme. Python, SQL, Spark."
+EARLIER = {"company": "Acme", "title": "Data Engineer", "score": 70, "q1": "old skills", "q2": "old fit",
+           "q7": "old letter"}
+
+
+class StubQueue(JobQueue):
+    """Job queue with the model work replaced: a canned analysis, optionally blocked until released."""
+
+    def __init__(self, duplicate=None, block=False, **kwargs):
+        self.duplicate = duplicate
+        self.block = block
+        self.analysed = []
+        super().__init__(**kwargs)
+
+    def _find_duplicate(self, job, job_description, resume_hash):
+        return self.duplicate
+
+    async def _analyse(self, job, resume_bytes, job_description, config, update, blocking, *args):
+        self.analysed.append(dict(job.results))
+        while self.block:
+            await asyncio.sleep(0.01)
+        job.results = {**job.results, "company": "Acme", "title": "Data Engineer", "score": 85,
+                       "q1": "new skills", "q2": "new fit"}
+
+
+def wait_for(queue: JobQueue, job_id: str, *statuses: str, timeout: float = 30) -> AnalysisJob:
+    """Waits for one of the statuses, for a finished one until the job's coroutine returned (status saved)."""
+    deadline = time.monotonic() + timeout
+    while queue.get(job_id).status not in statuses or (queue.get(job_id).finished and job_id in queue._futures):
+        assert time.monotonic() < deadline, f"job still {queue.get(job_id).status}"
+        time.sleep(0.005)
+    return queue.get(job_id)
+
+
+def persisted(job_id: str) -> dict:
+    with open(f"{job_queue.JOBS_DIR}/{job_id}.json") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def earlier_analysis() -> dict:
+    """Analysis of the same resume against an earlier posting of the job."""
+    history_id = save_analysis(content_hash(RESUME), content_hash("earlier posting"), job_queue.PROMPT_VERSION,
+                               EARLIER, "report", resume_name="jane.pdf", resume_key="jane_earlier")
+    return {"history_id": history_id, "similarity": 0.93, "created_at": "2025-03-01", "company": "Acme",
+            "title": "Data Engineer", "jd_source": "Provided Text", "tracker_rows": []}
+
+
+def test_submit_runs_and_stores_the_analysis():
+    queue = StubQueue()
+    job = wait_for(queue, queue.submit(RESUME, "jane.pdf", jd_text=JD), DONE, FAILED)
+    assert job.status == DONE, job.error
+    assert job.results["score"] == 85
+    stored = get_analysis(job.history_id)
+    assert stored["results"] == job.results
+    assert persisted(job.job_id)["status"] == DONE
+
+
+def test_repeat_submission_loads_from_history():
+    queue = StubQueue()
+    first = wait_for(queue, queue.submit(RESUME, "jane.pdf", jd_text=JD), DONE)
+    second = wait_for(queue, queue.submit(RESUME, "jane.pdf", jd_text=JD), DONE)
+    assert second.from_history and second.history_id == first.history_id
+    assert len(queue.analysed) == 1
+
+
+def test_unknown_prompt_version_and_duplicate_mode():
+    queue = StubQueue()
+    with pytest.raises(ValueError, match="prompt version"):
+        queue.submit(RESUME, "jane.pdf", jd_text=JD, prompt_version="v0")
+    with pytest.raises(ValueError, match="on_duplicate"):
+        queue.submit(RESUME, "jane.pdf", jd_text=JD, on_duplicate="sometimes")
+
+
+@pytest.mark.parametrize("decision", ["reuse", "refresh", "full"])
+def test_duplicate_waits_for_the_decision(earlier_analysis, decision):
+    queue = StubQueue(duplicate=earlier_analysis)
+    job_id = queue.submit(RESUME, "jane.pdf", jd_text=JD)
+    job = wait_for(queue, job_id, AWAITING_DECISION, DONE, FAILED)
+    assert job.status == AWAITING_DECISION
+    assert persisted(job_id)["duplicate"]["history_id"] == earlier_analysis["history_id"]
+    # The decision is taken as soon as the status shows
+    assert queue.resolve_duplicate(job_id, decision)
+
+    job = wait_for(queue, job_id, DONE, FAILED)
+    assert job.status == DONE, job.error
+    stored = get_analysis(job.history_id)
+    if decision == "reuse":
+        assert queue.analysed == []
+        assert job.results == EARLIER
+        # Nothing was extracted, later sections use the resume the earlier analysis kept
+        assert stored["resume_key"] == "jane_earlier"
+    elif decision == "refresh":
+        # Only score, metadata, skills and fit are asked again
+        assert set(queue.analysed[0]) == set(EARLIER) - set(REFRESH_RESULT_KEYS)
+        assert job.results["q7"] == "old letter" and job.results["score"] == 85
+    else:
+        assert queue.analysed == [{}]
+        assert "q7" not in job.results
+    if decision != "reuse":
+        # The resume of this submission is kept for later sections
+        assert stored["resume_key"] == resume_key("jane.pdf", content_hash(RESUME))
+
+
+def test_no_decision_runs_in_full(earlier_analysis, monkeypatch):
+    monkeypatch.setattr(job_queue, "DUPLICATE_DECISION_TIMEOUT", 0.05)
+    queue = StubQueue(duplicate=earlier_analysis)
+    job_id = queue.submit(RESUME, "jane.pdf", jd_text=JD)
+    job = wait_for(queue, job_id, DONE, FAILED)
+    assert job.status == DONE and queue.analysed == [{}]
+    # Too late, nothing is waiting any more
+    assert not queue.resolve_duplicate(job_id, "reuse")
+
+
+def test_preset_duplicate_mode_does_not_ask(earlier_analysis):
+    queue = StubQueue(duplicate=earlier_analysis)
+    job = wait_for(queue, queue.submit(RESUME, "jane.pdf", jd_text=JD, on_duplicate="reuse"), DONE, FAILED)
+    assert job.results == EARLIER and queue.analysed == []
+
+
+def test_unknown_decision():
+    with pytest.raises(ValueError, match="decision"):
+        StubQueue().resolve_duplicate("job", "maybe")
+
+
+def test_cancel_running_job():
+    queue = StubQueue(block=True)
+    job_id = queue.submit(RESUME, "jane.pdf", jd_text=JD)
+    deadline = time.monotonic() + 30
+    while not queue.analysed:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+    assert queue.get(job_id).status == RUNNING
+
+    assert queue.cancel(job_id)
+    job = wait_for(queue, job_id, CANCELLED)
+    assert persisted(job_id)["status"] == CANCELLED
+    assert job.history_id is None
+    assert not queue.cancel(job_id)
+    assert queue.queue_depth() == 0
+
+
+def write_job(job_id: str, status: str, owner, updated_at: str = "2100-01-01T00:00:00") -> None:
+    os.makedirs(job_queue.JOBS_DIR, exist_ok=True)
+    job = AnalysisJob(job_id=job_id, resume_name="jane.pdf", status=status, owner=owner, updated_at=updated_at)
+    with open(f"{job_queue.JOBS_DIR}/{job_id}.json", "w") as f:
+        json.dump(job.__dict__, f)
+
+
+def test_restart_marks_running_jobs_interrupted():
+    write_job("running", RUNNING, "app")
+    write_job("legacy", AWAITING_DECISION, None)
+    write_job("done", DONE, "app")
+    write_job("other", RUNNING, "api")
+
+    queue = JobQueue(instance="app")
+    assert queue.get("running").status == INTERRUPTED
+    assert persisted("running")["status"] == INTERRUPTED
+    assert queue.get("legacy").status == INTERRUPTED
+    assert queue.get("done").status == DONE
+    # Another service's job is still running there
+    assert queue.get("other") is None
+    assert persisted("other")["status"] == RUNNING
+
+
+def test_old_finished_jobs_are_pruned(monkeypatch):
+    monkeypatch.setattr(job_queue, "JOB_MAX_FINISHED", 2)
+    write_job("expired", DONE, "app", updated_at="2000-01-01T00:00:00")
+    write_job("older", DONE, "app", updated_at="2100-01-01T00:00:00")
+    write_job("newer", FAILED, "app", updated_at="2100-01-02T00:00:00")
+    write_job("newest", CANCELLED, "app", updated_at="2100-01-03T00:00:00")
+    queue = JobQueue(instance="app")
+    assert sorted(job.job_id for job in queue.list_jobs()) == ["newer", "newest"]
+    assert sorted(os.listdir(job_queue.JOBS_DIR)) == ["newer.json", "newest.json"]
+
+
+def test_sections_need_the_kept_resume():
+    history_id = save_analysis("resume", "jd", job_queue.PROMPT_VERSION, EARLIER, "report",
+                               job_description=JD, resume_key="never_stored")
+    queue = JobQueue()
+    with pytest.raises(ValueError, match="Unknown sections"):
+        queue.submit_sections(history_id, ["q1"])
+    job = wait_for(queue, queue.submit_sections(history_id, ["q7"]), DONE, FAILED)
+    assert job.status == FAILED
+    assert "Resume of this analysis was not kept" in job.error
+    # The per-analysis lock is dropped with the last section job
+    assert queue._history_locks == {}
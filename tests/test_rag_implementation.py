@@ -0,0 +1,59 @@
+import os
+from collections import OrderedDict
+
+import pytest
+
+import rag_implementation
+from rag_implementation import get_rag_chain, context_strategy, resume_key, resume_document_path, WHOLE
+
+
+@pytest.fixture(autouse=True)
+def whole_resumes(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(rag_implementation, "CONTEXT_STRATEGY", WHOLE)
+    monkeypatch.setattr(rag_implementation, "_whole_chains", OrderedDict())
+    os.makedirs(rag_implementation.VECTOR_DB_DIR, exist_ok=True)
+
+
+def test_resume_key_tells_same_named_resumes_apart():
+    assert resume_key("Jane Doe.pdf", "a" * 64) == "Jane_Doe_aaaaaaaaaaaa"
+    assert resume_key("Jane Doe.pdf", "a" * 64) != resume_key("Jane Doe.pdf", "b" * 64)
+
+
+def test_whole_chain_is_built_once_per_candidate_and_budget(monkeypatch):
+    chain = get_rag_chain("Jane Doe, Data Engineer", "jane_1")
+    assert context_strategy(chain) == WHOLE
+    assert get_rag_chain("Jane Doe, Data Engineer", "jane_1") is chain
+    # Sections generated later reload the kept text
+    assert get_rag_chain("", "jane_1") is chain
+    assert get_rag_chain("John Roe, ML Engineer", "john_1") is not chain
+
+    monkeypatch.setattr(rag_implementation, "CONTEXT_WHOLE_MAX_TOKENS", 8000)
+    assert get_rag_chain("Jane Doe, Data Engineer", "jane_1") is not chain
+
+
+def test_nothing_to_reuse_is_refused_early(monkeypatch):
+    def no_embeddings():
+        raise AssertionError("embeddings requested")
+
+    monkeypatch.setattr(rag_implementation, "get_embeddings", no_embeddings)
+    with pytest.raises(ValueError, match="no resume text or stored resume for jane_1"):
+        get_rag_chain("", "jane_1")
+
+
+def test_whole_chain_follows_the_text():
+    chain = get_rag_chain("Jane Doe, Data Engineer", "jane_1")
+    rebuilt = get_rag_chain("Jane Doe, Staff Data Engineer", "jane_1")
+    assert rebuilt is not chain
+    assert rebuilt.retriever.documents[0].page_content == "Jane Doe, Staff Data Engineer"
+    with open(resume_document_path("jane_1"), encoding="utf-8") as f:
+        assert f.read() == "Jane Doe, Staff Data Engineer"
+
+
+def test_whole_chain_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(rag_implementation, "WHOLE_CHAIN_CACHE_SIZE", 2)
+    first = get_rag_chain("Resume 1", "c1")
+    get_rag_chain("Resume 2", "c2")
+    get_rag_chain("Resume 3", "c3")
+    assert len(rag_implementation._whole_chains) == 2
+    assert get_rag_chain("Resume 1", "c1") is not first
@@ -0,0 +1,146 @@
+import os
+import warnings
+
+import pandas as pd
+import pytest
+
+from tracker_events import TRACKER_EVENTS_FILE
+import helper
+from helper import (merge_tracker, apply_tracker_schema, append_tracker_rows, load_tracker_data, save_tracker_data,
+                    migrate_tracker, update_tracker, tracker_version)
+
+
+def tracker(*rows) -> pd.DataFrame:
+    """Typed tracker from (Application ID, Company, Status) rows."""
+    return apply_tracker_schema(pd.DataFrame(
+        [{"Application ID": key, "Company": company, "Job Title": "Engineer", "Status": status}
+         for key, company, status in rows]
+    ))
+
+
+def by_id(df: pd.DataFrame) -> dict:
+    return {row["Application ID"]: (row["Company"], row["Status"]) for _, row in df.iterrows()}
+
+
+BASE = tracker(("a", "Acme", "Applied"), ("b", "Globex", "Applied"), ("c", "Hooli", "Applied"))
+
+
+def test_our_changed_cells_win_theirs_are_kept():
+    ours = tracker(("a", "Acme", "Screening"), ("b", "Globex", "Applied"), ("c", "Hooli", "Applied"))
+    theirs = tracker(("a", "Acme Corp", "Applied"), ("b", "Globex", "Rejected"), ("c", "Hooli", "Applied"))
+    merged = merge_tracker(BASE, ours, theirs)
+    assert by_id(merged) == {"a": ("Acme Corp", "Screening"), "b": ("Globex", "Rejected"),
+                             "c": ("Hooli", "Applied")}
+
+
+def test_same_cell_changed_on_both_sides_is_ours():
+    ours = tracker(("a", "Acme", "Offer"), ("b", "Globex", "Applied"), ("c", "Hooli", "Applied"))
+    theirs = tracker(("a", "Acme", "Rejected"), ("b", "Globex", "Applied"), ("c", "Hooli", "Applied"))
+    assert by_id(merge_tracker(BASE, ours, theirs))["a"] == ("Acme", "Offer")
+
+
+def test_new_rows_of_both_sides_are_kept():
+    ours = pd.concat([BASE, tracker(("d", "Initech", "Applied"))], ignore_index=True)
+    theirs = pd.concat([BASE, tracker(("e", "Umbrella", "Applied"))], ignore_index=True)
+    assert set(by_id(merge_tracker(BASE, ours, theirs))) == {"a", "b", "c", "d", "e"}
+
+
+def test_row_deleted_by_us_is_dropped_unless_they_edited_it():
+    ours = tracker(("c", "Hooli", "Applied"))
+    theirs = tracker(("a", "Acme", "Applied"), ("b", "Globex", "Interviewing"), ("c", "Hooli", "Applied"))
+    assert set(by_id(merge_tracker(BASE, ours, theirs))) == {"b", "c"}
+
+
+def test_row_deleted_by_them_is_dropped_unless_we_edited_it():
+    ours = tracker(("a", "Acme", "Applied"), ("b", "Globex", "Screening"), ("c", "Hooli", "Applied"))
+    theirs = tracker(("c", "Hooli", "Applied"))
+    merged = merge_tracker(BASE, ours, theirs)
+    assert by_id(merged) == {"b": ("Globex", "Screening"), "c": ("Hooli", "Applied")}
+
+
+def test_without_base_nothing_is_deleted_and_ours_wins():
+    ours = tracker(("a", "Acme", "Screening"))
+    theirs = tracker(("a", "Acme", "Rejected"), ("b", "Globex", "Applied"))
+    merged = merge_tracker(None, ours, theirs)
+    assert by_id(merged) == {"a": ("Acme", "Screening"), "b": ("Globex", "Applied")}
+
+
+def test_merge_keeps_the_typed_schema():
+    merged = merge_tracker(BASE, BASE, BASE)
+    assert merged.dtypes.to_dict() == BASE.dtypes.to_dict()
+
+
+def test_append_to_empty_tracker_keeps_the_schema():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", FutureWarning)
+        df = append_tracker_rows([{"Company": "Acme", "Job Title": "Engineer", "Status": "Applied",
+                                   "Date Applied": "2025-03-03", "URL": None, "Match Score": None}])
+        df = append_tracker_rows([{"Company": "Globex", "Job Title": "Engineer", "Match Score": 77}])
+    assert df["Company"].tolist() == ["Acme", "Globex"]
+    assert df["Application ID"].notna().all()
+    empty = apply_tracker_schema(pd.DataFrame(columns=helper.TRACKER_COLUMNS))
+    assert df.dtypes.to_dict() == empty.dtypes.to_dict()
+
+
+def test_concurrent_saves_are_merged():
+    save_tracker_data(BASE)
+    mine, theirs = load_tracker_data(), load_tracker_data()
+    mine.loc[mine["Application ID"] == "a", "Status"] = "Offer"
+    theirs.loc[theirs["Application ID"] == "b", "Status"] = "Rejected"
+    save_tracker_data(theirs)
+    save_tracker_data(mine)
+    assert by_id(load_tracker_data()) == {"a": ("Acme", "Offer"), "b": ("Globex", "Rejected"),
+                                          "c": ("Hooli", "Applied")}
+
+
+@pytest.fixture
+def legacy_tracker(monkeypatch):
+    """Tracker written before Application IDs existed."""
+    monkeypatch.setattr(helper, "_migrated_trackers", set())
+    helper._write_tracker_file(apply_tracker_schema(pd.DataFrame(
+        [{"Company": "Acme", "Job Title": "Engineer", "Status": "Applied"}]
+    )))
+
+
+def test_load_never_writes(legacy_tracker):
+    version = tracker_version()
+    df = load_tracker_data()
+    assert df["Application ID"].isna().all()
+    assert tracker_version() == version
+    assert not os.path.exists(TRACKER_EVENTS_FILE)
+
+
+@pytest.fixture
+def legacy_csv_tracker(monkeypatch):
+    """CSV tracker of a version before Parquet storage and Application IDs."""
+    monkeypatch.setattr(helper, "_migrated_trackers", set())
+    pd.DataFrame([{"Date Applied": "2025-03-03", "Company": "Acme", "Job Title": "Engineer", "Status": "Applied"},
+                  {"Date Applied": None, "Company": None, "Job Title": None, "Status": None}]
+                 ).to_csv(helper.TRACKER_CSV_FILE, index=False)
+
+
+def test_load_reads_a_legacy_csv_without_writing(legacy_csv_tracker):
+    df = load_tracker_data()
+    assert df["Company"].tolist() == ["Acme"]
+    assert df["Status"].dtype == apply_tracker_schema(df)["Status"].dtype
+    assert load_tracker_data(["Company"])["Company"].tolist() == ["Acme"]
+    assert sorted(os.listdir()) == [helper.TRACKER_CSV_FILE]
+
+
+def test_migration_converts_a_legacy_csv(legacy_csv_tracker):
+    migrate_tracker()
+    assert os.path.exists(helper.TRACKER_PARQUET_FILE)
+    df = load_tracker_data()
+    assert df["Company"].tolist() == ["Acme"]
+    assert df["Date Applied"].iloc[0] == pd.Timestamp("2025-03-03")
+    assert df["Application ID"].notna().all()
+
+
+def test_migration_assigns_ids_once(legacy_tracker):
+    migrate_tracker()
+    application_id = load_tracker_data()["Application ID"].iloc[0]
+    assert pd.notna(application_id)
+    version = tracker_version()
+    migrate_tracker()
+    assert tracker_version() == version
+    assert update_tracker(lambda df: df)["Application ID"].iloc[0] == application_id
@@ -0,0 +1,119 @@
+from datetime import datetime
+
+import pandas as pd
+
+from tracker_analytics import FunnelAnalytics, PIPELINE_STAGES
+from tracker_events import append_events, status_changes, EVENT_COLUMNS
+
+NOW = datetime(2025, 3, 31)
+
+# A: Applied -> Screening -> Interviewing, B: Applied -> Rejected, C: Applied -> Screening -> Offer,
+# D: only seen as Ghosted
+FIRST_BATCH = [
+    ("2025-03-03T09:00:00", "A", "", "Applied"),
+    ("2025-03-03T10:00:00", "B", "", "Applied"),
+    ("2025-03-05T09:00:00", "A", "Applied", "Screening"),
+    ("2025-03-10T09:00:00", "C", "", "Applied"),
+]
+SECOND_BATCH = [
+    ("2025-03-11T09:00:00", "B", "Applied", "Rejected"),
+    ("2025-03-12T09:00:00", "C", "Applied", "Screening"),
+    ("2025-03-15T09:00:00", "A", "Screening", "Interviewing"),
+    ("2025-03-20T09:00:00", "C", "Screening", "Offer"),
+    ("2025-03-21T09:00:00", "D", "", "Ghosted"),
+]
+
+
+def log(rows, path="events.csv"):
+    append_events(pd.DataFrame(rows, columns=EVENT_COLUMNS), path)
+
+
+def test_funnel_counts():
+    log(FIRST_BATCH + SECOND_BATCH)
+    funnel = FunnelAnalytics("events.csv").refresh().funnel()
+    assert funnel.index.tolist() == PIPELINE_STAGES
+    assert funnel["Applications"].tolist() == [4, 2, 2, 1]
+    assert funnel["Conversion %"].tolist() == [100.0, 50.0, 100.0, 50.0]
+    assert funnel["Overall %"].tolist() == [100.0, 50.0, 50.0, 25.0]
+
+
+def test_incremental_refresh_matches_full_parse():
+    analytics = FunnelAnalytics("events.csv")
+    log(FIRST_BATCH)
+    analytics.refresh()
+    log(SECOND_BATCH)
+    analytics.refresh()
+
+    full = FunnelAnalytics("events.csv").refresh()
+    pd.testing.assert_frame_equal(analytics.funnel(), full.funnel())
+    pd.testing.assert_frame_equal(analytics.time_in_stage(NOW), full.time_in_stage(NOW))
+    pd.testing.assert_frame_equal(analytics.weekly_cohorts(), full.weekly_cohorts())
+
+
+def test_only_new_bytes_are_parsed():
+    analytics = FunnelAnalytics("events.csv")
+    log(FIRST_BATCH)
+    analytics.refresh()
+    offset = analytics._offset
+    assert offset == len(open("events.csv", "rb").read())
+    # Nothing appended: nothing parsed
+    assert analytics._read_new_events().empty
+    assert analytics._offset == offset
+
+
+def test_half_written_line_waits_for_the_rest():
+    analytics = FunnelAnalytics("events.csv")
+    log(FIRST_BATCH)
+    with open("events.csv", "a") as f:
+        f.write("2025-03-11T09:00:00,B,Applied,Rej")
+    assert analytics.refresh().funnel()["Applications"].tolist() == [3, 1, 0, 0]
+    with open("events.csv", "a") as f:
+        f.write("ected\n")
+    analytics.refresh()
+    assert analytics._applications.loc["B", "status"] == "Rejected"
+
+
+def test_replaced_log_starts_over():
+    analytics = FunnelAnalytics("events.csv")
+    log(FIRST_BATCH + SECOND_BATCH)
+    analytics.refresh()
+    with open("events.csv", "w"):
+        pass
+    log(FIRST_BATCH[:1])
+    assert analytics.refresh().funnel()["Applications"].tolist() == [1, 0, 0, 0]
+
+
+def test_time_in_stage():
+    log(FIRST_BATCH + SECOND_BATCH)
+    table = FunnelAnalytics("events.csv").refresh().time_in_stage(NOW)
+    # Applied: A 2 days, B 8 days, C 2 days. Screening: A 10 days, C 8 days. Interviewing: A still open, 16 days
+    assert table.loc["Applied", "Count"] == 3
+    assert table.loc["Applied", "Median"] == 2.0
+    assert table.loc["Screening", "Mean"] == 9.0
+    assert table.loc["Interviewing", "Mean"] == 15.6
+    assert "Offer" not in table.index and "Ghosted" not in table.index
+
+
+def test_weekly_cohorts():
+    log(FIRST_BATCH + SECOND_BATCH)
+    cohorts = FunnelAnalytics("events.csv").refresh().weekly_cohorts()
+    assert cohorts["Applications"].tolist() == [2, 1, 1]
+    # Week of March 3: A reached Interviewing, B did not pass Applied
+    assert cohorts.iloc[0][["Screening", "Interviewing", "Offer"]].tolist() == [50.0, 50.0, 0.0]
+    assert cohorts.iloc[1]["Offer"] == 100.0
+
+
+def test_missing_log_is_empty():
+    funnel = FunnelAnalytics("missing.csv").refresh().funnel()
+    assert funnel["Applications"].tolist() == [0, 0, 0, 0]
+
+
+def test_status_changes():
+    previous = pd.DataFrame({"Application ID": ["A", "B"], "Status": ["Applied", "Applied"]})
+    current = pd.DataFrame({"Application ID": ["A", "B", "C"], "Status": ["Screening", "Applied", "Applied"],
+                            "Date Applied": pd.to_datetime(["2025-03-01", "2025-03-01", "2025-03-04"])})
+    events = status_changes(previous, current, now=NOW)
+    assert events.values.tolist() == [
+        ["2025-03-31T00:00:00", "A", "Applied", "Screening"],
+        ["2025-03-04T00:00:00", "C", "", "Applied"],
+    ]
@@ -0,0 +1,123 @@
+import os
+
+import faiss
+import pytest
+from langchain_community.vectorstores import FAISS
+
+import vector_store_cache
+from vector_store_cache import (VectorStoreCache, save_vector_store, load_vector_store, store_version,
+                                _read_vector_store, _estimate_size, PAIR_READ_ATTEMPTS)
+
+TEXTS = ["python sql pipelines", "java spring services", "figma design systems"]
+
+
+def store(embeddings, texts=TEXTS) -> FAISS:
+    return FAISS.from_texts(texts, embeddings, metadatas=[{"chunk": i, "tags": ["a", i]} for i in range(len(texts))])
+
+
+def contents(vectorstore: FAISS) -> list[tuple[str, dict]]:
+    return [(vectorstore.docstore.search(vectorstore.index_to_docstore_id[i]).page_content,
+             vectorstore.docstore.search(vectorstore.index_to_docstore_id[i]).metadata)
+            for i in range(vectorstore.index.ntotal)]
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    vector_store_cache.vector_store_cache.clear()
+
+
+def test_json_docstore_round_trip(keyword_embeddings):
+    original = store(keyword_embeddings)
+    save_vector_store(original, "db", "index_a")
+    assert sorted(os.listdir("db")) == ["index_a.docstore.json", "index_a.faiss"]
+
+    loaded = _read_vector_store("db", "index_a", keyword_embeddings, mmap=True)
+    assert contents(loaded) == contents(original)
+    assert loaded.index_to_docstore_id == original.index_to_docstore_id
+    assert loaded.similarity_search("java services", k=1)[0].page_content == "java spring services"
+
+
+def test_legacy_pickle_store_is_migrated(keyword_embeddings):
+    store(keyword_embeddings).save_local("db", index_name="index_a")
+    loaded = load_vector_store("db", "index_a", keyword_embeddings)
+    assert contents(loaded) == contents(store(keyword_embeddings))
+    assert os.path.exists("db/index_a.docstore.json")
+
+
+def tear(embeddings):
+    """A save caught between its two renames: the index of the new version, the docstore of the old one."""
+    save_vector_store(store(embeddings, TEXTS[:2]), "db", "index_a")
+    faiss.write_index(store(embeddings).index, "db/index_a.faiss")
+
+
+def test_torn_pair_is_retried_until_the_docstore_lands(keyword_embeddings, monkeypatch):
+    tear(keyword_embeddings)
+    save_vector_store(store(keyword_embeddings), "new", "index_a")
+    sleeps = []
+
+    def finish_save(seconds):
+        # The writer renames the docstore while the reader waits
+        sleeps.append(seconds)
+        os.replace("new/index_a.docstore.json", "db/index_a.docstore.json")
+
+    monkeypatch.setattr(vector_store_cache.time, "sleep", finish_save)
+    loaded = _read_vector_store("db", "index_a", keyword_embeddings, mmap=False)
+    assert len(sleeps) == 1
+    assert loaded.index.ntotal == 3
+    assert [text for text, _ in contents(loaded)] == TEXTS
+
+
+def test_torn_pair_that_stays_torn_fails(keyword_embeddings, monkeypatch):
+    tear(keyword_embeddings)
+    sleeps = []
+    monkeypatch.setattr(vector_store_cache.time, "sleep", sleeps.append)
+    with pytest.raises(ValueError, match="3 vectors but 2 documents"):
+        _read_vector_store("db", "index_a", keyword_embeddings, mmap=False)
+    assert len(sleeps) == PAIR_READ_ATTEMPTS - 1
+
+
+def test_fewer_vectors_than_documents_is_fine(keyword_embeddings):
+    save_vector_store(store(keyword_embeddings), "db", "index_a")
+    faiss.write_index(store(keyword_embeddings, TEXTS[:2]).index, "db/index_a.faiss")
+    assert _read_vector_store("db", "index_a", keyword_embeddings, mmap=False).index.ntotal == 2
+
+
+def test_cache_hits_until_the_files_change(keyword_embeddings):
+    save_vector_store(store(keyword_embeddings), "db", "index_a")
+    cache = VectorStoreCache(max_bytes=1 << 20)
+    first = cache.get("db", "index_a", keyword_embeddings)
+    assert cache.get("db", "index_a", keyword_embeddings) is first
+
+    version = store_version("db", "index_a")
+    save_vector_store(store(keyword_embeddings, TEXTS[:1]), "db", "index_a")
+    assert store_version("db", "index_a") != version
+    assert cache.get("db", "index_a", keyword_embeddings).index.ntotal == 1
+
+
+def test_memory_budget_evicts_the_least_recently_used(keyword_embeddings):
+    for name in ("index_a", "index_b", "index_c"):
+        save_vector_store(store(keyword_embeddings), "db", name)
+    size = _estimate_size(store(keyword_embeddings))
+    cache = VectorStoreCache(max_bytes=2 * size)
+
+    a = cache.get("db", "index_a", keyword_embeddings)
+    cache.get("db", "index_b", keyword_embeddings)
+    # a is used again, b becomes the least recently used
+    assert cache.get("db", "index_a", keyword_embeddings) is a
+    cache.get("db", "index_c", keyword_embeddings)
+    assert [key[1] for key in cache._entries] == ["index_a", "index_c"]
+    assert cache._size == 2 * size
+
+
+def test_newest_store_is_kept_over_budget(keyword_embeddings):
+    save_vector_store(store(keyword_embeddings), "db", "index_a")
+    save_vector_store(store(keyword_embeddings), "db", "index_b")
+    cache = VectorStoreCache(max_bytes=1)
+    cache.get("db", "index_a", keyword_embeddings)
+    cache.get("db", "index_b", keyword_embeddings)
+    assert [key[1] for key in cache._entries] == ["index_b"]
+
+
+def test_missing_store():
+    with pytest.raises(FileNotFoundError):
+        load_vector_store("db", "index_missing", None)